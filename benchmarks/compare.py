@@ -0,0 +1,220 @@
+"""
+Benchmark Comparison - Regression gate between two benchmark runs
+
+Compares the fastest wall time (least affected by scheduler noise) and the
+tracemalloc peak of every (scale, stage) in a current run against a
+baseline run, with per-stage relative tolerances from the
+'benchmark.tolerances' config section. Changes smaller
+than an absolute floor are treated as noise. Prints a diff table and exits
+with 1 when any stage regressed or is missing from the current run
+(unless --allow-missing), and 2 when the files cannot be compared.
+
+Usage:
+    python benchmarks/compare.py benchmarks/baseline.json benchmarks/results/current.json
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List, Any
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.utils.helpers import load_config, get_default_config
+from benchmarks.run_benchmarks import BENCHMARK_VERSION
+
+
+# Relative increase allowed before a stage counts as regressed
+DEFAULT_TOLERANCES = {"latency": 0.25, "memory": 0.20}
+
+# Absolute changes below these are noise whatever the relative change
+DEFAULT_FLOORS = {"latency": 0.005, "memory": 1024 * 1024}
+
+# Metric name -> how to read it from a stage's results
+METRICS = {
+    "latency": lambda stage: stage["wall_time"]["min"],
+    "memory": lambda stage: stage["peak_memory_bytes"]
+}
+
+
+def load_tolerances(config: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """
+    Per-stage tolerances from 'benchmark.tolerances'
+    
+    Returns:
+        {'default': {metric: tolerance}, <stage>: {metric: tolerance}, ...}
+        with every stage entry completed from the default
+    """
+    configured = config.get('benchmark', {}).get('tolerances', {})
+    default = {**DEFAULT_TOLERANCES, **configured.get('default', {})}
+    tolerances = {"default": default}
+    for stage, values in configured.items():
+        if stage != 'default':
+            tolerances[stage] = {**default, **(values or {})}
+    return tolerances
+
+
+def load_floors(config: Dict[str, Any]) -> Dict[str, float]:
+    """Absolute noise floors from 'benchmark.noise_floor' (latency in seconds, memory in bytes)"""
+    configured = config.get('benchmark', {}).get('noise_floor', {})
+    return {
+        "latency": configured.get('latency_ms', DEFAULT_FLOORS["latency"] * 1000) / 1000,
+        "memory": configured.get('memory_mb', DEFAULT_FLOORS["memory"] / 1024 / 1024) * 1024 * 1024
+    }
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any],
+                    tolerances: Dict[str, Dict[str, float]] = None,
+                    floors: Dict[str, float] = None) -> List[Dict[str, Any]]:
+    """
+    Compare every (scale, stage, metric) of two benchmark runs
+    
+    Args:
+        baseline: Baseline results (run_benchmarks layout)
+        current: Current results
+        tolerances: Output of load_tolerances (default: DEFAULT_TOLERANCES for every stage)
+        floors: Output of load_floors (default: DEFAULT_FLOORS)
+    
+    Returns:
+        One row per comparison: scale, stage, metric, baseline, current,
+        change (relative, None when not comparable), tolerance and status
+        ('ok', 'improved', 'regression', 'new' or 'missing')
+    
+    Raises:
+        ValueError: If the result layouts differ
+    """
+    for name, results in (("baseline", baseline), ("current", current)):
+        if results.get('benchmark_version') != BENCHMARK_VERSION:
+            raise ValueError(f"{name} has benchmark_version {results.get('benchmark_version')}, "
+                             f"expected {BENCHMARK_VERSION}")
+    tolerances = tolerances or {"default": dict(DEFAULT_TOLERANCES)}
+    floors = floors or dict(DEFAULT_FLOORS)
+    
+    rows = []
+    scales = list(baseline['scales']) + [scale for scale in current['scales'] if scale not in baseline['scales']]
+    for scale in scales:
+        base_stages = baseline['scales'].get(scale, {}).get('stages', {})
+        current_stages = current['scales'].get(scale, {}).get('stages', {})
+        stages = list(base_stages) + [stage for stage in current_stages if stage not in base_stages]
+        
+        for stage in stages:
+            stage_tolerances = tolerances.get(stage, tolerances["default"])
+            for metric, read in METRICS.items():
+                base_value = read(base_stages[stage]) if stage in base_stages else None
+                current_value = read(current_stages[stage]) if stage in current_stages else None
+                rows.append({
+                    "scale": scale,
+                    "stage": stage,
+                    "metric": metric,
+                    "baseline": base_value,
+                    "current": current_value,
+                    "tolerance": stage_tolerances[metric],
+                    **_judge(base_value, current_value, stage_tolerances[metric], floors[metric])
+                })
+    return rows
+
+
+def _judge(base_value, current_value, tolerance: float, floor: float) -> Dict[str, Any]:
+    """Relative change and status of one metric"""
+    if base_value is None:
+        return {"change": None, "status": "new"}
+    if current_value is None:
+        return {"change": None, "status": "missing"}
+    
+    change = (current_value - base_value) / base_value if base_value > 0 else None
+    if abs(current_value - base_value) <= floor:
+        status = "ok"
+    elif current_value > base_value * (1 + tolerance):
+        status = "regression"
+    elif current_value < base_value * (1 - tolerance):
+        status = "improved"
+    else:
+        status = "ok"
+    return {"change": change, "status": status}
+
+
+def format_table(rows: List[Dict[str, Any]]) -> str:
+    """Diff table of compare_results rows"""
+    def value(metric: str, number) -> str:
+        if number is None:
+            return "-"
+        if metric == "latency":
+            return f"{number * 1000:.1f} ms"
+        return f"{number / 1024 / 1024:.1f} MB"
+    
+    header = ["Scale", "Stage", "Metric", "Baseline", "Current", "Change", "Tolerance", "Status"]
+    lines = [[
+        row["scale"],
+        row["stage"],
+        row["metric"],
+        value(row["metric"], row["baseline"]),
+        value(row["metric"], row["current"]),
+        f"{row['change']:+.1%}" if row["change"] is not None else "-",
+        f"{row['tolerance']:.0%}",
+        row["status"].upper() if row["status"] in ("regression", "missing") else row["status"]
+    ] for row in rows]
+    
+    widths = [max(len(str(cell)) for cell in column) for column in zip(header, *lines)]
+    rendered = [header, ["-" * width for width in widths]] + lines
+    return "\n".join("  ".join(str(cell).ljust(width) for cell, width in zip(line, widths)).rstrip()
+                     for line in rendered)
+
+
+def settings_warnings(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """Differences that make the numbers less comparable"""
+    warnings = []
+    if baseline.get('settings', {}).get('synthetic_data') != current.get('settings', {}).get('synthetic_data'):
+        warnings.append("synthetic data settings differ between runs")
+    if baseline.get('settings', {}).get('query') != current.get('settings', {}).get('query'):
+        warnings.append("benchmark query differs between runs")
+    base_env, current_env = baseline.get('environment', {}), current.get('environment', {})
+    for key in ('python', 'platform', 'cpu_count', 'pandas', 'numpy'):
+        if base_env.get(key) != current_env.get(key):
+            warnings.append(f"environment differs ({key}: {base_env.get(key)} -> {current_env.get(key)})")
+    return warnings
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Fail when a benchmark run regressed against a baseline")
+    parser.add_argument('baseline', help="Baseline results JSON")
+    parser.add_argument('current', help="Current results JSON")
+    parser.add_argument('--config', default='config/config.yaml', help="Configuration file (benchmark.tolerances)")
+    parser.add_argument('--allow-missing', action='store_true',
+                        help="Do not fail on baseline stages absent from the current run (e.g. a removed stage)")
+    args = parser.parse_args(argv)
+    
+    config = load_config(args.config) if os.path.exists(args.config) else get_default_config()
+    
+    try:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        with open(args.current, 'r', encoding='utf-8') as f:
+            current = json.load(f)
+        rows = compare_results(baseline, current, load_tolerances(config), load_floors(config))
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[BENCHMARK] ERROR: Cannot compare runs ({str(e)})")
+        return 2
+    
+    for warning in settings_warnings(baseline, current):
+        print(f"[BENCHMARK] WARNING: {warning}")
+    print(format_table(rows))
+    
+    regressions = [row for row in rows if row["status"] == "regression"]
+    # A stage that crashed or was dropped has no numbers: that must not pass the gate
+    missing = [] if args.allow_missing else sorted(
+        {(row["scale"], row["stage"]) for row in rows if row["status"] == "missing"}
+    )
+    if regressions:
+        print(f"\n[BENCHMARK] ✗ {len(regressions)} regression(s) beyond tolerance")
+    if missing:
+        stages = ", ".join(f"{scale}/{stage}" for scale, stage in missing)
+        print(f"\n[BENCHMARK] ✗ {len(missing)} baseline stage(s) missing from the current run: {stages}")
+    if regressions or missing:
+        return 1
+    print("\n[BENCHMARK] ✓ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""
+Benchmark Suite - Times and memory-profiles every agent at several data scales
+
+For each scale a deterministic synthetic CSV is generated (or reused) and
+DataAgent, InsightAgent, EvaluatorAgent, CreativeAgent and the full
+Orchestrator.execute are measured in isolation: wall and CPU time over
+several repeats, then one tracemalloc run for the allocation peak. Results
+are written as JSON so runs can be compared (see benchmarks/compare.py).
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --scales 10k 1M 50M --repeats 5
+    python benchmarks/run_benchmarks.py --output benchmarks/results/baseline.json
+"""
+
+import argparse
+import contextlib
+import copy
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+from datetime import datetime
+from typing import Dict, List, Any, Callable
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+import pandas as pd
+
+from src.orchestrator.orchestrator import Orchestrator
+from src.utils.dataset import AdsDataset
+from src.utils.helpers import load_config, get_default_config
+from src.utils.profiling import StageProfiler
+from src.utils.synthetic_data import (
+    write_synthetic_csv, synthetic_options, synthetic_file_name, row_count_label, parse_row_count
+)
+
+
+# Bump when the result layout changes
+BENCHMARK_VERSION = 1
+
+BENCHMARK_STAGES = ['data_agent', 'insight_agent', 'evaluator', 'creative_agent', 'orchestrator']
+
+
+def benchmark_settings(config: Dict[str, Any]) -> Dict[str, Any]:
+    """The 'benchmark' config section with defaults filled in"""
+    bench_config = config.get('benchmark', {})
+    return {
+        "scales": [parse_row_count(scale) for scale in bench_config.get('scales', ['10k', '100k', '1M'])],
+        "repeats": bench_config.get('repeats', 3),
+        "query": bench_config.get('query', 'Analyze ROAS drop in last 30 days'),
+        "data_dir": bench_config.get('data_dir', 'data/.bench'),
+        "results_dir": bench_config.get('results_dir', 'benchmarks/results')
+    }
+
+
+def prepare_dataset(rows: int, config: Dict[str, Any], data_dir: str) -> Dict[str, Any]:
+    """Generate the synthetic CSV for a scale, reusing an earlier file with the same shape"""
+    options = synthetic_options(config)
+    path = os.path.join(data_dir, synthetic_file_name(rows, options))
+    if os.path.exists(path):
+        return {"path": path, "rows": rows, "bytes": os.path.getsize(path)}
+    print(f"[BENCHMARK] Generating {row_count_label(rows)} rows -> {path}")
+    return write_synthetic_csv(path, rows, **options)
+
+
+def measure(func: Callable[[], Any], repeats: int) -> Dict[str, Any]:
+    """
+    Time func over repeats runs, then trace one more run's allocations
+    
+    Returns:
+        {'wall_time': {'min', 'median', 'max'}, 'cpu_time', 'peak_memory_bytes', 'repeats'}
+        (times in seconds; cpu_time is the median)
+    """
+    timer = StageProfiler(enabled=True, trace_memory=False)
+    walls, cpus = [], []
+    for _ in range(repeats):
+        with timer.profile("benchmark") as metrics:
+            func()
+        walls.append(metrics["wall_time"])
+        cpus.append(metrics["cpu_time"])
+    
+    with StageProfiler(enabled=True, trace_memory=True).profile("benchmark") as memory:
+        func()
+    
+    return {
+        "wall_time": {"min": min(walls), "median": statistics.median(walls), "max": max(walls)},
+        "cpu_time": statistics.median(cpus),
+        "peak_memory_bytes": memory["peak_memory_bytes"],
+        "repeats": repeats
+    }
+
+
+def benchmark_scale(data_path: str, config: Dict[str, Any], query: str, repeats: int) -> Dict[str, Dict[str, Any]]:
+    """
+    Measure every stage against one data file
+    
+    Each agent stage gets its inputs from one untimed upstream run, so a
+    stage's numbers cover only its own work. DataAgent reads the file cold
+    (fresh dataset handle) every run, as a new process would.
+    """
+    with tempfile.TemporaryDirectory() as output_dir:
+        run_config = copy.deepcopy(config)
+        run_config['data_path'] = data_path
+        run_config['stage_cache'] = {'enabled': False}
+        run_config['profiling'] = {'enabled': False}
+        run_config['output'] = {**run_config.get('output', {}), 'reports_dir': output_dir, 'logs_dir': output_dir}
+        
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            orchestrator = Orchestrator(run_config)
+            dataset = AdsDataset(data_path, run_config)
+            latest_date = dataset.latest_date
+            plan = orchestrator.planner.execute(query, {"latest_date": latest_date} if latest_date else {})
+            
+            data = orchestrator.data_agent.execute(plan, dataset)
+            if data.get('error'):
+                raise RuntimeError(f"Data Agent failed on {data_path}: {data.get('message')}")
+            insights = orchestrator.insight_agent.execute(data, plan)
+            validated = orchestrator.evaluator.execute(insights, data)
+            
+            stages = {
+                "data_agent": lambda: orchestrator.data_agent.execute(plan, AdsDataset(data_path, run_config)),
+                "insight_agent": lambda: orchestrator.insight_agent.execute(data, plan),
+                "evaluator": lambda: orchestrator.evaluator.execute(insights, data),
+                "creative_agent": lambda: orchestrator.creative_agent.execute(validated, plan.get('objectives', [])),
+                "orchestrator": lambda: orchestrator.execute(query)
+            }
+            return {stage: measure(stages[stage], repeats) for stage in BENCHMARK_STAGES}
+
+
+def environment_info() -> Dict[str, Any]:
+    """Where the numbers were measured"""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__
+    }
+
+
+def run_suite(config: Dict[str, Any], scales: List[int] = None, repeats: int = None,
+              query: str = None, data_dir: str = None) -> Dict[str, Any]:
+    """
+    Run the benchmark at every scale
+    
+    Args:
+        config: System configuration (benchmark, synthetic_data and agent sections)
+        scales: Row counts (default: benchmark.scales)
+        repeats: Timed runs per stage (default: benchmark.repeats)
+        query: Query used for planning and the full run (default: benchmark.query)
+        data_dir: Where generated CSVs are kept (default: benchmark.data_dir)
+    
+    Returns:
+        Benchmark results (BENCHMARK_VERSION layout)
+    """
+    settings = benchmark_settings(config)
+    scales = scales or settings["scales"]
+    repeats = repeats or settings["repeats"]
+    query = query or settings["query"]
+    data_dir = data_dir or settings["data_dir"]
+    
+    results = {
+        "benchmark_version": BENCHMARK_VERSION,
+        "created_at": datetime.now().isoformat(),
+        "environment": environment_info(),
+        "settings": {
+            "repeats": repeats,
+            "query": query,
+            "synthetic_data": synthetic_options(config)
+        },
+        "scales": {}
+    }
+    
+    for rows in scales:
+        label = row_count_label(rows)
+        data_file = prepare_dataset(rows, config, data_dir)
+        print(f"[BENCHMARK] Measuring {label} rows ({data_file['bytes'] / 1024 / 1024:.1f} MB)")
+        stages = benchmark_scale(data_file["path"], config, query, repeats)
+        results["scales"][label] = {"rows": rows, "data_bytes": data_file["bytes"], "stages": stages}
+        for stage, metrics in stages.items():
+            print(f"  {stage:<15} {metrics['wall_time']['median'] * 1000:>10.1f} ms"
+                  f"  {metrics['peak_memory_bytes'] / 1024 / 1024:>8.1f} MB peak")
+    
+    return results
+
+
+def save_results(results: Dict[str, Any], path: str):
+    """Write results JSON"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"[BENCHMARK] ✓ Saved {path}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Time and memory-profile every agent at several data scales")
+    parser.add_argument('--config', default='config/config.yaml', help="Configuration file")
+    parser.add_argument('--scales', nargs='+', help="Row counts, e.g. 10k 1M 50M (default: benchmark.scales)")
+    parser.add_argument('--repeats', type=int, help="Timed runs per stage (default: benchmark.repeats)")
+    parser.add_argument('--query', help="Query to plan and run (default: benchmark.query)")
+    parser.add_argument('--output', help="Results JSON path (default: <results_dir>/<timestamp>.json)")
+    args = parser.parse_args(argv)
+    
+    config = load_config(args.config) if os.path.exists(args.config) else get_default_config()
+    scales = [parse_row_count(scale) for scale in args.scales] if args.scales else None
+    
+    results = run_suite(config, scales=scales, repeats=args.repeats, query=args.query)
+    
+    output = args.output or os.path.join(
+        benchmark_settings(config)["results_dir"], f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    save_results(results, output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
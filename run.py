@@ -5,6 +5,8 @@ Usage:
     python run.py "Analyze ROAS drop in last 30 days"
     python run.py "How can I improve my Facebook ads?"
     python run.py "Why is my CTR declining?"
+    python run.py --batch queries.txt     (one query per line; '-' reads stdin)
+    python run.py --serve [port]          (local HTTP server with warm data)
 """
 
 import sys
@@ -15,9 +17,50 @@ from datetime import datetime
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from orchestrator.orchestrator import Orchestrator
+from orchestrator.server import AnalysisServer
 from utils.helpers import load_config, get_default_config, print_banner
 
 
+def read_batch_queries(source: str) -> list:
+    """Queries for batch mode, one per line ('#' comments and blank lines skipped)"""
+    if source == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.strip().startswith('#')]
+
+
+def run_batch(orchestrator: Orchestrator, queries: list) -> int:
+    """Run many queries with one shared data pass and print a per-query summary"""
+    all_results = orchestrator.execute_batch(queries)
+    
+    print("\n" + "="*80)
+    print(f"📈 BATCH COMPLETE - {len(all_results)} queries")
+    print("="*80)
+    
+    failures = 0
+    for i, results in enumerate(all_results, 1):
+        if results.get('error', False):
+            failures += 1
+            print(f"\n❌ {i}. {results['query']}")
+            print(f"   Error: {results.get('error_details', {}).get('error', 'Unknown error')}")
+            continue
+        print(f"\n✓ {i}. {results['query']}")
+        print(f"   Insights: {len(results['insights'])} | Creatives: {len(results['creatives'])} | "
+              f"Time: {results['execution_time_seconds']:.2f}s")
+        print(f"   📁 {results['output_dir']}")
+    
+    print("\n" + "="*80)
+    if failures:
+        print(f"⚠ {failures} of {len(all_results)} queries failed")
+        print("="*80 + "\n")
+        return 1
+    print("✅ SUCCESS - All queries analyzed!")
+    print("="*80 + "\n")
+    return 0
+
+
 def main():
     """Main execution function"""
     
@@ -34,11 +77,36 @@ def main():
         print('  python run.py "Analyze ROAS drop in last 30 days"')
         print('  python run.py "Why is my CTR declining?"')
         print('  python run.py "How can I improve my Facebook ads?"')
+        print('  python run.py --batch queries.txt')
+        print('  python run.py --serve 8765')
         sys.exit(1)
     
-    user_query = sys.argv[1]
+    batch_queries = None
+    serve = sys.argv[1] == '--serve'
+    if serve:
+        try:
+            serve_port = int(sys.argv[2]) if len(sys.argv) > 2 else None
+        except ValueError:
+            print(f"\n❌ Error: Invalid port '{sys.argv[2]}'")
+            sys.exit(1)
+        print("\n🌐 Server mode")
+    elif sys.argv[1] == '--batch':
+        if len(sys.argv) < 3:
+            print("\n❌ Error: --batch needs a query file (or '-' for stdin)")
+            sys.exit(1)
+        try:
+            batch_queries = read_batch_queries(sys.argv[2])
+        except OSError as e:
+            print(f"\n❌ Error reading batch file: {str(e)}")
+            sys.exit(1)
+        if not batch_queries:
+            print("\n❌ Error: No queries found in batch input")
+            sys.exit(1)
+        print(f"\n📊 Batch: {len(batch_queries)} queries")
+    else:
+        user_query = sys.argv[1]
+        print(f"\n📊 Query: {user_query}")
     
-    print(f"\n📊 Query: {user_query}")
     print(f"⏰ Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
     
     # Load configuration
@@ -49,6 +117,14 @@ def main():
         print(f"⚠ Warning: Could not load config file, using defaults")
         config = get_default_config()
     
+    if serve:
+        try:
+            AnalysisServer(config, port=serve_port).serve_forever()
+        except Exception as e:
+            print(f"\n❌ Error starting server: {str(e)}")
+            return 1
+        return 0
+    
     # Initialize orchestrator
     try:
         orchestrator = Orchestrator(config)
@@ -56,6 +132,13 @@ def main():
         print(f"\n❌ Error initializing orchestrator: {str(e)}")
         sys.exit(1)
     
+    if batch_queries is not None:
+        try:
+            return run_batch(orchestrator, batch_queries)
+        except KeyboardInterrupt:
+            print("\n\n⚠ Analysis interrupted by user")
+            return 1
+    
     # Execute analysis
     try:
         results = orchestrator.execute(user_query)
@@ -6,9 +6,17 @@ Column mapping: CSV uses lowercase (date, spend, impressions, clicks, purchases,
 import pandas as pd
 import numpy as np
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
 import os
 
+from src.utils.dataset import AdsDataset, RawDataView, sort_by_date, date_bounds
+from src.utils.date_cube import DateCube
+from src.utils.streaming import WindowAccumulator
+from src.utils.rollup_store import span_quality_report
+from src.utils.sampling import StratifiedSample, normal_interval, change_interval
+from src.utils.bootstrap import BootstrapEngine
+from src.utils.significance import welch_t_test, benjamini_hochberg
+
 
 class DataAgent:
     """
@@ -19,151 +27,496 @@ class DataAgent:
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self.data_path = config.get('data_path', 'data/synthetic_fb_ads_undergarments.csv')
+        data_agent_config = config.get('agents', {}).get('data_agent', {})
+        self.pushdown_date_filter = data_agent_config.get('pushdown_date_filter', True)
+        self.streaming = data_agent_config.get('streaming', False)
+        self.streaming_memory_mb = data_agent_config.get('streaming_memory_mb', 512)
+        self.use_sample_data = config.get('use_sample_data', False)
+        self.sample_rate = data_agent_config.get('sample_rate', 0.1)
+        self.sample_min_rows = data_agent_config.get('sample_min_rows', 1000000)
+        self.sample_min_per_stratum = data_agent_config.get('sample_min_per_stratum', 2)
+        self.segment_fdr = data_agent_config.get('segment_fdr')
+        self.random_seed = config.get('random_seed', 42)
+        self.bootstrap = BootstrapEngine.from_config(config)
         self.df = None
+        self.date_index = None
     
-    def execute(self, plan: Dict[str, Any]) -> Dict[str, Any]:
+    def execute(self, plan: Dict[str, Any], dataset: AdsDataset = None) -> Dict[str, Any]:
         """
         Main execution method for the Data Agent
         
         Args:
             plan: Analysis plan from Planner Agent
+            dataset: Shared dataset handle (loaded here if not provided)
         
         Returns:
             Processed data with aggregated metrics
         """
+        return self.execute_batch([plan], dataset)[0]
+    
+    def execute_batch(self, plans: List[Dict[str, Any]], dataset: AdsDataset = None) -> List[Dict[str, Any]]:
+        """
+        Answer many plans from one data pass
+        
+        The union of all plans' windows is loaded (or streamed) once and one
+        DateCube is built over the union of their segments; each plan's
+        windows and segments are then answered from that cube.
+        
+        Args:
+            plans: Analysis plans from Planner Agent
+            dataset: Shared dataset handle (loaded here if not provided)
+        
+        Returns:
+            One Data Agent output per plan, in order
+        """
         print(f"\n[DATA AGENT] Loading data from {self.data_path}")
+        if len(plans) > 1:
+            print(f"[DATA AGENT] Answering {len(plans)} plans from one data pass")
+        
+        if dataset is None:
+            dataset = AdsDataset(self.data_path, self.config)
         
-        # Load data
-        self.df = self._load_data()
+        windows = [self._window_dates(plan) for plan in plans]
+        segments = list(dict.fromkeys(segment for plan in plans for segment in plan.get('segments', [])))
+        if self.bootstrap.enabled and self.bootstrap.unit == 'adset' and 'adset_name' not in segments:
+            # Adset-level bootstrap units need the adset in the cube's grain
+            segments.append('adset_name')
+        
+        if dataset.rollup_enabled:
+            return self._execute_rollup(plans, windows, segments, dataset)
+        
+        if self.streaming:
+            return self._execute_streaming(plans, windows, segments, dataset)
+        
+        return self._execute_in_memory(plans, windows, segments, dataset)
+    
+    def _execute_in_memory(self, plans: List[Dict[str, Any]],
+                           windows: List[Dict[str, Tuple[pd.Timestamp, pd.Timestamp]]],
+                           segments: List[str], dataset: AdsDataset) -> List[Dict[str, Any]]:
+        """Row-level path: load the plans' span once and slice each plan's windows from it"""
+        # Load data (reuses the already-parsed frame when the handle is shared)
+        self.df = self._load_data(dataset, windows)
         
         if self.df is None:
-            return self._create_error_response("Failed to load data")
+            return [self._create_error_response("Failed to load data") for _ in plans]
         
-        print(f"[DATA AGENT] Loaded {len(self.df)} rows")
+        print(f"[DATA AGENT] Loaded {len(self.df)} of {dataset.total_rows} rows")
         
-        # Ensure date column is datetime
-        self.df['date'] = pd.to_datetime(self.df['date'])
+        # Keep the frame date-sorted so time windows are binary-search slices
+        self.df = sort_by_date(self.df)
+        self.date_index = pd.DatetimeIndex(self.df['date'])
         
-        # Calculate derived metrics
-        self._calculate_metrics()
+        # One pass over the rows (or a stratified sample of them) builds the
+        # prefix-sum cube; every window and segment total below is answered from it
+        sample = self._draw_sample(self.df)
+        if sample is not None:
+            cube = DateCube.from_frame(sample.frame, segments, weights=sample.weights)
+        else:
+            cube = DateCube.from_frame(self.df, segments)
+        date_range = dataset.date_range()
         
-        # Filter by time windows
-        baseline_data = self._filter_by_date_range(
-            plan['time_windows']['baseline']['start_date'],
-            plan['time_windows']['baseline']['end_date']
-        )
+        results = []
+        for plan, window_dates in zip(plans, windows):
+            # Filter by time windows (positional bounds in the sorted frame)
+            bounds = {name: self._window_bounds(*window_dates[name]) for name in window_dates}
+            baseline_data = self.df.iloc[slice(*bounds['baseline'])]
+            comparison_data = self.df.iloc[slice(*bounds['comparison'])]
+            
+            # Quality covers the plan's span, as in the streaming and rollup paths
+            plan_rows = self.df.iloc[slice(*self._window_bounds(*self._date_span([window_dates])))]
+            
+            results.append(self._result_from_cube(
+                plan, cube, window_dates, dataset.total_rows, len(plan_rows), date_range,
+                self._generate_quality_report(plan_rows),
+                # Row-level data is only materialized (with derived metrics) on request
+                raw_data=RawDataView(
+                    {"baseline": baseline_data, "comparison": comparison_data},
+                    enrich=self._calculate_metrics
+                ),
+                sample=sample
+            ))
         
-        comparison_data = self._filter_by_date_range(
-            plan['time_windows']['comparison']['start_date'],
-            plan['time_windows']['comparison']['end_date']
+        return results
+    
+    def _execute_streaming(self, plans: List[Dict[str, Any]],
+                           windows: List[Dict[str, Tuple[pd.Timestamp, pd.Timestamp]]],
+                           segments: List[str], dataset: AdsDataset) -> List[Dict[str, Any]]:
+        """
+        Streaming variant of execute for exports larger than RAM
+        
+        The CSV is read in chunks sized to the memory budget; each chunk is
+        folded into a (date, *segments) rollup and dropped, and the rollup
+        feeds the same DateCube as the in-memory path. Produces the same
+        metrics, segments and quality report; raw_data is None since no rows
+        are retained.
+        """
+        accumulator = WindowAccumulator(
+            {f"{index}_{name}": window for index, window_dates in enumerate(windows) for name, window in window_dates.items()},
+            segments
         )
+        chunk_rows = self._streaming_chunk_rows(dataset)
+        print(f"[DATA AGENT] Streaming in chunks of {chunk_rows} rows ({self.streaming_memory_mb} MB budget)")
         
-        print(f"[DATA AGENT] Baseline period: {len(baseline_data)} rows")
-        print(f"[DATA AGENT] Comparison period: {len(comparison_data)} rows")
+        try:
+            for chunk in dataset.iter_chunks(chunk_rows):
+                accumulator.add(chunk)
+        except FileNotFoundError:
+            print(f"[DATA AGENT] ERROR: File not found at {self.data_path}")
+            return [self._create_error_response("Failed to load data") for _ in plans]
+        except Exception as e:
+            print(f"[DATA AGENT] ERROR: {str(e)}")
+            return [self._create_error_response("Failed to load data") for _ in plans]
         
-        # Compute aggregated metrics
-        baseline_metrics = self._compute_aggregate_metrics(baseline_data)
-        comparison_metrics = self._compute_aggregate_metrics(comparison_data)
+        print(f"[DATA AGENT] Streamed {accumulator.total_rows} rows, {accumulator.span_rows} in the analysis windows")
         
-        # Calculate changes
-        metric_changes = self._calculate_metric_changes(baseline_metrics, comparison_metrics)
+        cube = accumulator.cube() if accumulator.rollup is not None else None
+        date_range = {"min": accumulator.min_date, "max": accumulator.max_date} if accumulator.total_rows else {}
         
-        # Segment analysis
-        segment_analysis = self._analyze_segments(
-            baseline_data, 
-            comparison_data, 
-            plan.get('segments', [])
-        )
+        results = []
+        for plan, window_dates in zip(plans, windows):
+            span = self._date_span([window_dates])
+            span_rows = int(cube.totals({"span": span})['rows']['span']) if cube is not None else 0
+            results.append(self._result_from_cube(
+                plan, cube, window_dates, accumulator.total_rows, span_rows, date_range,
+                accumulator.quality_report(*span)
+            ))
+        
+        return results
+    
+    def _execute_rollup(self, plans: List[Dict[str, Any]],
+                        windows: List[Dict[str, Tuple[pd.Timestamp, pd.Timestamp]]],
+                        segments: List[str], dataset: AdsDataset) -> List[Dict[str, Any]]:
+        """
+        Answer the plans from the materialized daily rollup
+        
+        The rollup is refreshed incrementally (only rows past its watermark
+        are parsed) and holds per-day sums at the full dimension grain plus
+        quality counters, so no raw rows are read for unchanged history.
+        raw_data is None since rows are not retained.
+        """
+        rollup = dataset.rollup()
+        if rollup is None:
+            return [self._create_error_response("Failed to load data") for _ in plans]
+        
+        if len(rollup) == 0:
+            return [self._result_from_cube(plan, None, window_dates, 0, 0, {}, {}) for plan, window_dates in zip(plans, windows)]
+        
+        print(f"[DATA AGENT] Using rollup with {len(rollup)} day x dimension rows")
+        
+        cube = DateCube(rollup, segments)
+        date_range = dataset.date_range()
+        
+        results = []
+        for plan, window_dates in zip(plans, windows):
+            span_start, span_end = self._date_span([window_dates])
+            span = rollup[(rollup['date'] >= span_start) & (rollup['date'] <= span_end)]
+            results.append(self._result_from_cube(
+                plan, cube, window_dates, dataset.total_rows, int(span['rows'].sum()), date_range,
+                span_quality_report(rollup, span_start, span_end)
+            ))
+        
+        return results
+    
+    def _result_from_cube(self, plan: Dict[str, Any], cube: DateCube,
+                          window_dates: Dict[str, Tuple[pd.Timestamp, pd.Timestamp]],
+                          total_rows: int, loaded_rows: int, date_range: Dict[str, pd.Timestamp],
+                          quality_report: Dict[str, Any], raw_data: RawDataView = None,
+                          sample: StratifiedSample = None) -> Dict[str, Any]:
+        """
+        Data Agent output for one plan, answered from a (possibly shared) date cube
+        
+        When the cube was built from a sample, metric_changes carry 95%
+        confidence intervals and data_summary describes the sample.
+        """
+        if cube is None:
+            baseline_rows = comparison_rows = 0
+            baseline_metrics, comparison_metrics, metric_changes = {}, {}, {}
+            segment_analysis, daily_totals = {}, {}
+        else:
+            window_rows = cube.totals(window_dates)['rows']
+            # Weighted (estimated) when sampled: round rather than truncate
+            baseline_rows = int(round(window_rows['baseline']))
+            comparison_rows = int(round(window_rows['comparison']))
+            baseline_metrics, comparison_metrics, metric_changes = self._aggregate_windows(cube, window_dates)
+            if sample is not None:
+                self._add_confidence_intervals(metric_changes, sample, window_dates)
+            segment_analysis = self._analyze_segments(
+                cube, window_dates, plan.get('segments', []), plan.get('segment_top_k', 3)
+            )
+            daily_totals = self._daily_totals(cube, window_dates)
+            if self.bootstrap.enabled and metric_changes:
+                self._add_bootstrap_intervals(metric_changes, segment_analysis, cube, window_dates)
         
-        # Data quality report
-        quality_report = self._generate_quality_report()
+        print(f"[DATA AGENT] Baseline period: {baseline_rows} rows")
+        print(f"[DATA AGENT] Comparison period: {comparison_rows} rows")
         
         result = {
             "data_summary": {
-                "total_rows": len(self.df),
-                "baseline_rows": len(baseline_data),
-                "comparison_rows": len(comparison_data),
+                "total_rows": total_rows,
+                "loaded_rows": loaded_rows,
+                "baseline_rows": baseline_rows,
+                "comparison_rows": comparison_rows,
                 "date_range": {
-                    "min": self.df['date'].min().strftime('%Y-%m-%d'),
-                    "max": self.df['date'].max().strftime('%Y-%m-%d')
+                    "min": date_range['min'].strftime('%Y-%m-%d') if date_range else None,
+                    "max": date_range['max'].strftime('%Y-%m-%d') if date_range else None
                 }
             },
             "baseline_metrics": baseline_metrics,
             "comparison_metrics": comparison_metrics,
             "metric_changes": metric_changes,
             "segment_analysis": segment_analysis,
+            "daily_totals": daily_totals,
             "data_quality_report": quality_report,
-            "raw_data": {
-                "baseline": baseline_data.to_dict('records'),
-                "comparison": comparison_data.to_dict('records')
-            }
+            # None on the streaming and rollup paths, which keep no rows
+            "raw_data": raw_data
         }
+        if sample is not None:
+            result["data_summary"]["sampling"] = sample.summary()
         
         print(f"[DATA AGENT] Processing complete")
         
         return result
     
-    def _load_data(self) -> pd.DataFrame:
-        """Load CSV data"""
-        try:
-            df = pd.read_csv(self.data_path)
-            return df
-        except FileNotFoundError:
-            print(f"[DATA AGENT] ERROR: File not found at {self.data_path}")
-            return None
-        except Exception as e:
-            print(f"[DATA AGENT] ERROR: {str(e)}")
+    def _draw_sample(self, df: pd.DataFrame) -> StratifiedSample:
+        """
+        Stratified (date x campaign) sample of the loaded rows, or None for exact processing
+        
+        Sampling applies only with use_sample_data and at least sample_min_rows
+        loaded rows; smaller frames are cheap enough to process exactly.
+        """
+        if not self.use_sample_data or len(df) < self.sample_min_rows or self.sample_rate >= 1:
             return None
+        
+        sample = StratifiedSample.draw(
+            df, ['date', 'campaign_name'], self.sample_rate, self.sample_min_per_stratum, self.random_seed
+        )
+        print(f"[DATA AGENT] Sampled {len(sample.frame)} of {len(df)} rows "
+              f"({self.sample_rate:.0%} of each of {len(sample.population)} date x campaign strata)")
+        return sample
     
-    def _calculate_metrics(self):
-        """Calculate derived metrics"""
+    def _add_confidence_intervals(self, metric_changes: Dict[str, Any], sample: StratifiedSample,
+                                  windows: Dict[str, Tuple[pd.Timestamp, pd.Timestamp]]):
+        """
+        Attach 95% confidence intervals (and standard errors) of the sampled estimates to metric_changes
+        
+        Strata include the date, so each window is a union of whole strata.
+        The windows are treated as independent samples for the change interval.
+        """
+        dates = sample.frame['date']
+        estimates = {
+            name: sample.estimates(((dates >= start) & (dates <= end)).to_numpy())
+            for name, (start, end) in windows.items()
+        }
+        
+        for metric, change in metric_changes.items():
+            if metric not in estimates['baseline'] or metric not in estimates['comparison']:
+                continue
+            baseline = estimates['baseline'][metric]
+            comparison = estimates['comparison'][metric]
+            change_low, change_high = change_interval(baseline, comparison)
+            change["confidence_interval"] = {
+                "level": 0.95,
+                "baseline": [round(float(bound), 2) for bound in normal_interval(*baseline)],
+                "comparison": [round(float(bound), 2) for bound in normal_interval(*comparison)],
+                "standard_error": {"baseline": round(float(baseline[1]), 6), "comparison": round(float(comparison[1]), 6)},
+                "percent_change": [
+                    round(float(change_low), 2) if change_low is not None else None,
+                    round(float(change_high), 2) if change_high is not None else None
+                ]
+            }
+    
+    def _add_bootstrap_intervals(self, metric_changes: Dict[str, Any], segment_analysis: Dict[str, Any],
+                                 cube: DateCube, windows: Dict[str, Tuple[pd.Timestamp, pd.Timestamp]]):
+        """
+        Attach bootstrap percentile intervals to metric_changes and the segment performers
+        
+        The units are each window's days (or adsets, with bootstrap_unit
+        'adset'). The overall totals and every reported segment value are
+        resampled in one batch; segment values are resampled over their own units.
+        """
+        unit = 'adset_name' if self.bootstrap.unit == 'adset' and 'adset_name' in cube.segments else 'date'
+        columns = [col for col in cube.columns if col != 'rows']
+        
+        # Group 0 is the overall totals, then one group per reported segment value
+        reported = {
+            segment: pd.Index(pd.unique(pd.Series([
+                record[segment] for record in analysis['top_performers'] + analysis['bottom_performers']
+            ], dtype=object)))
+            for segment, analysis in segment_analysis.items()
+        }
+        offsets, n_groups = {}, 1
+        for segment, values in reported.items():
+            offsets[segment] = n_groups
+            n_groups += len(values)
+        
+        units = {}
+        for name, (start, end) in windows.items():
+            overall = cube.grouped_totals([unit], start, end)
+            values, groups = [overall[columns].to_numpy()], [np.zeros(len(overall), dtype=np.int64)]
+            for segment, segment_values in reported.items():
+                # An adset segment has one adset per value: resample its days instead
+                segment_unit = 'date' if segment == unit else unit
+                totals = cube.grouped_totals([segment, segment_unit], start, end)
+                position = segment_values.get_indexer(totals.index.get_level_values(0))
+                keep = position >= 0
+                values.append(totals[columns].to_numpy()[keep])
+                groups.append(offsets[segment] + position[keep])
+            units[name] = (np.vstack(values), np.concatenate(groups))
+        
+        intervals = self.bootstrap.change_intervals(units['baseline'], units['comparison'], n_groups, columns)
+        
+        def bounds(array: np.ndarray) -> List[float]:
+            return [round(float(bound), 2) if np.isfinite(bound) else None for bound in array]
+        
+        def p_value(value: float) -> float:
+            return round(float(value), 4) if np.isfinite(value) else None
+        
+        for metric, change in metric_changes.items():
+            if metric in intervals:
+                change["bootstrap"] = {
+                    "level": self.bootstrap.level,
+                    "unit": self.bootstrap.unit,
+                    "resamples": self.bootstrap.resamples,
+                    "baseline": bounds(intervals[metric]["baseline"][0]),
+                    "comparison": bounds(intervals[metric]["comparison"][0]),
+                    "percent_change": bounds(intervals[metric]["percent_change"][0]),
+                    "p_value": p_value(intervals[metric]["p_value"][0])
+                }
+        
+        for segment, analysis in segment_analysis.items():
+            for record in analysis['top_performers'] + analysis['bottom_performers']:
+                group = offsets[segment] + reported[segment].get_indexer([record[segment]])[0]
+                record["bootstrap"] = {
+                    metric: {
+                        "percent_change": bounds(intervals[metric]["percent_change"][group]),
+                        "p_value": p_value(intervals[metric]["p_value"][group])
+                    }
+                    for metric in ('roas', 'ctr', 'cpc') if metric in intervals
+                }
+    
+    def _streaming_chunk_rows(self, dataset: AdsDataset) -> int:
+        """Chunk size that keeps one parsed chunk (plus parser overhead) within the memory budget"""
+        row_bytes = dataset.estimate_row_bytes()
+        if row_bytes <= 0:
+            return dataset.chunk_rows
+        # read_csv holds raw text and converted columns at once: allow ~3x the parsed size
+        budget = self.streaming_memory_mb * 1024 * 1024
+        return max(1000, int(budget / (row_bytes * 3)))
+    
+    def _load_data(self, dataset: AdsDataset,
+                   windows: List[Dict[str, Tuple[pd.Timestamp, pd.Timestamp]]]) -> pd.DataFrame:
+        """
+        Load CSV data through the shared dataset handle
+        
+        With pushdown enabled only the span covering every plan's baseline
+        and comparison windows is read; nothing outside it is used by the analysis.
+        """
+        if not self.pushdown_date_filter:
+            return dataset.df
+        
+        return dataset.load_span(*self._date_span(windows))
+    
+    def _date_span(self, windows: List[Dict[str, Tuple[pd.Timestamp, pd.Timestamp]]]) -> Tuple[pd.Timestamp, pd.Timestamp]:
+        """Earliest start and latest end over the given plans' windows"""
+        dates = [window for window_dates in windows for window in window_dates.values()]
+        return min(start for start, _ in dates), max(end for _, end in dates)
+    
+    def _calculate_metrics(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Calculate derived per-row metrics (returns a new frame, df is untouched)"""
         # Already have roas, ctr, purchases, revenue from CSV
         # Map column names to match CSV
-        if 'spend' in self.df.columns:
+        if 'spend' not in df.columns:
+            return df
+        
+        return df.assign(
             # CTR already in CSV but let's ensure it's calculated correctly
-            self.df['ctr_calc'] = np.where(
-                self.df['impressions'] > 0,
-                (self.df['clicks'] / self.df['impressions']) * 100,
+            ctr_calc=np.where(
+                df['impressions'] > 0,
+                (df['clicks'] / df['impressions']) * 100,
                 0
-            )
-            
+            ),
             # CPC = Spend / Clicks
-            self.df['cpc'] = np.where(
-                self.df['clicks'] > 0,
-                self.df['spend'] / self.df['clicks'],
+            cpc=np.where(
+                df['clicks'] > 0,
+                df['spend'] / df['clicks'],
                 0
-            )
-            
+            ),
             # CPM = (Spend / Impressions) * 1000
-            self.df['cpm'] = np.where(
-                self.df['impressions'] > 0,
-                (self.df['spend'] / self.df['impressions']) * 1000,
+            cpm=np.where(
+                df['impressions'] > 0,
+                (df['spend'] / df['impressions']) * 1000,
                 0
-            )
-            
+            ),
             # Conversion Rate = Purchases / Clicks
-            self.df['conversion_rate'] = np.where(
-                self.df['clicks'] > 0,
-                (self.df['purchases'] / self.df['clicks']) * 100,
+            conversion_rate=np.where(
+                df['clicks'] > 0,
+                (df['purchases'] / df['clicks']) * 100,
                 0
             )
+        )
     
-    def _filter_by_date_range(self, start_date: str, end_date: str) -> pd.DataFrame:
-        """Filter dataframe by date range"""
-        start = pd.to_datetime(start_date)
-        end = pd.to_datetime(end_date)
-        return self.df[(self.df['date'] >= start) & (self.df['date'] <= end)].copy()
+    def _window_bounds(self, start_date: str, end_date: str) -> Tuple[int, int]:
+        """Positional [lo, hi) bounds of an inclusive date range in the sorted frame"""
+        return date_bounds(self.date_index, start_date, end_date)
     
-    def _compute_aggregate_metrics(self, df: pd.DataFrame) -> Dict[str, float]:
-        """Compute aggregated metrics for a dataframe - using lowercase CSV column names"""
-        if len(df) == 0:
-            return {}
+    def _window_dates(self, plan: Dict[str, Any]) -> Dict[str, Tuple[pd.Timestamp, pd.Timestamp]]:
+        """Inclusive (start, end) dates of the baseline and comparison windows"""
+        return {
+            name: (
+                pd.to_datetime(plan['time_windows'][name]['start_date']),
+                pd.to_datetime(plan['time_windows'][name]['end_date'])
+            )
+            for name in ('baseline', 'comparison')
+        }
+    
+    def _aggregate_windows(self, cube: DateCube,
+                           windows: Dict[str, Tuple[pd.Timestamp, pd.Timestamp]]) -> Tuple[Dict, Dict, Dict]:
+        """
+        Aggregate the baseline and comparison windows from the date cube
+        
+        Each window's totals are the difference of two prefix rows, so the
+        raw rows are not scanned again (the windows may share a boundary day).
+        
+        Args:
+            cube: Prefix-sum cube over the loaded rows
+            windows: {'baseline': (start, end), 'comparison': (start, end)} inclusive dates
+        
+        Returns:
+            (baseline_metrics, comparison_metrics, metric_changes)
+        """
+        totals = cube.totals(windows)
+        
+        metrics = {}
+        for name in windows:
+            window_totals = totals.loc[name]
+            metrics[name] = self._metrics_from_totals(window_totals) if window_totals['rows'] > 0 else {}
         
-        total_spend = df['spend'].sum()
-        total_revenue = df['revenue'].sum()
-        total_impressions = df['impressions'].sum()
-        total_clicks = df['clicks'].sum()
-        total_purchases = df['purchases'].sum()
+        baseline_metrics = metrics['baseline']
+        comparison_metrics = metrics['comparison']
+        return baseline_metrics, comparison_metrics, self._calculate_metric_changes(baseline_metrics, comparison_metrics)
+    
+    def _daily_totals(self, cube: DateCube,
+                      windows: Dict[str, Tuple[pd.Timestamp, pd.Timestamp]]) -> Dict[str, Dict[str, List]]:
+        """
+        Per-day additive totals of each window, for day-level tests downstream
+        
+        Returns:
+            {window: {'date': [...], <column>: [...], 'rows': [...]}} (days with data only)
+        """
+        daily = {}
+        for name, (start, end) in windows.items():
+            totals = cube.daily_totals(start, end)
+            daily[name] = {"date": [day.strftime('%Y-%m-%d') for day in totals.index]}
+            daily[name].update({col: totals[col].tolist() for col in totals.columns})
+        return daily
+    
+    def _metrics_from_totals(self, totals) -> Dict[str, float]:
+        """Derive the aggregate metric dict from summed additive columns"""
+        total_spend = totals['spend']
+        total_revenue = totals['revenue']
+        total_impressions = totals['impressions']
+        total_clicks = totals['clicks']
+        total_purchases = totals['purchases']
         
         return {
             "spend": round(total_spend, 2),
@@ -202,48 +555,173 @@ class DataAgent:
         
         return changes
     
-    def _analyze_segments(self, baseline_df: pd.DataFrame, comparison_df: pd.DataFrame, 
-                         segments: List[str]) -> Dict[str, Any]:
-        """Analyze performance by segments"""
-        segment_analysis = {}
+    def _analyze_segments(self, cube: DateCube, windows: Dict[str, Tuple[pd.Timestamp, pd.Timestamp]],
+                          segments: List[str], top_k: int = 3) -> Dict[str, Any]:
+        """
+        Analyze performance by segments, baseline vs comparison
         
-        for segment in segments:
-            if segment not in baseline_df.columns:
-                continue
+        Per-segment window totals come from the cube's per-day x segment
+        prefix sums; segment values without comparison-period rows are left out.
+        
+        Args:
+            cube: Prefix-sum cube built with (at least) the plan's segments
+            windows: {'baseline': (start, end), 'comparison': (start, end)} inclusive dates
+            segments: Segments to analyze (those missing from the cube are skipped)
+            top_k: Number of top and bottom performers to keep per segment
+        
+        With segment_fdr set (opt-in), every segment value's ROAS change is
+        tested and only Benjamini-Hochberg discoveries at that false discovery
+        rate are ranked, so values whose ROAS moved by chance are not reported.
+        Values without enough days to test are counted as untested.
+        
+        Returns:
+            Per-segment top/bottom performers (ranked by comparison ROAS) with
+            baseline values, ROAS/CTR/CPC changes and the spread of their
+            comparison-window daily ROAS (plus ROAS change p- and q-values and
+            a 'significance' summary when tested)
+        """
+        segment_analysis = {}
+        for segment in [segment for segment in segments if segment in cube.segments]:
+            baseline = cube.segment_totals(segment, *windows['baseline'])
+            comparison = cube.segment_totals(segment, *windows['comparison'])
+            comparison = comparison[comparison['rows'] > 0].drop(columns='rows')
+            baseline = baseline.drop(columns='rows')
             
-            # Top performers in comparison period
-            segment_metrics = comparison_df.groupby(segment).agg({
-                'spend': 'sum',
-                'revenue': 'sum',
-                'clicks': 'sum',
-                'purchases': 'sum'
-            }).reset_index()
+            segment_metrics = self._segment_changes(baseline, comparison)
             
-            segment_metrics['roas'] = np.where(
-                segment_metrics['spend'] > 0,
-                segment_metrics['revenue'] / segment_metrics['spend'],
-                0
-            )
+            significance = None
+            if self.segment_fdr is not None:
+                p_values = self._segment_roas_p_values(cube, windows, segment, segment_metrics.index)
+                q_values = benjamini_hochberg(p_values)
+                segment_metrics['roas_p_value'] = np.round(p_values, 4)
+                segment_metrics['roas_q_value'] = np.round(q_values, 4)
+                discoveries = q_values <= self.segment_fdr
+                segment_metrics['discovery'] = discoveries
+                tested = int(np.isfinite(p_values).sum())
+                significance = {
+                    "test": "welch_t",
+                    "correction": "benjamini_hochberg",
+                    "fdr": self.segment_fdr,
+                    "tested": tested,
+                    # Fewer than two days with spend in a window: no p-value, never ranked
+                    "untested": len(p_values) - tested,
+                    "discoveries": int(discoveries.sum())
+                }
+                segment_metrics = segment_metrics[discoveries]
             
-            segment_metrics = segment_metrics.sort_values('roas', ascending=False)
+            # Linear-time selection instead of sorting every segment value;
+            # bottom performers stay in descending order (worst last)
+            top = segment_metrics.nlargest(top_k, 'roas')
+            bottom = segment_metrics.nsmallest(top_k, 'roas').iloc[::-1]
             
             segment_analysis[segment] = {
-                "top_performers": segment_metrics.head(3).to_dict('records'),
-                "bottom_performers": segment_metrics.tail(3).to_dict('records')
+                "top_performers": top.reset_index().to_dict('records'),
+                "bottom_performers": bottom.reset_index().to_dict('records')
             }
+            self._add_daily_roas(cube, windows['comparison'], segment, segment_analysis[segment])
+            if significance is not None:
+                segment_analysis[segment]["significance"] = significance
         
         return segment_analysis
     
-    def _generate_quality_report(self) -> Dict[str, Any]:
-        """Generate data quality report"""
+    def _segment_roas_p_values(self, cube: DateCube, windows: Dict[str, Tuple[pd.Timestamp, pd.Timestamp]],
+                               segment: str, values: pd.Index) -> np.ndarray:
+        """
+        Welch t-test p-value of each segment value's daily ROAS, baseline vs comparison
+        
+        All values are tested in one array pass (see _daily_roas_moments).
+        NaN where a value has fewer than two days with spend in a window.
+        """
+        moments = []
+        for name in ('baseline', 'comparison'):
+            moments += self._daily_roas_moments(cube, windows[name], segment, values)
+        
+        _, _, p_values = welch_t_test(*moments)
+        return p_values
+    
+    def _daily_roas_moments(self, cube: DateCube, window: Tuple[pd.Timestamp, pd.Timestamp],
+                            segment: str, values: pd.Index) -> List[np.ndarray]:
+        """
+        [mean, variance, days] of each segment value's daily ROAS over one window
+        
+        Means and variances come from bincounts over the segment x day
+        totals, so every value is covered in one pass. Days without spend
+        have no ROAS; the variance is NaN below two days.
+        """
+        daily = cube.grouped_totals([segment, 'date'], *window)
+        daily = daily[daily['spend'] > 0]
+        codes = values.get_indexer(daily.index.get_level_values(0))
+        keep = codes >= 0
+        codes = codes[keep]
+        roas = (daily['revenue'].to_numpy(dtype='float64') / daily['spend'].to_numpy(dtype='float64'))[keep]
+        
+        days = np.bincount(codes, minlength=len(values))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.bincount(codes, weights=roas, minlength=len(values)) / days
+            squares = np.bincount(codes, weights=(roas - mean[codes]) ** 2, minlength=len(values))
+            variance = squares / (days - 1)
+        return [mean, variance, days]
+    
+    def _add_daily_roas(self, cube: DateCube, window: Tuple[pd.Timestamp, pd.Timestamp],
+                        segment: str, analysis: Dict[str, List[Dict[str, Any]]]):
+        """
+        Attach each ranked performer's comparison-window daily ROAS mean,
+        variance and day count, so the evaluator can test the ROAS gap
+        between two segment values
+        """
+        records = analysis["top_performers"] + analysis["bottom_performers"]
+        if not records:
+            return
+        
+        values = pd.Index(list(dict.fromkeys(record[segment] for record in records)))
+        mean, variance, days = self._daily_roas_moments(cube, window, segment, values)
+        for record, position in zip(records, values.get_indexer([record[segment] for record in records])):
+            record["daily_roas"] = {
+                "mean": round(float(mean[position]), 6) if days[position] > 0 else None,
+                "variance": round(float(variance[position]), 6) if days[position] > 1 else None,
+                "days": int(days[position])
+            }
+    
+    def _segment_changes(self, baseline: pd.DataFrame, comparison: pd.DataFrame) -> pd.DataFrame:
+        """Comparison-period totals per segment value with ratio metrics and baseline deltas"""
+        baseline = baseline.reindex(comparison.index, fill_value=0)
+        
+        def ratios(totals: pd.DataFrame) -> Dict[str, np.ndarray]:
+            return {
+                "roas": np.where(totals['spend'] > 0, totals['revenue'] / totals['spend'], 0),
+                "ctr": np.where(totals['impressions'] > 0, totals['clicks'] / totals['impressions'] * 100, 0),
+                "cpc": np.where(totals['clicks'] > 0, totals['spend'] / totals['clicks'], 0)
+            }
+        
+        current = ratios(comparison)
+        previous = ratios(baseline)
+        
+        result = comparison.copy()
+        for metric in ('roas', 'ctr', 'cpc'):
+            result[metric] = current[metric]
+        for metric in ('roas', 'ctr', 'cpc'):
+            result[f'baseline_{metric}'] = previous[metric]
+        for metric in ('roas', 'ctr', 'cpc'):
+            result[f'{metric}_change_pct'] = np.round(np.where(
+                previous[metric] != 0,
+                (current[metric] - previous[metric]) / np.where(previous[metric] != 0, previous[metric], 1) * 100,
+                0
+            ), 2)
+        
+        return result
+    
+    def _generate_quality_report(self, df: pd.DataFrame = None) -> Dict[str, Any]:
+        """Generate data quality report (for the loaded frame unless df is given)"""
+        if df is None:
+            df = self.df
         return {
-            "missing_values": self.df.isnull().sum().to_dict(),
-            "zero_spend_rows": int((self.df['spend'] == 0).sum()),
-            "zero_impressions_rows": int((self.df['impressions'] == 0).sum()),
+            "missing_values": {col: int(count) for col, count in df.isnull().sum().items()},
+            "zero_spend_rows": int((df['spend'] == 0).sum()),
+            "zero_impressions_rows": int((df['impressions'] == 0).sum()),
             "negative_values": {
-                col: int((self.df[col] < 0).sum()) 
+                col: int((df[col] < 0).sum()) 
                 for col in ['spend', 'revenue', 'clicks', 'impressions', 'purchases']
-                if col in self.df.columns
+                if col in df.columns
             }
         }
     
@@ -257,6 +735,7 @@ class DataAgent:
             "comparison_metrics": {},
             "metric_changes": {},
             "segment_analysis": {},
+            "daily_totals": {},
             "data_quality_report": {}
         }
 
@@ -3,10 +3,30 @@ Evaluator Agent - Validates, scores, and ranks insights and hypotheses
 """
 
 import json
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from datetime import datetime
 import os
 
+import numpy as np
+
+from src.utils.sampling import RATIO_METRICS
+from src.utils.significance import two_proportion_z_test, welch_t_test, normal_sf_two_sided
+
+
+# Insight category -> (test, metric) checked against the Data Agent's windows:
+# rates of counts get a two-proportion z-test on the window totals, ratios
+# of amounts (no binomial model) a Welch t-test on their day-level values.
+# Segment insights compare two segment values: a Welch t-test of their
+# comparison-window daily ROAS (the performers' daily_roas moments)
+SIGNIFICANCE_TESTS = {
+    "Engagement": ("two_proportion_z", "ctr"),
+    "Conversion": ("two_proportion_z", "conversion_rate"),
+    "ROAS": ("welch_t", "roas"),
+    "Efficiency": ("welch_t", "roas"),
+    "Cost": ("welch_t", "cpc"),
+    "Segmentation": ("segment_welch_t", "roas")
+}
+
 
 class EvaluatorAgent:
     """
@@ -17,6 +37,8 @@ class EvaluatorAgent:
         self.config = config
         self.prompt_template = self._load_prompt_template()
         self.min_confidence_threshold = config.get('min_confidence', 0.6)
+        evaluator_config = config.get('agents', {}).get('evaluator', {})
+        self.significance_level = evaluator_config.get('statistical_significance_threshold', 0.05)
     
     def _load_prompt_template(self) -> str:
         """Load evaluator prompt template"""
@@ -90,12 +112,15 @@ class EvaluatorAgent:
         """Validate and score insights"""
         validated = []
         
-        for idx, insight in enumerate(insights):
+        # All significance tests run in one batch before scoring
+        tests = self._significance_tests(insights, data)
+        
+        for idx, (insight, test) in enumerate(zip(insights, tests)):
             # Calculate validation score
             score_components = {
                 "confidence": insight.get('confidence', 0.5),
                 "evidence_strength": self._assess_evidence_strength(insight),
-                "statistical_significance": self._check_statistical_significance(insight, data),
+                "statistical_significance": self._significance_score(insight, test),
                 "business_relevance": self._assess_business_relevance(insight)
             }
             
@@ -114,7 +139,11 @@ class EvaluatorAgent:
                 "score_components": score_components,
                 "ranking": idx + 1,
                 "validation_notes": self._generate_validation_notes(score_components),
-                "statistical_significance": score_components['statistical_significance'] > 0.7
+                "significance_test": test,
+                "statistical_significance": (
+                    test['p_value'] < self.significance_level if test is not None
+                    else score_components['statistical_significance'] > 0.7
+                )
             })
             
             validated.append(validated_insight)
@@ -180,6 +209,16 @@ class EvaluatorAgent:
     
     def _check_statistical_significance(self, insight: Dict, data: Dict[str, Any]) -> float:
         """Check if changes are statistically significant"""
+        return self._significance_score(insight, self._significance_tests([insight], data)[0])
+    
+    def _significance_score(self, insight: Dict, test: Optional[Dict]) -> float:
+        """
+        Significance component of the validation score: 1 - p when the
+        change was tested, otherwise a heuristic on the change magnitude
+        """
+        if test is not None:
+            return round(1 - test['p_value'], 4)
+        
         evidence = insight.get('evidence', {})
         
         # Simple heuristic: larger changes are more likely significant
@@ -199,6 +238,144 @@ class EvaluatorAgent:
         
         return 0.50
     
+    def _significance_tests(self, insights: List[Dict], data: Dict[str, Any]) -> List[Optional[Dict]]:
+        """
+        Test every insight's baseline vs comparison change in one vectorized pass
+        
+        Two-proportion z-tests use the window totals (baseline_metrics and
+        comparison_metrics); when the Data Agent sampled, rates are instead
+        z-tested with the stratified standard errors in metric_changes.
+        Ratio metrics use the Data Agent's bootstrap p-value when
+        metric_changes carries one, otherwise a Welch t-test on the per-day
+        values of the metric from daily_totals. Segment insights get a Welch
+        t-test of the top vs bottom performer's daily ROAS. Each test type
+        is a single array call over all insights that need it.
+        
+        Returns:
+            One entry per insight: {'test', 'metric', 'statistic', 'p_value'},
+            or None when the category has no test or the data does not allow one
+        """
+        results = [None] * len(insights)
+        if not insights or not data:
+            return results
+        
+        requests = {"two_proportion_z": [], "welch_t": [], "segment_welch_t": []}
+        for idx, insight in enumerate(insights):
+            test = SIGNIFICANCE_TESTS.get(insight.get('category'))
+            if test is not None:
+                requests[test[0]].append((idx, test[1]))
+        
+        metric_changes = data.get('metric_changes') or {}
+        if requests["two_proportion_z"] and (data.get('data_summary') or {}).get('sampling'):
+            # Sampled totals are weighted estimates, not binomial counts: test
+            # the change with the stratified standard errors instead
+            self._stratified_z_tests(results, requests["two_proportion_z"], metric_changes)
+            requests["two_proportion_z"] = []
+        
+        if requests["two_proportion_z"]:
+            baseline = data.get('baseline_metrics') or {}
+            comparison = data.get('comparison_metrics') or {}
+            counts = np.array([
+                [window.get(col, 0) for window in (baseline, comparison) for col in RATIO_METRICS[metric][:2]]
+                for _, metric in requests["two_proportion_z"]
+            ], dtype='float64')
+            z, p = two_proportion_z_test(counts[:, 0], counts[:, 1], counts[:, 2], counts[:, 3])
+            self._collect_tests(results, requests["two_proportion_z"], "two_proportion_z", z, p)
+        
+        # Ratios of amounts bootstrapped by the Data Agent use its resampled p-value
+        welch = []
+        for idx, metric in requests["welch_t"]:
+            bootstrap = (metric_changes.get(metric) or {}).get('bootstrap') or {}
+            if bootstrap.get('p_value') is not None:
+                results[idx] = {
+                    "test": "bootstrap",
+                    "metric": metric,
+                    "percent_change_interval": bootstrap['percent_change'],
+                    "p_value": bootstrap['p_value']
+                }
+            else:
+                welch.append((idx, metric))
+        requests["welch_t"] = welch
+        
+        if requests["welch_t"]:
+            daily = data.get('daily_totals') or {}
+            moments = {
+                metric: self._daily_moments(daily, metric)
+                for metric in {metric for _, metric in requests["welch_t"]}
+            }
+            stats = np.array([moments[metric] for _, metric in requests["welch_t"]], dtype='float64')
+            t, _, p = welch_t_test(*stats.T)
+            self._collect_tests(results, requests["welch_t"], "welch_t", t, p)
+        
+        if requests["segment_welch_t"]:
+            # Top vs bottom segment value, all segment insights in one call
+            stats = np.array([
+                self._performer_moments(insights[idx].get('evidence') or {}) for idx, _ in requests["segment_welch_t"]
+            ], dtype='float64')
+            t, _, p = welch_t_test(*stats.T)
+            self._collect_tests(results, requests["segment_welch_t"], "welch_t", t, p)
+        
+        return results
+    
+    def _stratified_z_tests(self, results: List, requests: List, metric_changes: Dict[str, Any]):
+        """z-tests of sampled estimates: (comparison - baseline) / sqrt(se_baseline^2 + se_comparison^2)"""
+        requests = [
+            (idx, metric) for idx, metric in requests
+            if ((metric_changes.get(metric) or {}).get('confidence_interval') or {}).get('standard_error')
+        ]
+        if not requests:
+            return
+        
+        estimates = np.array([
+            [
+                metric_changes[metric]['baseline'],
+                metric_changes[metric]['confidence_interval']['standard_error']['baseline'],
+                metric_changes[metric]['comparison'],
+                metric_changes[metric]['confidence_interval']['standard_error']['comparison']
+            ]
+            for _, metric in requests
+        ], dtype='float64')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            se = np.sqrt(estimates[:, 1] ** 2 + estimates[:, 3] ** 2)
+            z = np.where(se > 0, (estimates[:, 2] - estimates[:, 0]) / se, np.nan)
+        self._collect_tests(results, requests, "stratified_z", z, normal_sf_two_sided(z))
+    
+    def _daily_moments(self, daily: Dict[str, Dict[str, List]], metric: str) -> List[float]:
+        """(mean, variance, days) of a ratio metric's daily values in the baseline, then the comparison window"""
+        numerator, denominator, scale = RATIO_METRICS[metric]
+        moments = []
+        for window in ('baseline', 'comparison'):
+            totals = daily.get(window) or {}
+            num = np.asarray(totals.get(numerator, []), dtype='float64')
+            den = np.asarray(totals.get(denominator, []), dtype='float64')
+            # Days without any denominator (no spend, no clicks) have no ratio
+            values = num[den > 0] / den[den > 0] * scale if len(num) == len(den) else np.array([])
+            n = len(values)
+            moments += [values.mean() if n else np.nan, values.var(ddof=1) if n > 1 else np.nan, n]
+        return moments
+    
+    def _performer_moments(self, evidence: Dict[str, Any]) -> List[float]:
+        """(mean, variance, days) of the bottom, then the top performer's daily ROAS; NaN where missing"""
+        moments = []
+        for performer in ('bottom_performer', 'top_performer'):
+            daily = (evidence.get(performer) or {}).get('daily_roas') or {}
+            moments += [
+                np.nan if daily.get(key) is None else daily[key]
+                for key in ('mean', 'variance', 'days')
+            ]
+        return moments
+    
+    def _collect_tests(self, results: List, requests: List, test: str, statistics: np.ndarray, p_values: np.ndarray):
+        """Store finite test results at their insight positions"""
+        for (idx, metric), statistic, p_value in zip(requests, statistics, p_values):
+            if np.isfinite(p_value):
+                results[idx] = {
+                    "test": test,
+                    "metric": metric,
+                    "statistic": round(float(statistic), 4),
+                    "p_value": float(p_value)
+                }
+    
     def _assess_business_relevance(self, insight: Dict) -> float:
         """Assess business relevance and impact"""
         impact = insight.get('impact', 'low')
@@ -3,6 +3,7 @@ Planner Agent - Decomposes user queries into structured analysis plans
 """
 
 import json
+import re
 import pandas as pd
 from datetime import datetime, timedelta
 from typing import Dict, List, Any
@@ -21,6 +22,7 @@ class PlannerAgent:
             'impressions', 'clicks', 'spend', 'revenue', 'purchases'
         ]
         self.available_segments = ['campaign_name', 'creative_type', 'audience_type', 'platform', 'country']
+        self.segment_top_k = config.get('agents', {}).get('planner', {}).get('segment_top_k', 3)
         self.prompt_template = self._load_prompt_template()
     
     def _load_prompt_template(self) -> str:
@@ -67,6 +69,7 @@ class PlannerAgent:
             "metrics_to_analyze": metrics,
             "time_windows": time_windows,
             "segments": segments,
+            "segment_top_k": self.segment_top_k,
             "priority_questions": priority_questions,
             "analysis_type": self._classify_analysis_type(user_query)
         }
@@ -153,19 +156,14 @@ class PlannerAgent:
         else:
             end_date = datetime.now()
         
-        # Determine comparison period length
-        if 'last 7 days' in query_lower or '7 days' in query_lower:
-            comparison_days = 7
-        elif 'last 14 days' in query_lower or '14 days' in query_lower:
-            comparison_days = 14
-        elif 'last 30 days' in query_lower or '30 days' in query_lower or 'month' in query_lower:
-            comparison_days = 30
-        elif 'last 60 days' in query_lower or '60 days' in query_lower:
-            comparison_days = 60
-        elif 'last 90 days' in query_lower or '90 days' in query_lower or 'quarter' in query_lower:
-            comparison_days = 90
+        # An explicit date range sets the comparison window directly
+        explicit = re.findall(r'\d{4}-\d{2}-\d{2}', query_lower)
+        if len(explicit) >= 2:
+            start, end = sorted(pd.to_datetime(explicit[:2]))
+            end_date = end
+            comparison_days = max(1, (end - start).days)
         else:
-            comparison_days = 30  # Default
+            comparison_days = self._parse_window_days(query_lower)
         
         comparison_start = end_date - timedelta(days=comparison_days)
         baseline_start = comparison_start - timedelta(days=comparison_days)
@@ -189,6 +187,24 @@ class PlannerAgent:
             "comparison_days": comparison_days
         }
     
+    def _parse_window_days(self, query_lower: str) -> int:
+        """Length of the comparison window from phrases like '45 days', '6 weeks', '2 months' or 'last week'"""
+        match = re.search(r'(\d+)\s*(day|week|month|quarter)s?\b', query_lower)
+        if match:
+            count = int(match.group(1))
+            days_per_unit = {'day': 1, 'week': 7, 'month': 30, 'quarter': 90}[match.group(2)]
+            return max(1, count * days_per_unit)
+        
+        # Only the phrase 'last week': a bare 'week' also matches e.g. 'weekly'
+        if re.search(r'\blast week\b', query_lower):
+            return 7
+        if 'month' in query_lower:
+            return 30
+        if 'quarter' in query_lower:
+            return 90
+        
+        return self.config.get('agents', {}).get('planner', {}).get('default_time_window_days', 30)
+    
     def _identify_segments(self, query: str) -> List[str]:
         """Identify which segments to analyze - use CSV column names (lowercase)"""
         query_lower = query.lower()
@@ -5,5 +5,7 @@ Kasparro Agentic FB Analyst - Orchestrator Package
 __version__ = '1.0.0'
 
 from .orchestrator import Orchestrator
+from .scheduler import StageGraph
+from .server import AnalysisServer
 
-__all__ = ['Orchestrator']
+__all__ = ['Orchestrator', 'StageGraph', 'AnalysisServer']
@@ -4,6 +4,7 @@ Orchestrator - Coordinates the multi-agent workflow
 
 import json
 import os
+import time
 from datetime import datetime
 from typing import Dict, List, Any
 import traceback
@@ -13,6 +14,29 @@ from src.agents.data_agent import DataAgent
 from src.agents.insight_agent import InsightAgent
 from src.agents.evaluator_agent import EvaluatorAgent
 from src.agents.creative_agent import CreativeAgent
+from src.utils.dataset import AdsDataset
+from src.utils.helpers import estimate_size, sanitize_filename
+from src.utils.profiling import StageProfiler
+from src.utils.stage_cache import StageCache
+from src.orchestrator.scheduler import StageGraph
+
+
+# Config sections each cached stage's output depends on (dotted paths)
+STAGE_CONFIG_SECTIONS = {
+    "data_agent": ['data_path', 'use_sample_data', 'random_seed', 'agents.data_agent'],
+    "insight_agent": ['agents.insight_agent', 'thresholds', 'metrics'],
+    "evaluator": ['agents.evaluator', 'min_confidence', 'thresholds'],
+    "creative_agent": ['agents.creative_agent', 'brand', 'brand_name', 'product_category', 'testing']
+}
+
+# Plan fields the Data Agent reads; other plan fields do not change its output
+DATA_PLAN_FIELDS = ['time_windows', 'segments', 'segment_top_k']
+
+# Per-run plan fields left out of cache keys
+VOLATILE_PLAN_FIELDS = ['plan_id', 'timestamp', 'user_query']
+
+# Stages whose outputs the stage cache stores, upstream first
+CACHED_STAGES = ['data_agent', 'insight_agent', 'evaluator', 'creative_agent']
 
 
 class Orchestrator:
@@ -25,6 +49,25 @@ class Orchestrator:
         self.config = config
         self.execution_log = []
         self.state = {}
+        self.data_path = config.get('data_path', 'data/synthetic_fb_ads_undergarments.csv')
+        self.measure_output_size = config.get('logging', {}).get('measure_output_size', True)
+        self.reports_dir = config.get('output', {}).get('reports_dir', 'reports')
+        self.logs_dir = config.get('output', {}).get('logs_dir', 'logs')
+        
+        self.max_workers = config.get('scheduler', {}).get('max_workers', 4)
+        
+        self.profiler = StageProfiler.from_config(config)
+        if self.profiler.enabled:
+            # CPU time and allocation peaks are process-wide: run stages one at a time
+            self.max_workers = 1
+        
+        cache_config = config.get('stage_cache', {})
+        self.stage_cache = None
+        if cache_config.get('enabled', False):
+            self.stage_cache = StageCache(
+                cache_config.get('dir', 'data/.stage_cache'),
+                int(cache_config.get('max_mb', 256) * 1024 * 1024)
+            )
         
         # Initialize agents
         print("\n[ORCHESTRATOR] Initializing agents...")
@@ -36,12 +79,13 @@ class Orchestrator:
         
         print("[ORCHESTRATOR] All agents initialized successfully")
     
-    def execute(self, user_query: str) -> Dict[str, Any]:
+    def execute(self, user_query: str, dataset: AdsDataset = None) -> Dict[str, Any]:
         """
         Execute the complete multi-agent workflow
         
         Args:
             user_query: Natural language query from user
+            dataset: Already-loaded dataset handle to reuse (a fresh one is created if not provided)
         
         Returns:
             Complete analysis results
@@ -51,17 +95,15 @@ class Orchestrator:
         print("="*80)
         
         start_time = datetime.now()
+        self.execution_log = []
         
         try:
-            # Get data context (latest date from CSV) for planner
-            import pandas as pd
-            data_path = self.config.get('data_path', 'data/synthetic_fb_ads_undergarments.csv')
-            try:
-                df_dates = pd.read_csv(data_path)
-                latest_date = df_dates['date'].max()
-                context = {"latest_date": str(latest_date)}
-            except:
-                context = {}
+            # Load the dataset once; the planner gets its date range and the
+            # Data Agent reuses the parsed frame
+            if dataset is None:
+                dataset = AdsDataset(self.data_path, self.config)
+            latest_date = self._latest_date(dataset)
+            context = {"latest_date": latest_date} if latest_date else {}
             
             # Stage 1: Planning
             print("\n[ORCHESTRATOR] Stage 1/5: Planning")
@@ -72,61 +114,20 @@ class Orchestrator:
                 context
             )
             
-            # Stage 2: Data Retrieval
-            print("\n[ORCHESTRATOR] Stage 2/5: Data Retrieval & Processing")
-            data = self._execute_agent_stage(
-                "data_agent",
-                self.data_agent.execute,
-                plan
-            )
-            
-            # Stage 3: Insight Generation
-            print("\n[ORCHESTRATOR] Stage 3/5: Insight Generation")
-            insights = self._execute_agent_stage(
-                "insight_agent",
-                self.insight_agent.execute,
-                data,
-                plan
-            )
-            
-            # Stage 4: Evaluation
-            print("\n[ORCHESTRATOR] Stage 4/5: Validation & Evaluation")
-            validated = self._execute_agent_stage(
-                "evaluator",
-                self.evaluator.execute,
-                insights,
-                data
-            )
-            
-            # Stage 5: Creative Generation
-            print("\n[ORCHESTRATOR] Stage 5/5: Creative Generation")
-            creatives = self._execute_agent_stage(
-                "creative_agent",
-                self.creative_agent.execute,
-                validated,
-                plan.get('objectives', [])
-            )
+            # Stages 2-5 run as a dependency graph
+            stage_keys = self._stage_keys(plan, dataset)
+            data, validated, creatives = self._execute_analysis_stages(plan, dataset, stage_keys)
             
             # Compile final results
             end_time = datetime.now()
             execution_time = (end_time - start_time).total_seconds()
             
-            results = {
-                "query": user_query,
-                "execution_time_seconds": execution_time,
-                "timestamp": end_time.isoformat(),
-                "plan": plan,
-                "data_summary": data.get('data_summary', {}),
-                "insights": validated.get('validated_insights', []),
-                "hypotheses": validated.get('validated_hypotheses', []),
-                "creatives": creatives.get('creatives', []),
-                "ab_tests": creatives.get('ab_test_recommendations', []),
-                "creative_strategy": creatives.get('creative_strategy', ''),
-                "execution_log": self.execution_log
-            }
+            results = self._compile_results(
+                user_query, plan, data, validated, creatives, end_time, execution_time, self.execution_log
+            )
             
             # Save outputs
-            self._save_outputs(results)
+            self._save_outputs(results, self.reports_dir, self.logs_dir)
             
             print("\n" + "="*80)
             print(f"[ORCHESTRATOR] Analysis complete in {execution_time:.2f}s")
@@ -153,6 +154,312 @@ class Orchestrator:
                 "execution_log": self.execution_log
             }
     
+    def execute_batch(self, user_queries: List[str], output_root: str = None,
+                      dataset: AdsDataset = None) -> List[Dict[str, Any]]:
+        """
+        Execute the workflow for many queries with one shared data pass
+        
+        Every query is planned first; the Data Agent then answers all plans
+        from a single scan of the union of their windows and segments, and
+        the insight, evaluation and creative stages run per query. Each
+        query's outputs go to their own directory under output_root.
+        
+        Args:
+            user_queries: Natural language queries
+            output_root: Directory for the per-query outputs (default <reports_dir>/batch)
+            dataset: Already-loaded dataset handle to reuse (a fresh one is created if not provided)
+        
+        Returns:
+            Complete analysis results per query, in order
+        """
+        if output_root is None:
+            output_root = os.path.join(self.reports_dir, 'batch')
+        
+        print("\n" + "="*80)
+        print(f"[ORCHESTRATOR] Starting batch analysis for {len(user_queries)} queries")
+        print("="*80)
+        
+        start_time = datetime.now()
+        self.execution_log = []
+        
+        try:
+            if dataset is None:
+                dataset = AdsDataset(self.data_path, self.config)
+            latest_date = self._latest_date(dataset)
+            context = {"latest_date": latest_date} if latest_date else {}
+            
+            # Stage 1: Planning (per query)
+            print(f"\n[ORCHESTRATOR] Stage 1/5: Planning {len(user_queries)} queries")
+            plans, plan_logs = [], []
+            for user_query in user_queries:
+                log_start = len(self.execution_log)
+                plans.append(self._execute_agent_stage("planner", self.planner.execute, user_query, context))
+                plan_logs.append(self.execution_log[log_start:])
+            
+            # Stage 2: One data pass shared by every plan not answered from the cache
+            print("\n[ORCHESTRATOR] Stage 2/5: Data Retrieval & Processing (shared pass)")
+            stage_keys = [self._stage_keys(plan, dataset) for plan in plans]
+            batch_data, data_logs = [], []
+            for keys in stage_keys:
+                log_start = len(self.execution_log)
+                batch_data.append(self._cached_output("data_agent", keys))
+                data_logs.append(self.execution_log[log_start:])
+            missing = [i for i, data in enumerate(batch_data) if data is None]
+            log_start = len(self.execution_log)
+            if missing:
+                fresh = self._execute_agent_stage(
+                    "data_agent",
+                    self.data_agent.execute_batch,
+                    [plans[i] for i in missing],
+                    dataset
+                )
+                for i, data in zip(missing, fresh):
+                    batch_data[i] = data
+                    self._store_output("data_agent", stage_keys[i], data)
+            shared_log = self.execution_log[log_start:]
+            for i in missing:
+                data_logs[i] = data_logs[i] + shared_log
+            shared_time = (datetime.now() - start_time).total_seconds()
+        
+        except Exception as e:
+            error_details = {
+                "error": str(e),
+                "traceback": traceback.format_exc(),
+                "timestamp": datetime.now().isoformat()
+            }
+            
+            print(f"\n[ORCHESTRATOR] ERROR: {str(e)}")
+            print(traceback.format_exc())
+            
+            self._log_execution("error", "orchestrator", error_details)
+            
+            return [
+                {"query": user_query, "error": True, "error_details": error_details, "execution_log": self.execution_log}
+                for user_query in user_queries
+            ]
+        
+        all_results = []
+        for index, (user_query, plan, data) in enumerate(zip(user_queries, plans, batch_data), 1):
+            print(f"\n[ORCHESTRATOR] Query {index}/{len(user_queries)}: '{user_query}'")
+            query_start = datetime.now()
+            log_start = len(self.execution_log)
+            
+            try:
+                _, validated, creatives = self._execute_analysis_stages(plan, dataset, stage_keys[index - 1], data)
+                
+                end_time = datetime.now()
+                # Each query is charged the full shared pass plus its own stages
+                execution_time = shared_time + (end_time - query_start).total_seconds()
+                execution_log = plan_logs[index - 1] + data_logs[index - 1] + self.execution_log[log_start:]
+                
+                results = self._compile_results(
+                    user_query, plan, data, validated, creatives, end_time, execution_time, execution_log
+                )
+                output_dir = os.path.join(output_root, f"{index:03d}_{sanitize_filename(user_query)[:60]}")
+                self._save_outputs(results, reports_dir=output_dir, logs_dir=output_dir)
+                results["output_dir"] = output_dir
+            
+            except Exception as e:
+                error_details = {
+                    "error": str(e),
+                    "traceback": traceback.format_exc(),
+                    "timestamp": datetime.now().isoformat()
+                }
+                
+                print(f"\n[ORCHESTRATOR] ERROR: {str(e)}")
+                
+                self._log_execution("error", "orchestrator", error_details)
+                
+                results = {
+                    "query": user_query,
+                    "error": True,
+                    "error_details": error_details,
+                    "execution_log": plan_logs[index - 1] + data_logs[index - 1] + self.execution_log[log_start:]
+                }
+            
+            all_results.append(results)
+        
+        print("\n" + "="*80)
+        print(f"[ORCHESTRATOR] Batch of {len(user_queries)} queries complete in {(datetime.now() - start_time).total_seconds():.2f}s")
+        print("="*80)
+        
+        return all_results
+    
+    def _execute_analysis_stages(self, plan: Dict[str, Any], dataset: AdsDataset,
+                                 stage_keys: Dict[str, str] = None, data: Dict[str, Any] = None):
+        """
+        Run the data, insight, evaluation and creative stages for one plan
+        
+        Stages come from _stage_graph; cached outputs are looked up first and
+        the scheduler only runs the nodes still needed for the rest.
+        
+        Args:
+            plan: Analysis plan
+            dataset: Shared dataset handle
+            stage_keys: Stage cache keys (see _stage_keys); None runs every stage
+            data: Data Agent output, when already computed (batch mode)
+        
+        Returns:
+            (data output, validated insights output, creatives output)
+        """
+        resolved = {} if data is None else {"data_agent": data}
+        for agent_name in CACHED_STAGES:
+            if agent_name not in resolved:
+                cached = self._cached_output(agent_name, stage_keys)
+                if cached is not None:
+                    resolved[agent_name] = cached
+        
+        outputs = self._stage_graph(plan, dataset, stage_keys).run(
+            targets=["data_agent", "evaluator", "creative_agent"],
+            resolved=resolved,
+            max_workers=self.max_workers
+        )
+        return outputs["data_agent"], outputs["evaluator"], outputs["creative_agent"]
+    
+    def _stage_graph(self, plan: Dict[str, Any], dataset: AdsDataset, stage_keys: Dict[str, str]) -> StageGraph:
+        """
+        Stage dependencies for one plan
+        
+        data_agent feeds insight_agent; the evaluator reads the insights and
+        the data, and the creative agent the validated insights. Every node
+        is logged with its own timing. The insight sub-analyses are short and
+        CPU-bound, so they run inline in one node: on threads they only
+        contend for the GIL.
+        """
+        graph = StageGraph()
+        
+        # Stage 2: Data Retrieval
+        graph.add("data_agent", lambda inputs: self._run_stage(
+            "data_agent", stage_keys, "Stage 2/5: Data Retrieval & Processing",
+            self.data_agent.execute, plan, dataset
+        ))
+        
+        # Stage 3: Insight Generation
+        graph.add("insight_agent", lambda inputs: self._run_stage(
+            "insight_agent", stage_keys, "Stage 3/5: Insight Generation",
+            self.insight_agent.execute, inputs["data_agent"], plan
+        ), depends_on=["data_agent"])
+        
+        # Stage 4: Evaluation
+        graph.add("evaluator", lambda inputs: self._run_stage(
+            "evaluator", stage_keys, "Stage 4/5: Validation & Evaluation",
+            self.evaluator.execute, inputs["insight_agent"], inputs["data_agent"]
+        ), depends_on=["insight_agent", "data_agent"])
+        
+        # Stage 5: Creative Generation
+        graph.add("creative_agent", lambda inputs: self._run_stage(
+            "creative_agent", stage_keys, "Stage 5/5: Creative Generation",
+            self.creative_agent.execute, inputs["evaluator"], plan.get('objectives', [])
+        ), depends_on=["evaluator"])
+        
+        return graph
+    
+    def _run_stage(self, agent_name: str, stage_keys: Dict[str, str], title: str, agent_func, *args) -> Any:
+        """Run one pipeline stage and cache its output"""
+        print(f"\n[ORCHESTRATOR] {title}")
+        result = self._execute_agent_stage(agent_name, agent_func, *args)
+        self._store_output(agent_name, stage_keys, result)
+        return result
+    
+    def _compile_results(self, user_query: str, plan: Dict, data: Dict, validated: Dict, creatives: Dict,
+                         end_time: datetime, execution_time: float, execution_log: List[Dict]) -> Dict[str, Any]:
+        """Final results of one query"""
+        return {
+            "query": user_query,
+            "execution_time_seconds": execution_time,
+            "timestamp": end_time.isoformat(),
+            "plan": plan,
+            "data_summary": data.get('data_summary', {}),
+            "insights": validated.get('validated_insights', []),
+            "hypotheses": validated.get('validated_hypotheses', []),
+            "creatives": creatives.get('creatives', []),
+            "ab_tests": creatives.get('ab_test_recommendations', []),
+            "creative_strategy": creatives.get('creative_strategy', ''),
+            "execution_log": execution_log
+        }
+    
+    def _latest_date(self, dataset: AdsDataset):
+        """Latest data date for the planner (cached per data fingerprint, so hits skip the date scan)"""
+        if self.stage_cache is None:
+            return dataset.latest_date
+        key = self.stage_cache.key("latest_date", {"data": dataset.fingerprint()})
+        latest_date = self.stage_cache.get(key)
+        if latest_date is None:
+            latest_date = dataset.latest_date
+            if latest_date:
+                self.stage_cache.put(key, latest_date)
+        return latest_date
+    
+    def _stage_keys(self, plan: Dict[str, Any], dataset: AdsDataset) -> Dict[str, str]:
+        """
+        Stage cache keys for one plan, or None when the cache is disabled
+        
+        Each key covers exactly what the stage reads: the Data Agent its plan
+        fields, the data fingerprint and its config; later stages the keys of
+        their upstream stages plus their own inputs and config. The planner is
+        not cached (it is cheaper than a cache read and stamps every run).
+        """
+        if self.stage_cache is None:
+            return None
+        
+        normalized_plan = {k: v for k, v in plan.items() if k not in VOLATILE_PLAN_FIELDS}
+        keys = {}
+        keys["data_agent"] = self.stage_cache.key("data_agent", {
+            "plan": {field: plan.get(field) for field in DATA_PLAN_FIELDS},
+            "data": dataset.fingerprint(),
+            "config": self._config_sections("data_agent")
+        })
+        keys["insight_agent"] = self.stage_cache.key("insight_agent", {
+            "data": keys["data_agent"],
+            "plan": normalized_plan,
+            "config": self._config_sections("insight_agent")
+        })
+        keys["evaluator"] = self.stage_cache.key("evaluator", {
+            "insights": keys["insight_agent"],
+            "data": keys["data_agent"],
+            "config": self._config_sections("evaluator")
+        })
+        keys["creative_agent"] = self.stage_cache.key("creative_agent", {
+            "validated": keys["evaluator"],
+            "objectives": plan.get('objectives', []),
+            "config": self._config_sections("creative_agent")
+        })
+        return keys
+    
+    def _config_sections(self, stage: str) -> Dict[str, Any]:
+        """Values of the config sections a stage depends on"""
+        sections = {}
+        for path in STAGE_CONFIG_SECTIONS[stage]:
+            value = self.config
+            for part in path.split('.'):
+                value = value.get(part) if isinstance(value, dict) else None
+            sections[path] = value
+        return sections
+    
+    def _cached_output(self, agent_name: str, stage_keys: Dict[str, str]) -> Any:
+        """Cached stage output (logged as a 'cached' stage), or None"""
+        if stage_keys is None:
+            return None
+        
+        lookup_start = datetime.now()
+        cached = self.stage_cache.get(stage_keys[agent_name])
+        if cached is not None:
+            print(f"[ORCHESTRATOR] {agent_name}: using cached output")
+            self._log_execution("cached", agent_name, {
+                "execution_time": (datetime.now() - lookup_start).total_seconds(),
+                "cache_key": stage_keys[agent_name][:16]
+            })
+        return cached
+    
+    def _store_output(self, agent_name: str, stage_keys: Dict[str, str], result: Any):
+        """Cache a stage output (error responses are not cached)"""
+        if stage_keys is None or not isinstance(result, dict) or result.get('error', False):
+            return
+        if 'raw_data' in result:
+            # Row-level views are not cached; nothing downstream reads them
+            result = {**result, "raw_data": None}
+        self.stage_cache.put(stage_keys[agent_name], result)
+    
     def _execute_agent_stage(self, agent_name: str, agent_func, *args) -> Any:
         """
         Execute a single agent stage with error handling and logging
@@ -165,34 +472,35 @@ class Orchestrator:
         Returns:
             Agent output
         """
-        stage_start = datetime.now()
+        stage_start = time.perf_counter()
+        profile = {}
         
         try:
-            result = agent_func(*args)
+            with self.profiler.profile(agent_name) as profile:
+                result = agent_func(*args)
             
-            stage_end = datetime.now()
-            execution_time = (stage_end - stage_start).total_seconds()
+            execution_time = time.perf_counter() - stage_start
             
-            self._log_execution(
-                "success",
-                agent_name,
-                {
-                    "execution_time": execution_time,
-                    "output_size": len(str(result))
-                }
-            )
+            details = {"execution_time": execution_time}
+            if profile:
+                details["profile"] = profile
+            if self.measure_output_size:
+                # Sampled estimate in bytes; stringifying large outputs could
+                # take longer than the stage itself
+                details["output_size"] = estimate_size(result)
             
-            return result
+            self._log_execution("success", agent_name, details)
             
+            return result
+        
         except Exception as e:
-            self._log_execution(
-                "failure",
-                agent_name,
-                {
-                    "error": str(e),
-                    "traceback": traceback.format_exc()
-                }
-            )
+            details = {
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            }
+            if profile:
+                details["profile"] = profile
+            self._log_execution("failure", agent_name, details)
             raise
     
     def _log_execution(self, status: str, agent: str, details: Dict):
@@ -205,15 +513,43 @@ class Orchestrator:
         }
         self.execution_log.append(log_entry)
     
-    def _save_outputs(self, results: Dict):
-        """Save outputs to files"""
+    def _save_outputs(self, results: Dict, reports_dir: str = 'reports', logs_dir: str = 'logs'):
+        """
+        Save outputs to files
+        
+        The report writers are independent and run concurrently; the
+        execution log is written once they are done, so it includes their
+        timings.
+        """
         print("\n[ORCHESTRATOR] Saving outputs...")
         
         # Ensure directories exist
-        os.makedirs('reports', exist_ok=True)
-        os.makedirs('logs', exist_ok=True)
+        os.makedirs(reports_dir, exist_ok=True)
+        os.makedirs(logs_dir, exist_ok=True)
+        
+        # Writer entries are appended to self.execution_log from here on
+        stage_log = list(results['execution_log'])
+        log_start = len(self.execution_log)
         
-        # Save insights.json
+        writers = {
+            "insights": (self._write_insights, os.path.join(reports_dir, 'insights.json')),
+            "creatives": (self._write_creatives, os.path.join(reports_dir, 'creatives.json')),
+            "report": (self._write_report, os.path.join(reports_dir, 'report.md'))
+        }
+        
+        graph = StageGraph()
+        for name, (writer, path) in writers.items():
+            graph.add(f"output.{name}", lambda inputs, name=name, writer=writer, path=path:
+                      self._execute_agent_stage(f"output.{name}", writer, results, path))
+        graph.add("output.execution_log", lambda inputs: self._execute_agent_stage(
+            "output.execution_log", self._write_execution_log,
+            {**results, "execution_log": stage_log + self.execution_log[log_start:]},
+            os.path.join(logs_dir, 'execution_log.json')
+        ), depends_on=[f"output.{name}" for name in writers])
+        graph.run(max_workers=self.max_workers)
+    
+    def _write_insights(self, results: Dict, path: str):
+        """Save insights.json"""
         insights_output = {
             "timestamp": results['timestamp'],
             "query": results['query'],
@@ -226,12 +562,13 @@ class Orchestrator:
             }
         }
         
-        with open('reports/insights.json', 'w', encoding='utf-8') as f:
+        with open(path, 'w', encoding='utf-8') as f:
             json.dump(insights_output, f, indent=2, ensure_ascii=False)
         
-        print("[ORCHESTRATOR] ✓ Saved reports/insights.json")
-        
-        # Save creatives.json
+        print(f"[ORCHESTRATOR] ✓ Saved {path}")
+    
+    def _write_creatives(self, results: Dict, path: str):
+        """Save creatives.json"""
         creatives_output = {
             "timestamp": results['timestamp'],
             "query": results['query'],
@@ -243,29 +580,31 @@ class Orchestrator:
             }
         }
         
-        with open('reports/creatives.json', 'w', encoding='utf-8') as f:
+        with open(path, 'w', encoding='utf-8') as f:
             json.dump(creatives_output, f, indent=2, ensure_ascii=False)
         
-        print("[ORCHESTRATOR] ✓ Saved reports/creatives.json")
-        
-        # Save report.md
+        print(f"[ORCHESTRATOR] ✓ Saved {path}")
+    
+    def _write_report(self, results: Dict, path: str):
+        """Save report.md"""
         report_md = self._generate_markdown_report(results)
-        with open('reports/report.md', 'w', encoding='utf-8') as f:
+        with open(path, 'w', encoding='utf-8') as f:
             f.write(report_md)
         
-        print("[ORCHESTRATOR] ✓ Saved reports/report.md")
-        
-        # Save execution log
-        with open('logs/execution_log.json', 'w', encoding='utf-8') as f:
+        print(f"[ORCHESTRATOR] ✓ Saved {path}")
+    
+    def _write_execution_log(self, results: Dict, path: str):
+        """Save the execution log"""
+        with open(path, 'w', encoding='utf-8') as f:
             json.dump({
                 "execution_id": f"EXEC_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
                 "query": results['query'],
                 "timestamp": results['timestamp'],
                 "execution_time_seconds": results['execution_time_seconds'],
-                "log": self.execution_log
+                "log": results['execution_log']
             }, f, indent=2, ensure_ascii=False)
         
-        print("[ORCHESTRATOR] ✓ Saved logs/execution_log.json")
+        print(f"[ORCHESTRATOR] ✓ Saved {path}")
     
     def _generate_markdown_report(self, results: Dict) -> str:
         """Generate comprehensive Markdown report"""
@@ -304,6 +643,10 @@ This report analyzes Facebook Ads performance for the undergarments category bas
 **Comparison Period:** {data_summary.get('comparison_rows', 0):,} records
 
 """
+            sampling = data_summary.get('sampling')
+            if sampling:
+                report += (f"**Sampled:** {sampling['sampled_rows']:,} of {sampling['population_rows']:,} rows "
+                           f"(stratified by date and campaign); metrics are estimates with 95% confidence intervals\n\n")
         
         report += "\n## Detailed Insights\n\n"
         
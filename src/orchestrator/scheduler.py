@@ -0,0 +1,105 @@
+"""
+Stage Scheduler - Runs a declared graph of pipeline stages
+
+Each node names the nodes it depends on and receives their outputs. Nodes
+whose dependencies are done run concurrently on a thread pool; nodes whose
+outputs are already known (e.g. stage cache hits) are not run, and neither
+is anything needed only by them.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, List, Any, Callable, Iterable
+
+
+class StageGraph:
+    """
+    Directed acyclic graph of named stages.
+    A node's function is called with {dependency name: output}.
+    """
+    
+    def __init__(self):
+        self.nodes = {}
+    
+    def add(self, name: str, func: Callable[[Dict[str, Any]], Any], depends_on: Iterable[str] = ()) -> 'StageGraph':
+        """
+        Declare a node (dependencies must already be declared, so the graph stays acyclic)
+        
+        Args:
+            name: Unique node name
+            func: Called with the outputs of depends_on, returns the node output
+            depends_on: Names of upstream nodes
+        """
+        depends_on = list(depends_on)
+        if name in self.nodes:
+            raise ValueError(f"Duplicate stage '{name}'")
+        unknown = [dep for dep in depends_on if dep not in self.nodes]
+        if unknown:
+            raise ValueError(f"Stage '{name}' depends on undeclared stages {unknown}")
+        self.nodes[name] = (func, depends_on)
+        return self
+    
+    def required(self, targets: Iterable[str], resolved: Dict[str, Any]) -> List[str]:
+        """Nodes that must run to produce targets, in declaration (topological) order"""
+        needed = set()
+        stack = [target for target in targets if target not in resolved]
+        while stack:
+            name = stack.pop()
+            if name in needed:
+                continue
+            needed.add(name)
+            stack.extend(dep for dep in self.nodes[name][1] if dep not in resolved)
+        return [name for name in self.nodes if name in needed]
+    
+    def run(self, targets: Iterable[str] = None, resolved: Dict[str, Any] = None,
+            max_workers: int = 4) -> Dict[str, Any]:
+        """
+        Run the nodes needed for targets
+        
+        Args:
+            targets: Nodes whose outputs are wanted (default: every node)
+            resolved: Outputs already known; these nodes are not run
+            max_workers: Thread pool size (1 runs the nodes inline, in declaration order)
+        
+        Returns:
+            Outputs of every resolved or executed node
+        
+        Raises:
+            The first exception raised by a node; nodes not yet started are cancelled
+        """
+        results = dict(resolved or {})
+        to_run = self.required(self.nodes if targets is None else targets, results)
+        
+        if max_workers <= 1:
+            for name in to_run:
+                results[name] = self._call(name, results)
+            return results
+        
+        waiting = {name: {dep for dep in self.nodes[name][1] if dep not in results} for name in to_run}
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            running = {}
+            
+            def submit_ready():
+                for name in [name for name, deps in waiting.items() if not deps]:
+                    del waiting[name]
+                    running[pool.submit(self._call, name, results)] = name
+            
+            submit_ready()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        for other in running:
+                            other.cancel()
+                        raise error
+                    results[name] = future.result()
+                    for deps in waiting.values():
+                        deps.discard(name)
+                submit_ready()
+        
+        return results
+    
+    def _call(self, name: str, results: Dict[str, Any]) -> Any:
+        func, depends_on = self.nodes[name]
+        return func({dep: results[dep] for dep in depends_on})
@@ -0,0 +1,185 @@
+"""
+Analysis Server - Long-lived local HTTP front end for the Orchestrator
+
+Keeps the agents and the parsed dataset in memory between queries, so a
+request pays only for the analysis itself. The dataset is rebuilt when the
+source file changes (size or mtime).
+
+Endpoints:
+    GET  /health   - server and dataset status
+    POST /analyze  - {"query": "..."} or {"queries": ["...", ...]} (batch, one data pass)
+"""
+
+import json
+from datetime import datetime
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, Tuple
+
+from src.orchestrator.orchestrator import Orchestrator
+from src.utils.dataset import AdsDataset
+
+
+class AnalysisServer:
+    """
+    Serves analysis queries over local HTTP with a warm Orchestrator and dataset.
+    Requests are handled one at a time (the agents keep per-run state).
+    """
+    
+    def __init__(self, config: Dict[str, Any], host: str = None, port: int = None):
+        self.config = config
+        server_config = config.get('server', {})
+        self.host = host or server_config.get('host', '127.0.0.1')
+        self.port = port if port is not None else server_config.get('port', 8765)
+        self.data_path = config.get('data_path', 'data/synthetic_fb_ads_undergarments.csv')
+        
+        self.orchestrator = Orchestrator(config)
+        self.dataset = None
+        self.httpd = None
+        
+        self.started_at = datetime.now()
+        self.dataset_loads = 0
+        self.queries_served = 0
+    
+    def current_dataset(self) -> AdsDataset:
+        """Warm dataset handle, rebuilt when the source file has changed"""
+        if self.dataset is not None and not self.dataset.is_stale():
+            return self.dataset
+        
+        if self.dataset is not None:
+            print(f"[SERVER] Source changed, reloading {self.data_path}")
+        
+        dataset = AdsDataset(self.data_path, self.config)
+        self._warm(dataset)
+        self.dataset = dataset
+        self.dataset_loads += 1
+        return dataset
+    
+    def _warm(self, dataset: AdsDataset):
+        """Load what the Data Agent will read, so queries only slice memory"""
+        if dataset.rollup_enabled:
+            dataset.rollup()
+        elif not self.orchestrator.data_agent.streaming:
+            # Spans are sliced from the full frame once it is loaded
+            dataset.df
+        dataset.date_range()
+    
+    def handle(self, request: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        """
+        Answer one /analyze request
+        
+        Args:
+            request: {"query": str} or {"queries": [str, ...]}
+        
+        Returns:
+            (HTTP status, response payload)
+        """
+        queries = request.get('queries')
+        query = request.get('query')
+        
+        if queries is not None:
+            if not isinstance(queries, list) or not queries or not all(isinstance(q, str) and q.strip() for q in queries):
+                return 400, self._error_payload("'queries' must be a non-empty list of query strings")
+        elif not isinstance(query, str) or not query.strip():
+            return 400, self._error_payload("Request needs a 'query' string or a 'queries' list")
+        
+        dataset = self.current_dataset()
+        
+        if queries is not None:
+            all_results = self.orchestrator.execute_batch(queries, dataset=dataset)
+            self.queries_served += len(queries)
+            failed = any(results.get('error', False) for results in all_results)
+            return (500 if failed else 200), {"results": all_results}
+        
+        results = self.orchestrator.execute(query, dataset=dataset)
+        self.queries_served += 1
+        return (500 if results.get('error', False) else 200), results
+    
+    def status(self) -> Dict[str, Any]:
+        """Health payload"""
+        dataset = self.dataset
+        return {
+            "status": "ok",
+            "started_at": self.started_at.isoformat(),
+            "uptime_seconds": (datetime.now() - self.started_at).total_seconds(),
+            "queries_served": self.queries_served,
+            "dataset_loads": self.dataset_loads,
+            "data_path": self.data_path,
+            "dataset": {
+                "loaded": dataset is not None,
+                "stale": dataset.is_stale() if dataset is not None else None,
+                "total_rows": dataset.total_rows if dataset is not None else None,
+                "latest_date": dataset.latest_date if dataset is not None else None
+            }
+        }
+    
+    def start(self) -> int:
+        """Load the dataset and bind the socket; returns the bound port"""
+        self.current_dataset()
+        self.httpd = HTTPServer((self.host, self.port), _AnalysisRequestHandler)
+        self.httpd.analysis = self
+        self.port = self.httpd.server_address[1]
+        print(f"[SERVER] Listening on http://{self.host}:{self.port}")
+        return self.port
+    
+    def serve_forever(self):
+        """Start (if needed) and serve until interrupted"""
+        if self.httpd is None:
+            self.start()
+        try:
+            self.httpd.serve_forever()
+        except KeyboardInterrupt:
+            print("\n[SERVER] Shutting down")
+        finally:
+            self.httpd.server_close()
+    
+    def shutdown(self):
+        """Stop a serve_forever loop running in another thread"""
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+    
+    def _error_payload(self, message: str) -> Dict[str, Any]:
+        return {"error": True, "message": message}
+
+
+class _AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """JSON request handler bound to an AnalysisServer (via server.analysis)"""
+    
+    def do_GET(self):
+        if self.path == '/health':
+            self._send(200, self.server.analysis.status())
+        else:
+            self._send(404, {"error": True, "message": f"Unknown path {self.path}"})
+    
+    def do_POST(self):
+        if self.path != '/analyze':
+            self._send(404, {"error": True, "message": f"Unknown path {self.path}"})
+            return
+        
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self._send(400, {"error": True, "message": "Request body must be JSON"})
+            return
+        if not isinstance(request, dict):
+            self._send(400, {"error": True, "message": "Request body must be a JSON object"})
+            return
+        
+        try:
+            status, payload = self.server.analysis.handle(request)
+        except Exception as e:
+            print(f"[SERVER] ERROR: {str(e)}")
+            status, payload = 500, {"error": True, "message": str(e)}
+        self._send(status, payload)
+    
+    def _send(self, status: int, payload: Dict[str, Any]):
+        body = json.dumps(payload, default=str, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        print(f"[SERVER] {self.address_string()} - {format % args}")
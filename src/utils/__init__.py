@@ -5,6 +5,7 @@ Kasparro Agentic FB Analyst - Utilities Package
 __version__ = '1.0.0'
 
 from .helpers import *
+from .dataset import AdsDataset, RawDataView
 
 __all__ = [
     'load_config',
@@ -15,5 +16,8 @@ __all__ = [
     'calculate_ctr',
     'calculate_cpc',
     'calculate_cpm',
-    'calculate_conversion_rate'
+    'calculate_conversion_rate',
+    'estimate_size',
+    'AdsDataset',
+    'RawDataView'
 ]
@@ -0,0 +1,155 @@
+"""
+Bootstrap percentile intervals for ratio metrics and their changes
+
+Ratio metrics (ROAS, CPC, ...) are ratios of two totals, so their
+variance has no simple closed form. The engine resamples aggregate units
+(days or adsets) with replacement, within each group (overall, or one
+segment value), and recomputes every ratio metric from the resampled
+totals. All groups and metrics are resampled together: one (B x n) index
+matrix per window, where column j only draws units of column j's group.
+B is split into chunks so the gathered (chunk x n x columns) array stays
+under a memory cap; the draws are the same whatever the chunk size.
+"""
+
+from typing import Dict, List, Any, Tuple
+
+import numpy as np
+
+from .sampling import RATIO_METRICS
+
+
+class BootstrapEngine:
+    """
+    Seeded, memory-capped bootstrap of grouped unit totals: percentile
+    intervals of each window's ratio metrics and of their percent change.
+    """
+    
+    def __init__(self, resamples: int = 1000, seed: int = 42, max_memory_mb: float = 64,
+                 level: float = 0.95, unit: str = 'day'):
+        """
+        Args:
+            resamples: Bootstrap resamples B (0 disables the engine)
+            seed: Random seed (config random_seed)
+            max_memory_mb: Cap on the resampled values held at once
+            level: Interval coverage
+            unit: Aggregate resampled: 'day' or 'adset'
+        """
+        if unit not in ('day', 'adset'):
+            raise ValueError(f"Bootstrap unit must be 'day' or 'adset', got {unit}")
+        self.resamples = resamples
+        self.seed = seed
+        self.max_memory_mb = max_memory_mb
+        self.level = level
+        self.unit = unit
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'BootstrapEngine':
+        """Engine from the agents.data_agent bootstrap_* settings, seeded from random_seed"""
+        data_agent_config = config.get('agents', {}).get('data_agent', {})
+        return cls(
+            resamples=data_agent_config.get('bootstrap_resamples', 0),
+            seed=config.get('random_seed', 42),
+            max_memory_mb=data_agent_config.get('bootstrap_memory_mb', 64),
+            unit=data_agent_config.get('bootstrap_unit', 'day')
+        )
+    
+    @property
+    def enabled(self) -> bool:
+        return self.resamples > 0
+    
+    def chunk_size(self, units: int, columns: int) -> int:
+        """Resamples per chunk so the index matrix and gathered values fit max_memory_mb"""
+        # Per resample and unit: uniform draw, index, and one float per column
+        per_resample = max(units, 1) * (columns + 2) * 8
+        return int(max(1, min(self.resamples, self.max_memory_mb * 1024 * 1024 // per_resample)))
+    
+    def change_intervals(self, baseline: Tuple[np.ndarray, np.ndarray], comparison: Tuple[np.ndarray, np.ndarray],
+                         n_groups: int, columns: List[str]) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        Percentile intervals of every ratio metric, per group, in both windows and for the change
+        
+        Args:
+            baseline: (values, groups) of the baseline units: an (n x columns)
+                array of additive totals and each unit's group code in [0, n_groups)
+            comparison: The same for the comparison units
+            n_groups: Number of groups
+            columns: Names of the value columns
+        
+        Returns:
+            {metric: {'baseline', 'comparison', 'percent_change': (n_groups x 2) bounds,
+            'p_value': (n_groups,) two-sided share of resampled changes across zero}}
+            for the RATIO_METRICS computable from columns; NaN where a group
+            has no units (or no denominator) in a window
+        """
+        index = {col: i for i, col in enumerate(columns)}
+        metrics = {
+            metric: (index[numerator], index[denominator], scale)
+            for metric, (numerator, denominator, scale) in RATIO_METRICS.items()
+            if numerator in index and denominator in index
+        }
+        rng = np.random.default_rng(self.seed)
+        draws = {
+            name: self._resample(values, groups, n_groups, metrics, rng)
+            for name, (values, groups) in (("baseline", baseline), ("comparison", comparison))
+        }
+        
+        tail = (1 - self.level) / 2 * 100
+        percentiles = [tail, 100 - tail]
+        results = {}
+        for metric in metrics:
+            base, current = draws["baseline"][metric], draws["comparison"][metric]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                change = np.where(base > 0, (current / base - 1) * 100, np.nan)
+            valid = np.isfinite(change)
+            counts = valid.sum(axis=0)
+            below = np.where(valid, change <= 0, False).sum(axis=0)
+            above = np.where(valid, change >= 0, False).sum(axis=0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                p_value = np.where(counts > 0, np.minimum(1.0, 2 * np.minimum(below, above) / counts), np.nan)
+            results[metric] = {
+                "baseline": self._percentiles(base, percentiles),
+                "comparison": self._percentiles(current, percentiles),
+                "percent_change": self._percentiles(change, percentiles),
+                "p_value": p_value
+            }
+        return results
+    
+    def _resample(self, values: np.ndarray, groups: np.ndarray, n_groups: int,
+                  metrics: Dict[str, Tuple[int, int, float]], rng: np.random.Generator) -> Dict[str, np.ndarray]:
+        """(B x n_groups) resampled ratio of each metric for one window"""
+        values = np.asarray(values, dtype='float64')
+        groups = np.asarray(groups, dtype=np.int64)
+        order = np.argsort(groups, kind='stable')
+        values, groups = values[order], groups[order]
+        sizes = np.bincount(groups, minlength=n_groups)
+        starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        present = sizes > 0
+        
+        results = {metric: np.full((self.resamples, n_groups), np.nan) for metric in metrics}
+        if not present.any():
+            return results
+        
+        # Column j draws among the units of its own group
+        column_start = starts[groups]
+        column_size = sizes[groups]
+        chunk = self.chunk_size(len(values), values.shape[1])
+        for lo in range(0, self.resamples, chunk):
+            hi = min(lo + chunk, self.resamples)
+            indices = column_start + (rng.random((hi - lo, len(values))) * column_size).astype(np.int64)
+            # Group totals of each resample: (chunk x groups present x columns)
+            totals = np.add.reduceat(values[indices], starts[present], axis=1)
+            for metric, (numerator, denominator, scale) in metrics.items():
+                den = totals[:, :, denominator]
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    ratio = np.where(den > 0, totals[:, :, numerator] / den * scale, np.nan)
+                results[metric][lo:hi, present] = ratio
+        return results
+    
+    def _percentiles(self, draws: np.ndarray, percentiles: List[float]) -> np.ndarray:
+        """(groups x 2) percentile bounds over the resamples, NaN for groups without valid draws"""
+        bounds = np.full((draws.shape[1], 2), np.nan)
+        valid = np.isfinite(draws).any(axis=0)
+        if valid.any():
+            with np.errstate(invalid='ignore'):
+                bounds[valid] = np.nanpercentile(draws[:, valid], percentiles, axis=0).T
+        return bounds
@@ -0,0 +1,195 @@
+"""
+Columnar on-disk cache for the ads dataset
+
+The first load converts the CSV to Parquet/Feather (typed, categoricals kept);
+later runs read the columnar copy as long as the source fingerprint matches.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, List, Any, Optional, Tuple
+
+import pandas as pd
+
+
+CACHE_SCHEMA_VERSION = 2
+HASH_CHUNK_BYTES = 4 * 1024 * 1024
+
+# Rows are stored sorted by date, so each row group covers a narrow date
+# range and span filters can skip most of them
+ROW_GROUP_ROWS = 250000
+
+
+def file_fingerprint(path: str, with_hash: bool = True) -> Dict[str, Any]:
+    """
+    Fingerprint a file by size, mtime and (optionally) a content hash
+    
+    Args:
+        path: File to fingerprint
+        with_hash: Also compute a BLAKE2 hash of the file contents
+    
+    Returns:
+        Dictionary with size, mtime_ns and content_hash
+    """
+    stat = os.stat(path)
+    fingerprint = {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "content_hash": None
+    }
+    
+    if with_hash:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+                digest.update(chunk)
+        fingerprint["content_hash"] = digest.hexdigest()
+    
+    return fingerprint
+
+
+def _resolve_format(requested: str) -> str:
+    """Pick a cache format, falling back to pickle when pyarrow is missing"""
+    if requested not in ('parquet', 'feather', 'pickle'):
+        print(f"[CACHE] Unknown cache format '{requested}', using parquet")
+        requested = 'parquet'
+    
+    if requested in ('parquet', 'feather'):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            print("[CACHE] pyarrow not installed, using pickle cache")
+            return 'pickle'
+    
+    return requested
+
+
+class ColumnarCache:
+    """
+    Columnar copy of a source CSV, invalidated when the source changes.
+    A sidecar JSON file records the source fingerprint the copy was built from.
+    """
+    
+    def __init__(self, source_path: str, cache_dir: str = 'data/.cache', cache_format: str = 'parquet'):
+        self.source_path = source_path
+        self.cache_dir = cache_dir
+        self.cache_format = _resolve_format(cache_format)
+        
+        stem = os.path.splitext(os.path.basename(source_path))[0]
+        path_key = hashlib.sha1(os.path.abspath(source_path).encode('utf-8')).hexdigest()[:8]
+        base = os.path.join(cache_dir, f"{stem}_{path_key}")
+        self.data_file = f"{base}.{self.cache_format}"
+        self.meta_file = f"{base}.meta.json"
+        self._meta = None
+    
+    def load(self, columns: List[str] = None, date_span: Tuple[pd.Timestamp, pd.Timestamp] = None) -> Optional[pd.DataFrame]:
+        """
+        Return the cached frame if it is still valid for the source file
+        
+        Args:
+            columns: Columns to read (columnar formats skip the others on disk)
+            date_span: Inclusive (start, end) date filter; Parquet prunes
+                row groups whose date statistics fall outside it
+        
+        Returns:
+            Cached DataFrame, or None on a miss
+        """
+        if not (os.path.exists(self.data_file) and os.path.exists(self.meta_file)):
+            return None
+        
+        try:
+            with open(self.meta_file, 'r') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if not self._is_fresh(meta):
+            print(f"[CACHE] Source changed, invalidating {self.data_file}")
+            return None
+        
+        if columns is not None:
+            columns = [col for col in columns if col in meta.get('columns', columns)]
+        
+        self._meta = meta
+        try:
+            return self._read(columns, date_span)
+        except Exception as e:
+            print(f"[CACHE] WARNING: Could not read cache ({str(e)})")
+            return None
+    
+    def row_count(self) -> Optional[int]:
+        """Rows in the cached copy (from the sidecar, no data read)"""
+        return (self._meta or {}).get('rows')
+    
+    def store(self, df: pd.DataFrame):
+        """Write the frame and its source fingerprint (atomically)"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_file = f"{self.data_file}.tmp"
+            self._write(df, tmp_file)
+            os.replace(tmp_file, self.data_file)
+            
+            meta = {
+                "schema_version": CACHE_SCHEMA_VERSION,
+                "format": self.cache_format,
+                "source_path": os.path.abspath(self.source_path),
+                "fingerprint": file_fingerprint(self.source_path),
+                "rows": len(df),
+                "columns": list(df.columns)
+            }
+            tmp_meta = f"{self.meta_file}.tmp"
+            with open(tmp_meta, 'w') as f:
+                json.dump(meta, f, indent=2)
+            os.replace(tmp_meta, self.meta_file)
+            
+            print(f"[CACHE] Wrote {self.cache_format} cache to {self.data_file}")
+        except Exception as e:
+            print(f"[CACHE] WARNING: Could not write cache ({str(e)})")
+    
+    def _is_fresh(self, meta: Dict[str, Any]) -> bool:
+        """Compare the stored fingerprint with the current source file"""
+        if meta.get('schema_version') != CACHE_SCHEMA_VERSION or meta.get('format') != self.cache_format:
+            return False
+        
+        stored = meta.get('fingerprint', {})
+        try:
+            current = file_fingerprint(self.source_path, with_hash=False)
+        except OSError:
+            return False
+        
+        if current['size'] != stored.get('size'):
+            return False
+        
+        # Same size and mtime: trust the cache without re-reading the source
+        if current['mtime_ns'] == stored.get('mtime_ns'):
+            return True
+        
+        # mtime moved (touch, copy, checkout) - fall back to the content hash
+        return file_fingerprint(self.source_path)['content_hash'] == stored.get('content_hash')
+    
+    def _read(self, columns: Optional[List[str]], date_span: Optional[Tuple]) -> pd.DataFrame:
+        if self.cache_format == 'parquet':
+            filters = None
+            if date_span is not None:
+                filters = [('date', '>=', date_span[0]), ('date', '<=', date_span[1])]
+            return pd.read_parquet(self.data_file, columns=columns, filters=filters)
+        
+        if self.cache_format == 'feather':
+            df = pd.read_feather(self.data_file, columns=columns)
+        else:
+            df = pd.read_pickle(self.data_file)
+            if columns is not None:
+                df = df[columns]
+        
+        if date_span is not None:
+            df = df[(df['date'] >= date_span[0]) & (df['date'] <= date_span[1])].reset_index(drop=True)
+        return df
+    
+    def _write(self, df: pd.DataFrame, path: str):
+        if self.cache_format == 'parquet':
+            df.to_parquet(path, index=False, row_group_size=ROW_GROUP_ROWS)
+        elif self.cache_format == 'feather':
+            df.reset_index(drop=True).to_feather(path)
+        else:
+            df.to_pickle(path)
@@ -0,0 +1,482 @@
+"""
+Shared dataset handle - loads the ads CSV once per run and hands the same
+DataFrame to every consumer (Orchestrator context, Data Agent)
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+from typing import Dict, List, Any, Optional, Callable, Tuple
+
+from .data_cache import ColumnarCache, file_fingerprint
+from .parallel_csv import read_csv_parallel, MIN_PARALLEL_BYTES
+
+
+# Dimension columns - low cardinality, stored as categoricals
+DIMENSION_COLUMNS = [
+    'campaign_name', 'adset_name', 'creative_type', 'creative_message',
+    'audience_type', 'platform', 'country'
+]
+
+# Additive metrics that get summed per window/segment
+ADDITIVE_COLUMNS = ['spend', 'revenue', 'impressions', 'clicks', 'purchases']
+
+# Declared dtypes for the known CSV columns. Spend/revenue stay float64 so
+# currency totals keep their cents; clicks has gaps and totals beyond float32's
+# exact-integer range, so it stays float64 too. Integer counts use int32 (sums
+# are promoted to int64) and the per-row ratios are never summed.
+COLUMN_DTYPES = {
+    **{col: 'category' for col in DIMENSION_COLUMNS},
+    'spend': 'float64',
+    'revenue': 'float64',
+    'clicks': 'float64',
+    'impressions': 'int32',
+    'purchases': 'int32',
+    'ctr': 'float32',
+    'roas': 'float32'
+}
+
+# Columns loaded by default. creative_message and the precomputed per-row
+# ctr/roas are never used by the pipeline (ratios are recomputed from sums).
+LOAD_COLUMNS = ['date'] + ADDITIVE_COLUMNS + [
+    'campaign_name', 'adset_name', 'creative_type', 'audience_type', 'platform', 'country'
+]
+
+
+class AdsDataset:
+    """
+    Lazily loaded, shared view of the Facebook Ads dataset.
+    The file is parsed on first access and reused for the rest of the run.
+    """
+    
+    def __init__(self, data_path: str, config: Dict[str, Any] = None, columns: List[str] = None):
+        self.data_path = data_path
+        self.config = config or {}
+        
+        data_agent_config = self.config.get('agents', {}).get('data_agent', {})
+        self.columns = list(columns or data_agent_config.get('load_columns') or LOAD_COLUMNS)
+        if 'date' not in self.columns:
+            self.columns.insert(0, 'date')
+        self.cache_enabled = data_agent_config.get('cache_data', False)
+        self.cache_dir = data_agent_config.get('cache_dir', 'data/.cache')
+        self.cache_format = data_agent_config.get('cache_format', 'parquet')
+        self.chunk_rows = data_agent_config.get('chunk_rows', 500000)
+        self.parse_workers = data_agent_config.get('parse_workers', 1)
+        self.parallel_min_bytes = data_agent_config.get('parallel_min_bytes', MIN_PARALLEL_BYTES)
+        self.rollup_enabled = data_agent_config.get('rollup_store', False)
+        self.rollup_dir = data_agent_config.get('rollup_dir', 'data/.rollup')
+        
+        self._df = None
+        self._date_range = None
+        self._total_rows = None
+        self._spans = {}
+        self._load_attempted = False
+        self._rollup = None
+        self._rollup_attempted = False
+        self._source_stat = self._stat_source()
+    
+    @property
+    def df(self) -> Optional[pd.DataFrame]:
+        """Loaded DataFrame, or None if the file could not be read"""
+        if not self._load_attempted:
+            self._df = self._load()
+            self._load_attempted = True
+        return self._df
+    
+    @property
+    def is_loaded(self) -> bool:
+        """True once the file has been parsed (successfully or not)"""
+        return self._load_attempted
+    
+    def is_stale(self) -> bool:
+        """True if the source file changed (size or mtime) since this handle was created"""
+        return self._stat_source() != self._source_stat
+    
+    def fingerprint(self) -> Dict[str, Any]:
+        """Identity of the source file as seen by this handle: absolute path, size and mtime"""
+        size, mtime_ns = self._source_stat or (None, None)
+        return {"path": os.path.abspath(self.data_path), "size": size, "mtime_ns": mtime_ns}
+    
+    def _stat_source(self) -> Optional[tuple]:
+        """(size, mtime_ns) of the source file, or None if it cannot be read"""
+        try:
+            fingerprint = file_fingerprint(self.data_path, with_hash=False)
+        except OSError:
+            return None
+        return fingerprint['size'], fingerprint['mtime_ns']
+    
+    def date_range(self) -> Dict[str, pd.Timestamp]:
+        """
+        Min/max date of the dataset, computed once.
+        Before a full load this only scans the date column (or reads the
+        rollup store or the cache's date column, when enabled), so a later
+        load_span still reads just its span.
+        """
+        if self._date_range is None and self.rollup_enabled and not self._load_attempted:
+            # The refreshed rollup already knows the dates and row count
+            self.rollup()
+        
+        if self._date_range is None and not self._rollup_attempted:
+            dates = None
+            if not self._load_attempted and self.cache_enabled:
+                dates = ColumnarCache(self.data_path, self.cache_dir, self.cache_format).load(['date'])
+            
+            if dates is None and (self._load_attempted or self.cache_enabled):
+                dates = self.df
+            
+            if dates is not None:
+                self._set_date_stats(dates['date'].min(), dates['date'].max(), len(dates))
+            elif not self._load_attempted:
+                self._scan_dates()
+        return self._date_range or {}
+    
+    @property
+    def total_rows(self) -> int:
+        """Row count of the whole file (not just a loaded span)"""
+        if self._total_rows is None:
+            self.date_range()
+        return self._total_rows or 0
+    
+    @property
+    def latest_date(self) -> Optional[str]:
+        """Latest date in the dataset as YYYY-MM-DD"""
+        date_range = self.date_range()
+        if not date_range:
+            return None
+        return date_range['max'].strftime('%Y-%m-%d')
+    
+    def rollup(self) -> Optional[pd.DataFrame]:
+        """
+        Daily (date x dimensions) rollup from the materialized store,
+        refreshed incrementally from the source once per handle
+        
+        Returns:
+            Rollup frame (see RollupStore.refresh), or None if the file could not be read
+        """
+        if not self._rollup_attempted:
+            # Imported here: rollup_store builds on this module
+            from .rollup_store import RollupStore
+            
+            self._rollup_attempted = True
+            try:
+                store = RollupStore(self.data_path, self.rollup_dir, self.cache_format, self.chunk_rows)
+                self._rollup = store.refresh()
+            except FileNotFoundError:
+                print(f"[DATASET] ERROR: File not found at {self.data_path}")
+                return None
+            except Exception as e:
+                print(f"[DATASET] ERROR: {str(e)}")
+                return None
+            
+            if len(self._rollup) > 0:
+                self._set_date_stats(self._rollup['date'].min(), self._rollup['date'].max(), int(self._rollup['rows'].sum()))
+            else:
+                self._set_date_stats(None, None, 0)
+        return self._rollup
+    
+    def load_span(self, start_date: str, end_date: str) -> Optional[pd.DataFrame]:
+        """
+        Rows with start_date <= date <= end_date, with the date predicate
+        pushed into the read: chunked CSV reading drops out-of-span rows as
+        they are parsed, and the Parquet cache prunes whole row groups.
+        
+        Args:
+            start_date: First date of the span (inclusive)
+            end_date: Last date of the span (inclusive)
+        
+        Returns:
+            DataFrame holding only the span, or None if the file could not be read
+        """
+        start = pd.to_datetime(start_date)
+        end = pd.to_datetime(end_date)
+        key = (start, end)
+        
+        if key not in self._spans:
+            try:
+                if self._load_attempted:
+                    df = self._df
+                    span = None if df is None else slice_date_range(df, start, end)
+                elif self.cache_enabled:
+                    span = self._load_span_cached(start, end)
+                else:
+                    span = self._read_csv_span(start, end)
+            except FileNotFoundError:
+                print(f"[DATASET] ERROR: File not found at {self.data_path}")
+                span = None
+            except Exception as e:
+                print(f"[DATASET] ERROR: {str(e)}")
+                span = None
+            self._spans[key] = span
+        
+        return self._spans[key]
+    
+    def iter_chunks(self, chunk_rows: int = None):
+        """
+        Iterate over the CSV in typed chunks, without keeping any of them
+        
+        Args:
+            chunk_rows: Rows per chunk (defaults to the configured chunk_rows)
+        
+        Returns:
+            Iterator of DataFrames with the loaded columns
+        """
+        return self._csv_chunks(self.columns, chunk_rows)
+    
+    def estimate_row_bytes(self, sample_rows: int = 1000) -> int:
+        """In-memory bytes per parsed row, measured on the head of the file"""
+        sample = next(iter(self._csv_chunks(self.columns, sample_rows)), None)
+        if sample is None or len(sample) == 0:
+            return 0
+        return max(1, int(sample.memory_usage(deep=True).sum() / len(sample)))
+    
+    def _set_date_stats(self, min_date, max_date, rows: int):
+        if rows > 0:
+            self._date_range = {"min": min_date, "max": max_date}
+        self._total_rows = rows
+    
+    def _scan_dates(self):
+        """Compute the date range and row count from the date column alone"""
+        min_date, max_date, rows = None, None, 0
+        try:
+            for chunk in self._csv_chunks(['date']):
+                if len(chunk) == 0:
+                    continue
+                rows += len(chunk)
+                chunk_min, chunk_max = chunk['date'].min(), chunk['date'].max()
+                min_date = chunk_min if min_date is None else min(min_date, chunk_min)
+                max_date = chunk_max if max_date is None else max(max_date, chunk_max)
+        except FileNotFoundError:
+            print(f"[DATASET] ERROR: File not found at {self.data_path}")
+            return
+        except Exception as e:
+            print(f"[DATASET] ERROR: {str(e)}")
+            return
+        self._set_date_stats(min_date, max_date, rows)
+    
+    def _load_span_cached(self, start: pd.Timestamp, end: pd.Timestamp) -> Optional[pd.DataFrame]:
+        """Serve a span from the columnar cache, building it on a miss"""
+        cache = ColumnarCache(self.data_path, self.cache_dir, self.cache_format)
+        span = cache.load(self.columns, date_span=(start, end))
+        if span is None:
+            # Cache miss: the full read builds the cache, then filter in memory
+            df = self.df
+            if df is None:
+                return None
+            return slice_date_range(df, start, end)
+        
+        if self._total_rows is None:
+            self._total_rows = cache.row_count()
+        print(f"[DATASET] Loaded {len(span)} rows in span from cache {cache.data_file}")
+        return sort_by_date(span)
+    
+    def _read_csv_span(self, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        """Chunked CSV read keeping only rows inside the span"""
+        if self._use_parallel():
+            frames, stats = read_csv_parallel(self.data_path, self.parse_workers, self.columns, COLUMN_DTYPES, (start, end))
+            if self._date_range is None:
+                self._set_date_stats(stats['min'], stats['max'], stats['rows'])
+            return sort_by_date(concat_frames(frames))
+        
+        parts = []
+        min_date, max_date, rows = None, None, 0
+        empty = None
+        
+        for chunk in self._csv_chunks(self.columns):
+            if empty is None:
+                empty = chunk.iloc[:0]
+            if len(chunk) == 0:
+                continue
+            
+            # The full file is scanned anyway, so collect the date stats too
+            rows += len(chunk)
+            chunk_min, chunk_max = chunk['date'].min(), chunk['date'].max()
+            min_date = chunk_min if min_date is None else min(min_date, chunk_min)
+            max_date = chunk_max if max_date is None else max(max_date, chunk_max)
+            
+            if chunk_max < start or chunk_min > end:
+                continue
+            mask = (chunk['date'] >= start) & (chunk['date'] <= end)
+            if mask.any():
+                parts.append(chunk[mask])
+        
+        if self._date_range is None:
+            self._set_date_stats(min_date, max_date, rows)
+        
+        if not parts:
+            return empty
+        return sort_by_date(concat_frames(parts))
+    
+    def _csv_chunks(self, columns: Optional[List[str]], chunk_rows: int = None):
+        """Iterate over the CSV in typed chunks of chunk_rows rows"""
+        return pd.read_csv(
+            self.data_path,
+            usecols=self._usecols(columns),
+            dtype=COLUMN_DTYPES,
+            parse_dates=['date'],
+            date_format='%Y-%m-%d',
+            chunksize=chunk_rows or self.chunk_rows
+        )
+    
+    def _use_parallel(self) -> bool:
+        """Parse across processes only when configured and the file is big enough to pay off"""
+        return self.parse_workers > 1 and os.path.getsize(self.data_path) >= self.parallel_min_bytes
+    
+    def _usecols(self, columns: Optional[List[str]]):
+        if columns is None:
+            return None
+        wanted = set(columns) | {'date'}
+        return lambda col: col in wanted
+    
+    def _load(self) -> Optional[pd.DataFrame]:
+        """Load from the columnar cache when fresh, otherwise parse the CSV"""
+        try:
+            cache = None
+            if self.cache_enabled:
+                cache = ColumnarCache(self.data_path, self.cache_dir, self.cache_format)
+                df = cache.load(self.columns)
+                if df is not None:
+                    print(f"[DATASET] Loaded {len(df)} rows from cache {cache.data_file}")
+                    return sort_by_date(df)
+                
+                # The cache holds every known column so later column selections
+                # can still be served from it
+                df = sort_by_date(self._read_csv(columns=None))
+                cache.store(df)
+                return df[[col for col in self.columns if col in df.columns]]
+            
+            return sort_by_date(self._read_csv(self.columns))
+        except FileNotFoundError:
+            print(f"[DATASET] ERROR: File not found at {self.data_path}")
+            return None
+        except Exception as e:
+            print(f"[DATASET] ERROR: {str(e)}")
+            return None
+    
+    def _read_csv(self, columns: Optional[List[str]]) -> pd.DataFrame:
+        """
+        Parse the CSV with the declared schema
+        
+        Args:
+            columns: Columns to keep (None keeps every column in the file)
+        
+        Returns:
+            Typed DataFrame with date parsed during the read
+        """
+        if self._use_parallel():
+            frames, _ = read_csv_parallel(self.data_path, self.parse_workers, columns, COLUMN_DTYPES)
+            return concat_frames(frames)
+        
+        return pd.read_csv(
+            self.data_path,
+            usecols=self._usecols(columns),
+            dtype=COLUMN_DTYPES,
+            parse_dates=['date'],
+            date_format='%Y-%m-%d'
+        )
+
+
+class RawDataView:
+    """
+    Lazy accessor for the rows behind each analysis window.
+    Holds references to the window slices; nothing is converted until a
+    caller asks for records, a frame or a NumPy array.
+    """
+    
+    def __init__(self, windows: Dict[str, pd.DataFrame],
+                 enrich: Callable[[pd.DataFrame], pd.DataFrame] = None):
+        self._windows = windows
+        self._enrich = enrich
+    
+    def keys(self) -> List[str]:
+        return list(self._windows.keys())
+    
+    def __contains__(self, window: str) -> bool:
+        return window in self._windows
+    
+    def row_counts(self) -> Dict[str, int]:
+        """Rows per window, without materializing anything"""
+        return {window: len(df) for window, df in self._windows.items()}
+    
+    def frame(self, window: str) -> pd.DataFrame:
+        """Window rows as a DataFrame (with derived metrics, if configured)"""
+        df = self._windows[window]
+        return self._enrich(df) if self._enrich else df
+    
+    def records(self, window: str) -> List[Dict[str, Any]]:
+        """Window rows as a list of dicts - the expensive, fully materialized form"""
+        return self.frame(window).to_dict('records')
+    
+    def to_numpy(self, window: str, columns: List[str] = None) -> np.ndarray:
+        """Raw window columns as a NumPy array (no per-row Python objects)"""
+        df = self._windows[window]
+        return (df if columns is None else df[columns]).to_numpy()
+    
+    def __getitem__(self, window: str) -> List[Dict[str, Any]]:
+        # Keeps raw_data['baseline'] working for callers of the old dict form
+        return self.records(window)
+    
+    def __repr__(self) -> str:
+        counts = ", ".join(f"{window}={rows} rows" for window, rows in self.row_counts().items())
+        return f"RawDataView({counts})"
+
+
+def sort_by_date(df: pd.DataFrame) -> pd.DataFrame:
+    """Stable sort by date, skipped when the frame is already ordered"""
+    if df['date'].is_monotonic_increasing:
+        return df
+    return df.sort_values('date', kind='stable', ignore_index=True)
+
+
+def slice_date_range(df: pd.DataFrame, start: pd.Timestamp, end: pd.Timestamp,
+                     date_index: pd.DatetimeIndex = None) -> pd.DataFrame:
+    """
+    Rows of a date-sorted frame with start <= date <= end
+    
+    Two binary searches over the date column replace full boolean masks. The
+    result is a positional slice that shares memory with df: treat it as
+    read-only and .copy() before mutating (pandas copy-on-write does this
+    automatically).
+    
+    Args:
+        df: Frame sorted by date (see sort_by_date)
+        start: First date (inclusive)
+        end: Last date (inclusive)
+        date_index: Precomputed DatetimeIndex over df['date'], if available
+    
+    Returns:
+        Slice of df
+    """
+    if date_index is None:
+        date_index = pd.DatetimeIndex(df['date'])
+    lo, hi = date_bounds(date_index, start, end)
+    return df.iloc[lo:hi]
+
+
+def date_bounds(date_index: pd.DatetimeIndex, start, end) -> Tuple[int, int]:
+    """Positional [lo, hi) bounds of the inclusive range start..end in a sorted DatetimeIndex"""
+    lo = int(date_index.searchsorted(pd.to_datetime(start), side='left'))
+    hi = int(date_index.searchsorted(pd.to_datetime(end), side='right'))
+    return lo, max(lo, hi)
+
+
+def concat_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenate typed chunks without losing categoricals
+    
+    Chunks parsed separately carry different category sets, which plain
+    pd.concat would widen to object dtype; categorical columns are merged
+    with union_categoricals instead.
+    """
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+    
+    columns = list(frames[0].columns)
+    category_cols = [col for col in columns if isinstance(frames[0][col].dtype, pd.CategoricalDtype)]
+    
+    combined = pd.concat([frame.drop(columns=category_cols) for frame in frames], ignore_index=True)
+    for col in category_cols:
+        combined[col] = union_categoricals([frame[col] for frame in frames], sort_categories=True)
+    
+    return combined[columns]
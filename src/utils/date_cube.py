@@ -0,0 +1,180 @@
+"""
+Prefix-sum date cube over the additive ad metrics
+
+Rows are rolled up to one record per (date, *segments) and cumulative sums
+are kept in date order, so the totals of any inclusive date window - overall
+or per segment value - are the difference of two prefix rows. Any number of
+windows is answered without touching the raw rows again.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Tuple
+
+from .dataset import ADDITIVE_COLUMNS, date_bounds
+
+
+class _PrefixSums:
+    """
+    Cumulative sums over (code, day) keys, sorted by code then day.
+    The rows of one code in a day range are contiguous, so a window total
+    per code is prefix[end] - prefix[start] with both found by binary search.
+    Prefixes are kept in extended precision (where the platform has it) so
+    subtracting two large running totals does not leak rounding error into
+    small windows.
+    """
+    
+    def __init__(self, codes: np.ndarray, day_idx: np.ndarray, values: np.ndarray, n_days: int):
+        order = np.lexsort((day_idx, codes))
+        self.n_days = n_days
+        self.keys = codes[order].astype(np.int64) * n_days + day_idx[order]
+        self.prefix = np.vstack([
+            np.zeros((1, values.shape[1]), dtype=np.longdouble),
+            np.cumsum(values[order], axis=0, dtype=np.longdouble)
+        ])
+    
+    def query(self, codes: np.ndarray, lo, hi) -> np.ndarray:
+        """Totals of days [lo, hi) for each code (one row per code; lo/hi may be per-code arrays)"""
+        base = codes.astype(np.int64) * self.n_days
+        start = np.searchsorted(self.keys, base + lo, side='left')
+        end = np.searchsorted(self.keys, base + hi, side='left')
+        return (self.prefix[end] - self.prefix[start]).astype(np.float64)
+
+
+class DateCube:
+    """
+    Per-day and per-day x segment prefix sums of the additive metrics
+    (plus a 'rows' count), answering date-window totals in O(log days).
+    """
+    
+    def __init__(self, rollup: pd.DataFrame, segments: List[str] = None):
+        """
+        Args:
+            rollup: One row per (date, *segments) with summed additive
+                columns and a 'rows' count (see DateCube.rollup)
+            segments: Segment columns present in the rollup
+        """
+        self.segments = [segment for segment in (segments or []) if segment in rollup.columns]
+        self.columns = [col for col in ADDITIVE_COLUMNS if col in rollup.columns] + ['rows']
+        self.dtypes = rollup[self.columns].dtypes
+        
+        self.days = pd.DatetimeIndex(rollup['date'].unique()).sort_values()
+        self._rollup = rollup
+        self._day_idx = self.days.get_indexer(rollup['date'])
+        self._values = rollup[self.columns].to_numpy(dtype='float64')
+        
+        self._totals = _PrefixSums(np.zeros(len(rollup), dtype=np.int64), self._day_idx, self._values, len(self.days))
+        self._segment_sums = {}
+    
+    @staticmethod
+    def rollup(df: pd.DataFrame, segments: List[str] = None, extra: pd.DataFrame = None,
+               weights: np.ndarray = None) -> pd.DataFrame:
+        """
+        Sum the additive columns of raw rows per (date, *segments)
+        
+        Args:
+            df: Raw rows with a date column
+            segments: Segment columns to keep in the grain
+            extra: Additional per-row columns (aligned with df) to sum along,
+                e.g. quality counters
+            weights: Per-row weights (sampled rows); additive columns and
+                'rows' become weighted, i.e. estimated, sums
+        
+        Returns:
+            Rollup frame with date, segments, additive sums, 'rows' and any extra columns
+        """
+        segments = [segment for segment in (segments or []) if segment in df.columns]
+        columns = [col for col in ADDITIVE_COLUMNS if col in df.columns]
+        values = df[columns] if weights is None else df[columns].mul(weights, axis=0)
+        if extra is not None:
+            values = pd.concat([values, extra], axis=1)
+        keys = [df['date']] + [df[segment] for segment in segments]
+        # dropna=False keeps rows with a missing segment value in the totals
+        return values.assign(rows=1 if weights is None else weights).groupby(
+            keys, observed=True, dropna=False
+        ).sum().reset_index()
+    
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, segments: List[str] = None, weights: np.ndarray = None) -> 'DateCube':
+        """Build the cube from raw rows (weighted when they are a sample)"""
+        segments = [segment for segment in (segments or []) if segment in df.columns]
+        return cls(cls.rollup(df, segments, weights=weights), segments)
+    
+    def day_bounds(self, start: pd.Timestamp, end: pd.Timestamp) -> Tuple[int, int]:
+        """Day positions [lo, hi) covered by the inclusive window start..end"""
+        return date_bounds(self.days, start, end)
+    
+    def totals(self, windows: Dict[str, Tuple[pd.Timestamp, pd.Timestamp]]) -> pd.DataFrame:
+        """
+        Totals for many inclusive date windows at once
+        
+        Args:
+            windows: {name: (start, end)}
+        
+        Returns:
+            DataFrame indexed by window name with the additive columns and 'rows'
+        """
+        bounds = np.array([self.day_bounds(start, end) for start, end in windows.values()], dtype=np.int64).reshape(-1, 2)
+        sums = self._totals.query(np.zeros(len(bounds), dtype=np.int64), bounds[:, 0], bounds[:, 1])
+        result = pd.DataFrame(sums, index=list(windows.keys()), columns=self.columns)
+        return self._restore_dtypes(result)
+    
+    def daily_totals(self, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        """
+        Totals per day of one inclusive date window
+        
+        Returns:
+            DataFrame indexed by date (days with data only) with the additive columns and 'rows'
+        """
+        lo, hi = self.day_bounds(start, end)
+        days = np.arange(lo, hi, dtype=np.int64)
+        sums = self._totals.query(np.zeros(len(days), dtype=np.int64), days, days + 1)
+        result = pd.DataFrame(sums, index=self.days[lo:hi], columns=self.columns)
+        return self._restore_dtypes(result)
+    
+    def grouped_totals(self, keys: List[str], start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        """
+        Totals per combination of keys (date and/or segments) over one inclusive date window
+        
+        Read from the rollup rather than the prefix sums, for groupings the
+        cube does not index (e.g. segment x day, or adsets within a campaign).
+        
+        Returns:
+            DataFrame indexed by the keys (combinations with data only)
+        """
+        dates = self._rollup['date']
+        window = self._rollup[(dates >= pd.to_datetime(start)) & (dates <= pd.to_datetime(end))]
+        result = window.groupby(keys, observed=True, dropna=False)[self.columns].sum()
+        return self._restore_dtypes(result)
+    
+    def segment_totals(self, segment: str, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        """
+        Totals per value of a segment for one inclusive date window
+        
+        Returns:
+            DataFrame indexed by segment value (every value in the cube, zero
+            rows where the value has no data in the window)
+        """
+        values, sums = self._segment_index(segment)
+        window = sums.query(np.arange(len(values)), *self.day_bounds(start, end))
+        result = pd.DataFrame(window, index=values, columns=self.columns)
+        return self._restore_dtypes(result)
+    
+    def _segment_index(self, segment: str):
+        if segment not in self._segment_sums:
+            column = self._rollup[segment]
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                values = pd.CategoricalIndex(column.cat.categories, dtype=column.dtype, name=segment)
+            else:
+                values = pd.Index(np.sort(column.dropna().unique()), name=segment)
+            # Missing values get code -1: they sort before every queried code
+            codes = values.get_indexer(column)
+            self._segment_sums[segment] = (values, _PrefixSums(codes, self._day_idx, self._values, len(self.days)))
+        return self._segment_sums[segment]
+    
+    def _restore_dtypes(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """Cast summed integer columns back to integers (int64: window totals outgrow int32 row dtypes)"""
+        for col, dtype in self.dtypes.items():
+            if pd.api.types.is_integer_dtype(dtype):
+                frame[col] = np.rint(frame[col].to_numpy()).astype(np.int64)
+        return frame
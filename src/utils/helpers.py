@@ -4,6 +4,7 @@ Utility helper functions for the agentic system
 
 import json
 import os
+import sys
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 import re
@@ -278,6 +279,73 @@ def rank_items_by_score(items: List[Dict], score_key: str = 'score',
     return sorted_items
 
 
+def estimate_size(obj: Any, sample_limit: int = 50, max_depth: int = 6, max_nodes: int = 10000) -> int:
+    """
+    Estimate the in-memory size of a nested structure in bytes, at bounded cost
+    
+    Containers longer than sample_limit are measured on their first
+    sample_limit items and extrapolated; recursion stops at max_depth.
+    At most max_nodes objects are measured in total: once that budget is
+    spent, every container extrapolates from the items measured so far.
+    DataFrames/Series and NumPy arrays report their buffer sizes.
+    
+    Args:
+        obj: Object to measure
+        sample_limit: Items measured per container before extrapolating
+        max_depth: Maximum nesting depth to descend into
+        max_nodes: Objects measured across the whole structure
+    
+    Returns:
+        Approximate size in bytes
+    """
+    return _estimate_size(obj, sample_limit, max_depth, [max_nodes])
+
+
+def _estimate_size(obj: Any, sample_limit: int, max_depth: int, budget: List[int]) -> int:
+    """estimate_size with the node budget shared by every level (budget[0] is what is left)"""
+    budget[0] -= 1
+    
+    # pandas / NumPy objects: use their own buffer accounting (no deep scan).
+    # Checked before sys.getsizeof, which on pandas objects runs a deep
+    # memory_usage over object columns
+    if hasattr(obj, 'memory_usage') and hasattr(obj, 'shape'):
+        usage = obj.memory_usage(deep=False)
+        return int(usage.sum() if hasattr(usage, 'sum') else usage)
+    if hasattr(obj, 'nbytes') and hasattr(obj, 'dtype'):
+        return int(obj.nbytes)
+    
+    size = sys.getsizeof(obj)
+    if max_depth <= 0:
+        return size
+    
+    if isinstance(obj, dict):
+        items = obj.items()
+        count = len(obj)
+        measure = lambda kv: (_estimate_size(kv[0], sample_limit, max_depth - 1, budget)
+                              + _estimate_size(kv[1], sample_limit, max_depth - 1, budget))
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        items = obj
+        count = len(obj)
+        measure = lambda item: _estimate_size(item, sample_limit, max_depth - 1, budget)
+    else:
+        return size
+    
+    if count == 0:
+        return size
+    
+    sampled = 0
+    sampled_size = 0
+    for item in items:
+        if sampled >= sample_limit or budget[0] <= 0:
+            break
+        sampled_size += measure(item)
+        sampled += 1
+    
+    if sampled == 0:
+        return size
+    return size + int(sampled_size * count / sampled)
+
+
 def merge_dicts(*dicts: Dict) -> Dict:
     """Merge multiple dictionaries"""
     result = {}
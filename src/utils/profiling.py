@@ -0,0 +1,101 @@
+"""
+Opt-in per-stage profiling: wall time, CPU time, peak allocation and cProfile dumps
+
+CPU time and tracemalloc peaks are process-wide, so they are only
+attributable to a stage while stages run one at a time (the Orchestrator
+runs its stage graph serially when profiling is enabled).
+"""
+
+import cProfile
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, Iterator, Optional
+
+from .helpers import sanitize_filename
+
+
+class StageProfiler:
+    """
+    Measures one stage at a time. When disabled, profile() yields an empty
+    dict and adds no overhead beyond the context manager itself.
+    """
+    
+    def __init__(self, enabled: bool = False, trace_memory: bool = True,
+                 cprofile: bool = False, profile_dir: str = 'logs/profiles'):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.cprofile = cprofile
+        self.profile_dir = profile_dir
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'StageProfiler':
+        """Build from the 'profiling' config section"""
+        profiling_config = config.get('profiling', {})
+        logs_dir = config.get('output', {}).get('logs_dir', 'logs')
+        return cls(
+            enabled=profiling_config.get('enabled', False),
+            trace_memory=profiling_config.get('trace_memory', True),
+            cprofile=profiling_config.get('cprofile', False),
+            profile_dir=profiling_config.get('profile_dir') or os.path.join(logs_dir, 'profiles')
+        )
+    
+    @contextmanager
+    def profile(self, stage: str) -> Iterator[Dict[str, Any]]:
+        """
+        Profile the enclosed block
+        
+        Yields a dict that is filled in when the block exits (also on error):
+        wall_time and cpu_time in seconds, peak_memory_bytes (allocation
+        peak above the memory held when the stage started) and profile_path.
+        """
+        metrics = {}
+        if not self.enabled:
+            yield metrics
+            return
+        
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+            memory_start = tracemalloc.get_traced_memory()[0]
+        
+        profiler = cProfile.Profile() if self.cprofile else None
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        
+        try:
+            yield metrics
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            metrics["wall_time"] = time.perf_counter() - wall_start
+            metrics["cpu_time"] = time.process_time() - cpu_start
+            
+            if self.trace_memory:
+                metrics["peak_memory_bytes"] = max(0, tracemalloc.get_traced_memory()[1] - memory_start)
+                if started_tracing:
+                    tracemalloc.stop()
+            
+            if profiler is not None:
+                metrics["profile_path"] = self._dump(profiler, stage)
+    
+    def _dump(self, profiler: cProfile.Profile, stage: str) -> Optional[str]:
+        """Write a .prof file (readable with pstats or snakeviz); None if it could not be written"""
+        path = os.path.join(
+            self.profile_dir,
+            f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{sanitize_filename(stage)}.prof"
+        )
+        try:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            profiler.dump_stats(path)
+            return path
+        except OSError as e:
+            print(f"[PROFILER] WARNING: Could not write {path} ({str(e)})")
+            return None
@@ -0,0 +1,253 @@
+"""
+Materialized daily rollup of the ads CSV with incremental append ingestion
+
+The store keeps one row per (date, campaign, adset, creative_type,
+audience_type, platform, country) with the summed additive metrics, a row
+count and data-quality counters. A watermark records the last ingested date
+and the byte offset read so far: when the export only grew, just the appended
+bytes are parsed and rows newer than the watermark are merged in, so a daily
+refresh costs time proportional to the new data.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, List, Any, Optional
+
+import pandas as pd
+
+from .data_cache import _resolve_format
+from .dataset import ADDITIVE_COLUMNS, COLUMN_DTYPES, concat_frames
+from .date_cube import DateCube
+
+
+ROLLUP_SCHEMA_VERSION = 1
+
+# Grain of the rollup (besides date)
+ROLLUP_DIMENSIONS = ['campaign_name', 'adset_name', 'creative_type', 'audience_type', 'platform', 'country']
+
+# Columns parsed from the CSV; the quality counters cover all of them
+ROLLUP_COLUMNS = ['date'] + ADDITIVE_COLUMNS + ROLLUP_DIMENSIONS
+
+# Bytes before the stored offset that must be unchanged for an append-only refresh
+TAIL_CHECK_BYTES = 64 * 1024
+
+
+def _tail_hash(path: str, offset: int) -> str:
+    """Hash of the TAIL_CHECK_BYTES ending at offset"""
+    start = max(0, offset - TAIL_CHECK_BYTES)
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(offset - start)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class RollupStore:
+    """
+    Persistent (date x dimensions) rollup of a source CSV, refreshed
+    incrementally while the source is only appended to.
+    """
+    
+    def __init__(self, source_path: str, store_dir: str = 'data/.rollup',
+                 store_format: str = 'parquet', chunk_rows: int = 500000):
+        self.source_path = source_path
+        self.store_dir = store_dir
+        self.store_format = _resolve_format(store_format)
+        self.chunk_rows = chunk_rows
+        
+        stem = os.path.splitext(os.path.basename(source_path))[0]
+        path_key = hashlib.sha1(os.path.abspath(source_path).encode('utf-8')).hexdigest()[:8]
+        base = os.path.join(store_dir, f"{stem}_{path_key}")
+        self.data_file = f"{base}.rollup.{self.store_format}"
+        self.meta_file = f"{base}.rollup.meta.json"
+        self.meta = None
+    
+    def refresh(self) -> pd.DataFrame:
+        """
+        Bring the rollup up to date with the source file and return it
+        
+        Returns:
+            Rollup frame: date, ROLLUP_DIMENSIONS, additive sums, 'rows' and
+            quality counters (see quality_counters)
+        """
+        meta, rollup = self._read()
+        stat = os.stat(self.source_path)
+        
+        if rollup is not None and stat.st_size == meta['size'] and stat.st_mtime_ns == meta['mtime_ns']:
+            self.meta = meta
+            return rollup
+        
+        if rollup is not None and self._is_append(meta, stat.st_size):
+            watermark = pd.Timestamp(meta['watermark']) if meta['watermark'] else None
+            new_rows, stats = self._ingest(meta['offset'], stat.st_size, watermark)
+            print(f"[ROLLUP] Ingested {stats['rows']} appended rows after watermark {meta['watermark']}")
+            if stats['skipped']:
+                print(f"[ROLLUP] WARNING: Skipped {stats['skipped']} appended rows not newer than the watermark")
+            if len(new_rows) > 0:
+                rollup = concat_frames([rollup, new_rows])
+            watermark = max((d for d in (watermark, stats['max_date']) if d is not None), default=None)
+        else:
+            if rollup is not None:
+                print(f"[ROLLUP] Source rewritten, rebuilding {self.data_file}")
+            rollup, stats = self._ingest(None, stat.st_size, None)
+            print(f"[ROLLUP] Built rollup from {stats['rows']} rows")
+            watermark = stats['max_date']
+        
+        self._store(rollup, stat, watermark)
+        return rollup
+    
+    def _is_append(self, meta: Dict[str, Any], size: int) -> bool:
+        """True if the source only grew past the stored offset"""
+        if size < meta['offset']:
+            return False
+        try:
+            return _tail_hash(self.source_path, meta['offset']) == meta['tail_hash']
+        except OSError:
+            return False
+    
+    def _ingest(self, offset: Optional[int], end: int, watermark: Optional[pd.Timestamp]):
+        """
+        Parse the source from offset (None = the whole file) and roll it up
+        
+        Returns:
+            (rollup of the parsed rows newer than watermark, {'rows', 'skipped', 'max_date'})
+        """
+        parts = []
+        stats = {"rows": 0, "skipped": 0, "max_date": None}
+        if offset is not None and offset >= end:
+            return pd.DataFrame(columns=['date'] + ROLLUP_DIMENSIONS), stats
+        
+        with open(self.source_path, 'rb') as f:
+            header = f.readline().decode('utf-8').rstrip('\r\n').split(',')
+            if offset is not None:
+                # Parse only the appended bytes, reusing the file's header names
+                f.seek(offset)
+            else:
+                f.seek(0)
+            
+            reader = pd.read_csv(
+                f,
+                header=None if offset is not None else 'infer',
+                names=header if offset is not None else None,
+                usecols=lambda col: col in ROLLUP_COLUMNS,
+                dtype=COLUMN_DTYPES,
+                parse_dates=['date'],
+                date_format='%Y-%m-%d',
+                chunksize=self.chunk_rows
+            )
+            for chunk in reader:
+                if watermark is not None:
+                    fresh = chunk['date'] > watermark
+                    stats["skipped"] += int((~fresh).sum())
+                    chunk = chunk[fresh]
+                if len(chunk) == 0:
+                    continue
+                stats["rows"] += len(chunk)
+                chunk_max = chunk['date'].max()
+                stats["max_date"] = chunk_max if stats["max_date"] is None else max(stats["max_date"], chunk_max)
+                parts.append(self._rollup_rows(chunk))
+        
+        if not parts:
+            return pd.DataFrame(columns=['date'] + ROLLUP_DIMENSIONS), stats
+        return self._combine(parts), stats
+    
+    def _rollup_rows(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Sum one chunk of raw rows to the rollup grain"""
+        return DateCube.rollup(df, ROLLUP_DIMENSIONS, quality_counters(df))
+    
+    def _combine(self, parts: List[pd.DataFrame]) -> pd.DataFrame:
+        """Merge chunk rollups that may share keys (chunk boundaries split days)"""
+        merged = concat_frames(parts)
+        keys = ['date'] + [col for col in ROLLUP_DIMENSIONS if col in merged.columns]
+        return merged.groupby(keys, observed=True, dropna=False, sort=True).sum().reset_index()
+    
+    def _read(self):
+        """Stored (meta, rollup), or (None, None) when missing or outdated"""
+        if not (os.path.exists(self.data_file) and os.path.exists(self.meta_file)):
+            return None, None
+        try:
+            with open(self.meta_file, 'r') as f:
+                meta = json.load(f)
+            if meta.get('schema_version') != ROLLUP_SCHEMA_VERSION or meta.get('format') != self.store_format:
+                return None, None
+            if self.store_format == 'parquet':
+                rollup = pd.read_parquet(self.data_file)
+            elif self.store_format == 'feather':
+                rollup = pd.read_feather(self.data_file)
+            else:
+                rollup = pd.read_pickle(self.data_file)
+            return meta, rollup
+        except Exception as e:
+            print(f"[ROLLUP] WARNING: Could not read rollup ({str(e)})")
+            return None, None
+    
+    def _store(self, rollup: pd.DataFrame, stat: os.stat_result, watermark: Optional[pd.Timestamp]):
+        """Write the rollup and its watermark (atomically)"""
+        meta = {
+            "schema_version": ROLLUP_SCHEMA_VERSION,
+            "format": self.store_format,
+            "source_path": os.path.abspath(self.source_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "offset": stat.st_size,
+            "tail_hash": _tail_hash(self.source_path, stat.st_size),
+            "watermark": watermark.strftime('%Y-%m-%d') if watermark is not None else None,
+            "rollup_rows": len(rollup)
+        }
+        self.meta = meta
+        try:
+            os.makedirs(self.store_dir, exist_ok=True)
+            tmp_file = f"{self.data_file}.tmp"
+            if self.store_format == 'parquet':
+                rollup.to_parquet(tmp_file, index=False)
+            elif self.store_format == 'feather':
+                rollup.reset_index(drop=True).to_feather(tmp_file)
+            else:
+                rollup.to_pickle(tmp_file)
+            os.replace(tmp_file, self.data_file)
+            
+            tmp_meta = f"{self.meta_file}.tmp"
+            with open(tmp_meta, 'w') as f:
+                json.dump(meta, f, indent=2)
+            os.replace(tmp_meta, self.meta_file)
+        except Exception as e:
+            print(f"[ROLLUP] WARNING: Could not write rollup ({str(e)})")
+
+
+def quality_counters(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-row data-quality flags that sum to the DataAgent quality report
+    
+    Columns: missing__<col> for every column, zero_spend_rows,
+    zero_impressions_rows and negative__<col> for the additive columns.
+    """
+    counters = {f"missing__{col}": df[col].isnull() for col in df.columns}
+    counters["zero_spend_rows"] = df['spend'] == 0
+    counters["zero_impressions_rows"] = df['impressions'] == 0
+    for col in ADDITIVE_COLUMNS:
+        if col in df.columns:
+            counters[f"negative__{col}"] = df[col] < 0
+    return pd.DataFrame(counters, index=df.index).astype('int64')
+
+
+def quality_report(counter_totals: pd.Series) -> Dict[str, Any]:
+    """Rebuild the DataAgent quality report from summed quality counters"""
+    return {
+        "missing_values": {
+            col[len("missing__"):]: int(value)
+            for col, value in counter_totals.items() if col.startswith("missing__")
+        },
+        "zero_spend_rows": int(counter_totals.get("zero_spend_rows", 0)),
+        "zero_impressions_rows": int(counter_totals.get("zero_impressions_rows", 0)),
+        "negative_values": {
+            col[len("negative__"):]: int(value)
+            for col, value in counter_totals.items() if col.startswith("negative__")
+        }
+    }
+
+
+def span_quality_report(rollup: pd.DataFrame, start: pd.Timestamp, end: pd.Timestamp) -> Dict[str, Any]:
+    """Quality report for the rows of an inclusive date span, from a rollup with quality counters"""
+    span = rollup[(rollup['date'] >= start) & (rollup['date'] <= end)]
+    counter_columns = [col for col in rollup.columns if col.startswith(('missing__', 'negative__', 'zero_'))]
+    return quality_report(span[counter_columns].sum())
@@ -0,0 +1,180 @@
+"""
+Stratified row sampling with reweighted totals and confidence intervals
+
+Rows are split into strata (date x campaign by default) and a fixed share of
+each stratum is drawn without replacement, at least min_per_stratum rows.
+Each sampled row carries the weight N_h / n_h of its stratum, so weighted
+sums estimate the full totals. Standard errors use the stratified-sampling
+variance of a total, and ratio metrics (ROAS, CTR, ...) the linearized
+variance of a ratio of two totals.
+"""
+
+from typing import Dict, List, Any, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .dataset import ADDITIVE_COLUMNS
+
+
+# Ratio metrics as (numerator, denominator, scale), matching DataAgent._metrics_from_totals
+RATIO_METRICS = {
+    "roas": ("revenue", "spend", 1),
+    "ctr": ("clicks", "impressions", 100),
+    "cpc": ("spend", "clicks", 1),
+    "cpm": ("spend", "impressions", 1000),
+    "conversion_rate": ("purchases", "clicks", 100)
+}
+
+# Two-sided 95% normal quantile
+Z_95 = 1.959963984540054
+
+
+class StratifiedSample:
+    """
+    Sampled rows with their weights and strata, able to estimate totals
+    and ratio metrics (with standard errors) over any union of strata.
+    """
+    
+    def __init__(self, frame: pd.DataFrame, codes: np.ndarray, population: np.ndarray,
+                 sampled: np.ndarray, rate: float):
+        """
+        Args:
+            frame: Sampled rows
+            codes: Stratum code of each sampled row
+            population: Rows per stratum in the full data (N_h)
+            sampled: Rows drawn per stratum (n_h)
+            rate: Requested sampling rate
+        """
+        self.frame = frame
+        self.codes = codes
+        self.population = population
+        self.sampled = sampled
+        self.rate = rate
+        self.weights = population[codes] / sampled[codes]
+        self.columns = [col for col in ADDITIVE_COLUMNS if col in frame.columns]
+        # Missing values count as zero, as in the (skipna) totals
+        self._values = frame[self.columns].to_numpy(dtype='float64', na_value=0.0)
+    
+    @classmethod
+    def draw(cls, df: pd.DataFrame, strata: List[str], rate: float,
+             min_per_stratum: int = 2, seed: int = 42) -> 'StratifiedSample':
+        """
+        Draw ceil(rate * N_h) rows (at least min_per_stratum, at most N_h) from every stratum
+        
+        Args:
+            df: Rows to sample
+            strata: Columns defining the strata
+            rate: Share of each stratum to keep (0 < rate <= 1)
+            min_per_stratum: Floor per stratum, so every stratum has a variance estimate
+            seed: Random seed (config random_seed)
+        """
+        if not 0 < rate <= 1:
+            raise ValueError(f"Sample rate must be in (0, 1], got {rate}")
+        
+        strata = [col for col in strata if col in df.columns]
+        if strata:
+            codes = df.groupby(strata, observed=True, dropna=False, sort=False).ngroup().to_numpy()
+        else:
+            codes = np.zeros(len(df), dtype=np.int64)
+        population = np.bincount(codes)
+        take = np.minimum(population, np.maximum(np.ceil(population * rate), min_per_stratum)).astype(np.int64)
+        
+        # Rank rows within their stratum in random order (a shuffle, then a
+        # stable sort by stratum; small integer keys sort in linear time)
+        # and keep the first take[h]
+        shuffled = np.random.default_rng(seed).permutation(len(df))
+        keys = codes[shuffled]
+        if len(population) <= np.iinfo(np.uint16).max:
+            keys = keys.astype(np.uint16)
+        order = shuffled[np.argsort(keys, kind='stable')]
+        starts = np.concatenate([[0], np.cumsum(population)[:-1]])
+        rank = np.empty(len(df), dtype=np.int64)
+        rank[order] = np.arange(len(df)) - np.repeat(starts, population)
+        keep = rank < take[codes]
+        
+        return cls(df[keep], codes[keep], population, take, rate)
+    
+    def summary(self) -> Dict[str, Any]:
+        """Sampling details for the Data Agent's data_summary"""
+        return {
+            "method": "stratified",
+            "rate": self.rate,
+            "sampled_rows": len(self.frame),
+            "population_rows": int(self.population.sum()),
+            "strata": len(self.population)
+        }
+    
+    def estimates(self, mask: np.ndarray) -> Dict[str, Tuple[float, float]]:
+        """
+        Estimated totals and ratio metrics over the sampled rows in mask
+        
+        mask must select whole strata (e.g. a date window when strata include
+        the date), otherwise the variance is not that of a stratified design.
+        
+        Returns:
+            {metric: (estimate, standard error)} for the additive columns and RATIO_METRICS
+        """
+        values = self._values[mask]
+        codes = self.codes[mask]
+        weights = self.weights[mask]
+        totals = weights @ values
+        
+        columns = {col: i for i, col in enumerate(self.columns)}
+        variances = self._total_variances(values, codes)
+        results = {col: (totals[i], np.sqrt(variances[i])) for col, i in columns.items()}
+        
+        for metric, (numerator, denominator, scale) in RATIO_METRICS.items():
+            if numerator not in columns or denominator not in columns:
+                continue
+            x_total = totals[columns[denominator]]
+            if x_total <= 0:
+                results[metric] = (0.0, 0.0)
+                continue
+            ratio = totals[columns[numerator]] / x_total
+            # Linearization: Var(Y/X) ~ Var(total of y - R x) / X^2
+            residuals = values[:, [columns[numerator]]] - ratio * values[:, [columns[denominator]]]
+            se = np.sqrt(self._total_variances(residuals, codes)[0]) / x_total
+            results[metric] = (ratio * scale, se * scale)
+        
+        return results
+    
+    def _total_variances(self, values: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """Stratified variance of the estimated total of each column: sum N_h^2 (1 - n_h/N_h) s_h^2 / n_h"""
+        n_strata = len(self.population)
+        counts = np.bincount(codes, minlength=n_strata)
+        present = counts > 0
+        population = self.population[present]
+        sampled = self.sampled[present]
+        scale = population ** 2 * (1 - sampled / population) / sampled
+        
+        variances = np.empty(values.shape[1])
+        for j in range(values.shape[1]):
+            sums = np.bincount(codes, weights=values[:, j], minlength=n_strata)
+            means = np.divide(sums, counts, out=np.zeros(n_strata), where=counts > 0)
+            squares = np.bincount(codes, weights=(values[:, j] - means[codes]) ** 2, minlength=n_strata)
+            # Single-row strata have no spread estimate (and are fully sampled unless N_h > 1)
+            s2 = np.divide(squares, counts - 1, out=np.zeros(n_strata), where=counts > 1)
+            variances[j] = float(np.sum(scale * s2[present]))
+        return variances
+
+
+def normal_interval(estimate: float, se: float, z: float = Z_95) -> Tuple[float, float]:
+    """estimate +/- z * se"""
+    return estimate - z * se, estimate + z * se
+
+
+def change_interval(baseline: Tuple[float, float], comparison: Tuple[float, float],
+                    z: float = Z_95) -> Tuple[float, float]:
+    """
+    Interval for the percent change between two independent estimates
+    
+    Uses the delta method on log(comparison / baseline), so the interval
+    stays within (-100%, inf). (None, None) when either estimate is not positive.
+    """
+    (b, b_se), (c, c_se) = baseline, comparison
+    if b <= 0 or c <= 0:
+        return None, None
+    log_se = np.sqrt((b_se / b) ** 2 + (c_se / c) ** 2)
+    ratio = c / b
+    return (ratio * np.exp(-z * log_se) - 1) * 100, (ratio * np.exp(z * log_se) - 1) * 100
@@ -0,0 +1,115 @@
+"""
+Content-addressed on-disk cache of pipeline stage outputs
+
+Each stage output is stored under a hash of everything that determines it
+(the stage name, its upstream inputs, the data fingerprint and the config
+sections it reads), so an unchanged stage is loaded instead of recomputed.
+The directory is bounded in size; the least recently used entries are
+evicted first.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from typing import Dict, Any, Optional
+
+
+# Bump when a stage's output format changes so old entries stop matching
+STAGE_CACHE_VERSION = 3
+
+
+class StageCache:
+    """
+    Pickled stage outputs keyed by a SHA-256 of their inputs, with
+    size-bounded LRU eviction (a hit refreshes the entry's mtime).
+    """
+    
+    def __init__(self, cache_dir: str = 'data/.stage_cache', max_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+    
+    def key(self, stage: str, inputs: Dict[str, Any]) -> str:
+        """
+        Cache key of a stage run
+        
+        Args:
+            stage: Stage name
+            inputs: JSON-serializable description of everything the output depends on
+        
+        Returns:
+            Hex digest
+        """
+        payload = json.dumps(
+            {"version": STAGE_CACHE_VERSION, "stage": stage, "inputs": inputs},
+            sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Cached output for key, or None on a miss"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            print(f"[STAGE CACHE] WARNING: Dropping unreadable entry {key[:12]} ({str(e)})")
+            self._remove(path)
+            self.misses += 1
+            return None
+        
+        try:
+            # Mark as recently used
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return value
+    
+    def put(self, key: str, value: Any):
+        """Store an output (atomically) and evict old entries past the size bound"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"[STAGE CACHE] WARNING: Could not write entry {key[:12]} ({str(e)})")
+            return
+        self._evict()
+    
+    def _evict(self):
+        """Remove least recently used entries until the directory fits max_bytes"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.pkl'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+    
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,89 @@
+"""
+Streaming accumulation for exports larger than RAM
+
+Chunks of the ads CSV are reduced to a (date, *segments) rollup of the
+additive metrics as they are read, so memory is bounded by the chunk size
+plus the number of distinct (day, segment) keys - not by the row count.
+The rollup feeds a DateCube exactly like an in-memory frame would, and
+carries per-day quality counters so any sub-span's quality report can be
+rebuilt without the rows.
+"""
+
+import pandas as pd
+from typing import Dict, List, Tuple
+
+from .date_cube import DateCube
+from .dataset import concat_frames
+from .rollup_store import quality_counters, span_quality_report
+
+
+class WindowAccumulator:
+    """
+    Running (date, *segments) rollup of the rows that fall inside the
+    analysis span, fed one chunk at a time.
+    """
+    
+    def __init__(self, windows: Dict[str, Tuple[pd.Timestamp, pd.Timestamp]], segments: List[str]):
+        self.windows = windows
+        self.segments = segments
+        self.span_start = min(start for start, _ in windows.values())
+        self.span_end = max(end for _, end in windows.values())
+        
+        self.rollup = None
+        self._columns_checked = False
+        
+        self.total_rows = 0
+        self.span_rows = 0
+        self.min_date = None
+        self.max_date = None
+    
+    def add(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """
+        Fold one chunk into the running rollup
+        
+        Args:
+            chunk: Typed chunk of the dataset
+        
+        Returns:
+            The chunk rows that fall in the analysis span; empty if none do
+        """
+        if not self._columns_checked:
+            self.segments = [segment for segment in self.segments if segment in chunk.columns]
+            self._columns_checked = True
+        
+        if len(chunk) == 0:
+            return chunk
+        
+        self.total_rows += len(chunk)
+        chunk_min, chunk_max = chunk['date'].min(), chunk['date'].max()
+        self.min_date = chunk_min if self.min_date is None else min(self.min_date, chunk_min)
+        self.max_date = chunk_max if self.max_date is None else max(self.max_date, chunk_max)
+        
+        if chunk_max < self.span_start or chunk_min > self.span_end:
+            return chunk.iloc[:0]
+        
+        span = chunk[(chunk['date'] >= self.span_start) & (chunk['date'] <= self.span_end)]
+        if len(span) == 0:
+            return span
+        self.span_rows += len(span)
+        
+        chunk_rollup = DateCube.rollup(span, self.segments, quality_counters(span))
+        self.rollup = chunk_rollup if self.rollup is None else self._merge_rollups(self.rollup, chunk_rollup)
+        
+        return span
+    
+    def cube(self) -> DateCube:
+        """Date cube over everything accumulated so far"""
+        return DateCube(self.rollup, self.segments)
+    
+    def quality_report(self, start: pd.Timestamp, end: pd.Timestamp) -> Dict:
+        """Data quality report of the accumulated rows dated start..end (inclusive)"""
+        if self.rollup is None:
+            return {}
+        return span_quality_report(self.rollup, start, end)
+    
+    def _merge_rollups(self, left: pd.DataFrame, right: pd.DataFrame) -> pd.DataFrame:
+        """Combine two partial rollups (chunk category sets may differ)"""
+        merged = concat_frames([left, right])
+        keys = ['date'] + self.segments
+        return merged.groupby(keys, observed=True, dropna=False, sort=True).sum().reset_index()
@@ -0,0 +1,218 @@
+"""
+Deterministic synthetic ads data at any scale
+
+Emits the schema of synthetic_fb_ads_undergarments.csv (one row per ad
+record and day) from 10k to tens of millions of rows. Rows are generated in
+fixed-size blocks, each seeded from (seed, block index), so the same seed and
+shape always give byte-identical files and memory stays bounded by one block.
+"""
+
+import os
+from typing import Dict, Any, Iterator
+
+import numpy as np
+import pandas as pd
+
+
+# Rows per generated block; part of the output definition, so changing it changes the data
+GENERATOR_BLOCK_ROWS = 100000
+
+CSV_COLUMNS = [
+    'campaign_name', 'adset_name', 'date', 'spend', 'impressions', 'clicks', 'ctr', 'purchases',
+    'revenue', 'roas', 'creative_type', 'creative_message', 'audience_type', 'platform', 'country'
+]
+
+CAMPAIGN_AUDIENCES = ['Men', 'Women']
+CAMPAIGN_THEMES = [
+    'ComfortMax Launch', 'Premium Modal', 'Bold Colors Drop', 'Signature Soft', 'Athleisure Cooling',
+    'Seamless Everyday', 'Cotton Classics', 'Summer Invisible', 'Breathable Mesh', 'Organic Basics'
+]
+ADSET_TARGETING = ['Retarget', 'Broad', 'LAL1', 'ATC', 'Interest']
+CREATIVE_TYPES = ['Image', 'Video', 'UGC', 'Carousel']
+CREATIVE_TYPE_WEIGHTS = [0.34, 0.35, 0.155, 0.155]
+AUDIENCE_TYPES = ['Broad', 'Lookalike', 'Retargeting']
+AUDIENCE_TYPE_WEIGHTS = [0.56, 0.26, 0.18]
+PLATFORMS = ['Facebook', 'Instagram']
+COUNTRIES = ['US', 'IN', 'UK', 'CA', 'AU', 'DE', 'FR', 'ES', 'IT', 'NL', 'SE', 'BR', 'MX', 'JP', 'SG', 'AE']
+CREATIVE_MESSAGES = [
+    'Breathable organic cotton that moves with you — limited offer.',
+    'No ride-up guarantee — best-selling fit back in stock.',
+    'Cooling mesh panels for workouts — comfort you will actually love.',
+    'Invisible under everything — try the seamless collection.',
+    'Softer than your favourite tee — free returns on every order.',
+    'Bold colours, all-day comfort — new drop available now.'
+]
+
+# Columns blanked at missing_rate, as in the real export
+MISSING_COLUMNS = ['spend', 'clicks', 'revenue']
+
+
+def campaign_profiles(campaigns: int, adsets_per_campaign: int, seed: int) -> pd.DataFrame:
+    """
+    One row per (campaign, adset) with its names and baseline rates
+    
+    Columns: campaign_name, adset_name, cpm, ctr, cvr, aov, drift (relative
+    conversion-rate change from the first to the last day)
+    """
+    rng = np.random.default_rng([seed, 0])
+    
+    names = []
+    for i in range(campaigns):
+        audience = CAMPAIGN_AUDIENCES[i % len(CAMPAIGN_AUDIENCES)]
+        theme = CAMPAIGN_THEMES[(i // len(CAMPAIGN_AUDIENCES)) % len(CAMPAIGN_THEMES)]
+        series = i // (len(CAMPAIGN_AUDIENCES) * len(CAMPAIGN_THEMES))
+        names.append(f"{audience} {theme}" + (f" {series + 1}" if series else ""))
+    
+    pairs = len(names) * adsets_per_campaign
+    campaign_drift = rng.choice([-0.3, -0.15, 0.0, 0.1], size=campaigns)
+    return pd.DataFrame({
+        "campaign_name": np.repeat(names, adsets_per_campaign),
+        "adset_name": [
+            f"Adset-{k + 1} {ADSET_TARGETING[k % len(ADSET_TARGETING)]}"
+            for _ in range(campaigns) for k in range(adsets_per_campaign)
+        ],
+        "cpm": rng.uniform(1.0, 3.0, pairs),
+        "ctr": rng.uniform(0.008, 0.02, pairs),
+        "cvr": rng.uniform(0.01, 0.04, pairs),
+        "aov": rng.uniform(25.0, 60.0, pairs),
+        "drift": np.repeat(campaign_drift, adsets_per_campaign)
+    })
+
+
+def iter_synthetic_blocks(rows: int, campaigns: int = 20, adsets_per_campaign: int = 5,
+                          countries: int = 3, days: int = 90, start_date: str = '2025-01-01',
+                          seed: int = 42, missing_rate: float = 0.025) -> Iterator[pd.DataFrame]:
+    """
+    Generate synthetic rows block by block, in date order
+    
+    Args:
+        rows: Total rows
+        campaigns: Distinct campaigns
+        adsets_per_campaign: Ad sets per campaign
+        countries: Distinct countries (at most len(COUNTRIES))
+        days: Days covered, starting at start_date
+        start_date: First date
+        seed: Random seed (config random_seed)
+        missing_rate: Share of spend, clicks and revenue values left empty
+    
+    Yields:
+        DataFrames with CSV_COLUMNS, at most GENERATOR_BLOCK_ROWS rows each
+    """
+    if rows < 1 or campaigns < 1 or adsets_per_campaign < 1 or days < 1:
+        raise ValueError("rows, campaigns, adsets_per_campaign and days must be positive")
+    if not 1 <= countries <= len(COUNTRIES):
+        raise ValueError(f"countries must be between 1 and {len(COUNTRIES)}")
+    
+    profiles = campaign_profiles(campaigns, adsets_per_campaign, seed)
+    country_names = np.array(COUNTRIES[:countries])
+    # Earlier countries get more traffic, like the real export (US > IN > UK)
+    country_weights = 1.0 / np.arange(1, countries + 1)
+    country_weights /= country_weights.sum()
+    start = pd.Timestamp(start_date)
+    
+    for block, offset in enumerate(range(0, rows, GENERATOR_BLOCK_ROWS)):
+        n = min(GENERATOR_BLOCK_ROWS, rows - offset)
+        rng = np.random.default_rng([seed, block + 1])
+        
+        # Spread rows evenly over the days so every date has data at every scale
+        day = (np.arange(offset, offset + n, dtype=np.int64) * days) // rows
+        profile = profiles.iloc[rng.integers(0, len(profiles), n)]
+        progress = day / max(days - 1, 1)
+        
+        impressions = rng.integers(5000, 500000, n)
+        ctr = np.clip(profile['ctr'].to_numpy() * rng.lognormal(0.0, 0.25, n), 0.001, 0.2)
+        clicks = np.round(impressions * ctr)
+        spend = np.round(impressions / 1000 * profile['cpm'].to_numpy() * rng.lognormal(0.0, 0.15, n), 2)
+        cvr = np.clip(profile['cvr'].to_numpy() * (1 + profile['drift'].to_numpy() * progress), 0.001, 0.5)
+        purchases = rng.binomial(clicks.astype(np.int64), cvr)
+        revenue = np.round(purchases * profile['aov'].to_numpy() * rng.lognormal(0.0, 0.1, n), 2)
+        
+        frame = pd.DataFrame({
+            "campaign_name": profile['campaign_name'].to_numpy(),
+            "adset_name": profile['adset_name'].to_numpy(),
+            "date": (start + pd.to_timedelta(day, unit='D')).strftime('%Y-%m-%d'),
+            "spend": spend,
+            "impressions": impressions,
+            "clicks": clicks,
+            "ctr": np.round(clicks / impressions, 4),
+            "purchases": purchases,
+            "revenue": revenue,
+            "roas": np.round(np.divide(revenue, spend, out=np.zeros(n), where=spend > 0), 2),
+            "creative_type": rng.choice(CREATIVE_TYPES, n, p=CREATIVE_TYPE_WEIGHTS),
+            "creative_message": rng.choice(CREATIVE_MESSAGES, n),
+            "audience_type": rng.choice(AUDIENCE_TYPES, n, p=AUDIENCE_TYPE_WEIGHTS),
+            "platform": rng.choice(PLATFORMS, n),
+            "country": rng.choice(country_names, n, p=country_weights)
+        })
+        
+        if missing_rate > 0:
+            for col in MISSING_COLUMNS:
+                frame.loc[rng.random(n) < missing_rate, col] = np.nan
+        
+        yield frame
+
+
+def generate_synthetic_data(rows: int, **options) -> pd.DataFrame:
+    """Synthetic rows as one DataFrame (see iter_synthetic_blocks for options)"""
+    return pd.concat(list(iter_synthetic_blocks(rows, **options)), ignore_index=True)
+
+
+def write_synthetic_csv(path: str, rows: int, **options) -> Dict[str, Any]:
+    """
+    Write synthetic rows to a CSV one block at a time
+    
+    Args:
+        path: Output CSV path (written atomically)
+        rows: Total rows
+        **options: See iter_synthetic_blocks
+    
+    Returns:
+        {'path', 'rows', 'bytes'}
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    
+    tmp_path = f"{path}.tmp"
+    written = 0
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        for block in iter_synthetic_blocks(rows, **options):
+            block.to_csv(f, header=written == 0, index=False)
+            written += len(block)
+    os.replace(tmp_path, path)
+    
+    return {"path": path, "rows": written, "bytes": os.path.getsize(path)}
+
+
+def synthetic_options(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Generator options from the 'synthetic_data' config section, seeded from random_seed"""
+    synthetic_config = config.get('synthetic_data', {})
+    options = {"seed": config.get('random_seed', 42)}
+    for option in ('campaigns', 'adsets_per_campaign', 'countries', 'days', 'start_date', 'missing_rate'):
+        if option in synthetic_config:
+            options[option] = synthetic_config[option]
+    return options
+
+
+def synthetic_file_name(rows: int, options: Dict[str, Any]) -> str:
+    """File name encoding everything that determines a generated file's contents"""
+    shape = [f"{key}-{options[key]}" for key in sorted(options)]
+    return f"synthetic_{rows}_" + "_".join(shape).replace('.', 'p') + ".csv"
+
+
+def row_count_label(rows: int) -> str:
+    """10000 -> '10k', 50000000 -> '50M'"""
+    for divisor, suffix in ((1000000, 'M'), (1000, 'k')):
+        if rows >= divisor and rows % divisor == 0:
+            return f"{rows // divisor}{suffix}"
+    return str(rows)
+
+
+def parse_row_count(text: str) -> int:
+    """'10k' -> 10000, '1.5M' -> 1500000, '4500' -> 4500"""
+    text = str(text).strip()
+    multipliers = {'k': 1000, 'K': 1000, 'm': 1000000, 'M': 1000000}
+    if text and text[-1] in multipliers:
+        return int(float(text[:-1]) * multipliers[text[-1]])
+    return int(text)
+
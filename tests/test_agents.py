@@ -6,6 +6,9 @@ import pytest
 import sys
 import os
 
+import numpy as np
+import pandas as pd
+
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
@@ -13,6 +16,10 @@ from agents.planner_agent import PlannerAgent
 from agents.data_agent import DataAgent
 from agents.insight_agent import InsightAgent
 from agents.creative_agent import CreativeAgent
+from utils.dataset import AdsDataset, slice_date_range
+from utils.helpers import load_config
+from utils.significance import welch_t_test
+from utils.synthetic_data import write_synthetic_csv
 
 
 class TestPlannerAgent:
@@ -46,6 +53,24 @@ class TestPlannerAgent:
         # Check for CTR in metrics (case-insensitive)
         metrics_upper = [m.upper() for m in result['metrics_to_analyze']]
         assert 'CTR' in metrics_upper
+    
+    def test_arbitrary_time_windows(self):
+        """Test window lengths beyond the fixed presets and explicit date ranges"""
+        planner = PlannerAgent({})
+        context = {'latest_date': '2025-03-31'}
+        
+        windows = planner.execute("ROAS over the last 45 days", context)['time_windows']
+        assert windows['comparison_days'] == 45
+        assert windows['comparison']['start_date'] == '2025-02-14'
+        
+        assert planner.execute("CTR in the last 6 weeks", context)['time_windows']['comparison_days'] == 42
+        assert planner.execute("CTR drop since last week", context)['time_windows']['comparison_days'] == 7
+        # 'weekly' is not a window length: the configured default applies
+        assert planner.execute("Weekly ROAS review", context)['time_windows']['comparison_days'] == 30
+        
+        windows = planner.execute("Compare 2025-03-01 to 2025-03-15", context)['time_windows']
+        assert windows['comparison'] == {"start_date": "2025-03-01", "end_date": "2025-03-15", "label": "Current Period"}
+        assert windows['baseline']['start_date'] == '2025-02-15'
 
 
 class TestDataAgent:
@@ -57,6 +82,380 @@ class TestDataAgent:
         data_agent = DataAgent(config)
         assert data_agent is not None
     
+    def test_shared_dataset_is_reused(self):
+        """Test data agent reuses the frame already loaded by the shared handle"""
+        config = {
+            'data_path': 'data/synthetic_fb_ads_undergarments.csv',
+            'agents': {'data_agent': {'pushdown_date_filter': False}}
+        }
+        dataset = AdsDataset(config['data_path'])
+        
+        assert dataset.latest_date == '2025-03-31'
+        loaded_df = dataset.df
+        
+        plan = {
+            "time_windows": {
+                "baseline": {"start_date": "2025-02-01", "end_date": "2025-02-28"},
+                "comparison": {"start_date": "2025-03-01", "end_date": "2025-03-31"}
+            },
+            "segments": ['campaign_name']
+        }
+        data_agent = DataAgent(config)
+        result = data_agent.execute(plan, dataset)
+        
+        assert data_agent.df is loaded_df
+        assert result['data_summary']['date_range']['max'] == '2025-03-31'
+    
+    def test_raw_data_is_lazy(self):
+        """Test raw rows are only materialized when asked for"""
+        config = {'data_path': 'data/synthetic_fb_ads_undergarments.csv'}
+        plan = {
+            "time_windows": {
+                "baseline": {"start_date": "2025-02-01", "end_date": "2025-02-28"},
+                "comparison": {"start_date": "2025-03-01", "end_date": "2025-03-31"}
+            },
+            "segments": []
+        }
+        result = DataAgent(config).execute(plan)
+        raw_data = result['raw_data']
+        
+        assert raw_data.row_counts()['comparison'] == result['data_summary']['comparison_rows']
+        assert len(repr(raw_data)) < 100
+        
+        records = raw_data.records('comparison')
+        assert len(records) == result['data_summary']['comparison_rows']
+        assert 'cpc' in records[0]
+    
+    def test_single_pass_window_aggregation(self):
+        """Test grouped window aggregation matches per-window sums (incl. shared boundary day)"""
+        config = {'data_path': 'data/synthetic_fb_ads_undergarments.csv'}
+        plan = {
+            "time_windows": {
+                "baseline": {"start_date": "2025-02-01", "end_date": "2025-03-01"},
+                "comparison": {"start_date": "2025-03-01", "end_date": "2025-03-31"}
+            },
+            "segments": []
+        }
+        data_agent = DataAgent(config)
+        result = data_agent.execute(plan)
+        
+        df = pd.read_csv(config['data_path'], parse_dates=['date'])
+        columns = ['spend', 'revenue', 'impressions', 'clicks', 'purchases']
+        for window, (start, end) in {"baseline": ("2025-02-01", "2025-03-01"),
+                                     "comparison": ("2025-03-01", "2025-03-31")}.items():
+            totals = df[(df['date'] >= start) & (df['date'] <= end)][columns].sum()
+            metrics = result[f'{window}_metrics']
+            assert metrics['spend'] == pytest.approx(totals['spend'], abs=0.005)
+            assert metrics['revenue'] == pytest.approx(totals['revenue'], abs=0.005)
+            assert metrics['impressions'] == totals['impressions']
+            assert metrics['clicks'] == int(totals['clicks'])
+            assert metrics['purchases'] == totals['purchases']
+            assert metrics['roas'] == round(totals['revenue'] / totals['spend'], 2)
+            assert metrics['cpc'] == round(totals['spend'] / totals['clicks'], 2)
+        assert result['metric_changes']['roas']['baseline'] == result['baseline_metrics']['roas']
+        
+        # Day-level totals add up to the window totals
+        daily = result['daily_totals']['comparison']
+        assert daily['date'][0] == "2025-03-01" and daily['date'][-1] == "2025-03-31"
+        assert sum(daily['clicks']) == result['comparison_metrics']['clicks']
+        assert sum(daily['rows']) == result['data_summary']['comparison_rows']
+    
+    def test_segment_analysis_compares_windows(self):
+        """Test segment analysis reports baseline values and deltas per segment value"""
+        config = {'data_path': 'data/synthetic_fb_ads_undergarments.csv'}
+        plan = {
+            "time_windows": {
+                "baseline": {"start_date": "2025-02-01", "end_date": "2025-03-01"},
+                "comparison": {"start_date": "2025-03-01", "end_date": "2025-03-31"}
+            },
+            "segments": ['creative_type', 'country']
+        }
+        data_agent = DataAgent(config)
+        result = data_agent.execute(plan)
+        
+        baseline = slice_date_range(data_agent.df, pd.Timestamp("2025-02-01"), pd.Timestamp("2025-03-01"))
+        expected = baseline.groupby('country', observed=True)[['revenue', 'spend']].sum()
+        
+        comparison = slice_date_range(data_agent.df, pd.Timestamp("2025-03-01"), pd.Timestamp("2025-03-31"))
+        daily = comparison.groupby(['country', 'date'], observed=True)[['revenue', 'spend']].sum()
+        daily = daily[daily['spend'] > 0]
+        daily_roas = daily['revenue'] / daily['spend']
+        
+        for performer in result['segment_analysis']['country']['top_performers']:
+            country = performer['country']
+            expected_roas = expected.loc[country, 'revenue'] / expected.loc[country, 'spend']
+            assert performer['baseline_roas'] == pytest.approx(expected_roas)
+            assert 'ctr_change_pct' in performer and 'cpc_change_pct' in performer
+            # Daily ROAS spread in the comparison window, for the evaluator's gap test
+            values = daily_roas.loc[country]
+            assert performer['daily_roas']['days'] == len(values)
+            assert performer['daily_roas']['mean'] == pytest.approx(values.mean(), abs=1e-6)
+            assert performer['daily_roas']['variance'] == pytest.approx(values.var(ddof=1), abs=1e-6)
+        
+        assert set(result['segment_analysis']) == {'creative_type', 'country'}
+    
+    def test_segment_top_k_selection(self):
+        """Test top/bottom performer count follows the plan's segment_top_k"""
+        config = {'data_path': 'data/synthetic_fb_ads_undergarments.csv'}
+        plan = {
+            "time_windows": {
+                "baseline": {"start_date": "2025-02-01", "end_date": "2025-03-01"},
+                "comparison": {"start_date": "2025-03-01", "end_date": "2025-03-31"}
+            },
+            "segments": ['adset_name'],
+            "segment_top_k": 5
+        }
+        result = DataAgent(config).execute(plan)
+        
+        top = result['segment_analysis']['adset_name']['top_performers']
+        bottom = result['segment_analysis']['adset_name']['bottom_performers']
+        
+        assert len(top) == 5 and len(bottom) == 5
+        assert [p['roas'] for p in top] == sorted([p['roas'] for p in top], reverse=True)
+        assert [p['roas'] for p in bottom] == sorted([p['roas'] for p in bottom], reverse=True)
+        assert top[0]['roas'] >= bottom[0]['roas']
+    
+    def test_segment_fdr_keeps_discoveries(self, tmp_path):
+        """Test segment_fdr ranks only values whose ROAS change survives Benjamini-Hochberg"""
+        path = str(tmp_path / 'drift.csv')
+        # Some synthetic campaigns lose up to 30% conversion rate over the period, others are flat
+        write_synthetic_csv(path, 40000, campaigns=30, days=60, seed=5)
+        plan = {
+            "time_windows": {
+                "baseline": {"start_date": "2025-01-01", "end_date": "2025-01-20"},
+                "comparison": {"start_date": "2025-02-10", "end_date": "2025-03-01"}
+            },
+            "segments": ['campaign_name'],
+            "segment_top_k": 30
+        }
+        ranked_all = DataAgent({'data_path': path}).execute(plan)['segment_analysis']['campaign_name']
+        result = DataAgent({'data_path': path, 'agents': {'data_agent': {'segment_fdr': 0.05}}}).execute(plan)
+        analysis = result['segment_analysis']['campaign_name']
+        
+        significance = analysis['significance']
+        assert significance['tested'] == 30 and significance['untested'] == 0
+        assert 0 < significance['discoveries'] < 30
+        assert len(analysis['top_performers']) == significance['discoveries'] == len(analysis['bottom_performers'])
+        assert len(ranked_all['top_performers']) == 30 and 'significance' not in ranked_all
+        for performer in analysis['top_performers']:
+            assert performer['discovery'] and performer['roas_q_value'] <= 0.05
+            assert performer['roas_p_value'] <= performer['roas_q_value']
+        
+        # The batched p-value of one campaign matches a direct Welch test on its daily ROAS
+        df = AdsDataset(path).df
+        campaign = analysis['top_performers'][0]['campaign_name']
+        rows = df[df['campaign_name'] == campaign]
+        
+        def daily_roas(start, end):
+            window = rows[(rows['date'] >= start) & (rows['date'] <= end)].groupby('date')[['revenue', 'spend']].sum()
+            return (window['revenue'] / window['spend']).to_numpy()
+        
+        before, after = daily_roas('2025-01-01', '2025-01-20'), daily_roas('2025-02-10', '2025-03-01')
+        _, _, p_value = welch_t_test(before.mean(), before.var(ddof=1), len(before), after.mean(), after.var(ddof=1), len(after))
+        assert analysis['top_performers'][0]['roas_p_value'] == pytest.approx(float(p_value), abs=1e-4)
+        
+        # A one-day comparison window leaves no value testable: counted, not silently dropped
+        one_day = {**plan, "time_windows": {**plan["time_windows"], "comparison": {"start_date": "2025-03-01", "end_date": "2025-03-01"}}}
+        significance = DataAgent({'data_path': path, 'agents': {'data_agent': {'segment_fdr': 0.05}}}).execute(one_day)[
+            'segment_analysis']['campaign_name']['significance']
+        assert significance['tested'] == 0 and significance['discoveries'] == 0
+        assert significance['untested'] == 30
+    
+    def test_quality_report_covers_loaded_columns(self):
+        """Test missing-value counts cover the loaded columns, including any added to load_columns"""
+        plan = {
+            "time_windows": {
+                "baseline": {"start_date": "2025-02-01", "end_date": "2025-03-01"},
+                "comparison": {"start_date": "2025-03-01", "end_date": "2025-03-31"}
+            },
+            "segments": []
+        }
+        config = {'data_path': 'data/synthetic_fb_ads_undergarments.csv'}
+        default = DataAgent(config).execute(plan)['data_quality_report']['missing_values']
+        assert 'spend' in default and 'creative_message' not in default and 'roas' not in default
+        
+        extended = {**config, 'agents': {'data_agent': {'load_columns': list(default) + ['creative_message']}}}
+        missing = DataAgent(extended).execute(plan)['data_quality_report']['missing_values']
+        assert set(missing) == set(default) | {'creative_message'}
+    
+    def test_shipped_config_ranks_every_segment_value(self):
+        """Test the shipped config.yaml keeps the segment ranking (and no bootstrap) for the default query"""
+        config = load_config('config/config.yaml')
+        dataset = AdsDataset(config['data_path'], config)
+        plan = PlannerAgent(config).execute("Analyze ROAS drop in last 30 days", {"latest_date": dataset.latest_date})
+        result = DataAgent(config).execute(plan, dataset)
+        
+        assert plan['segments']
+        for segment in plan['segments']:
+            analysis = result['segment_analysis'][segment]
+            assert 'significance' not in analysis
+            assert len(analysis['top_performers']) > 0 and len(analysis['bottom_performers']) > 0
+            assert 'bootstrap' not in analysis['top_performers'][0]
+        # Bootstrap intervals are opt-in too
+        assert not any('bootstrap' in change for change in result['metric_changes'].values())
+    
+    def test_streaming_matches_in_memory(self):
+        """Test chunked streaming mode produces the in-memory results"""
+        plan = {
+            "time_windows": {
+                "baseline": {"start_date": "2025-02-01", "end_date": "2025-03-01"},
+                "comparison": {"start_date": "2025-03-01", "end_date": "2025-03-31"}
+            },
+            "segments": ['creative_type', 'country']
+        }
+        in_memory = DataAgent({'data_path': 'data/synthetic_fb_ads_undergarments.csv'}).execute(plan)
+        
+        # Tiny memory budget forces many chunks
+        streaming_config = {
+            'data_path': 'data/synthetic_fb_ads_undergarments.csv',
+            'agents': {'data_agent': {'streaming': True, 'streaming_memory_mb': 0.2}}
+        }
+        streamed = DataAgent(streaming_config).execute(plan)
+        
+        assert streamed['raw_data'] is None
+        assert streamed['data_summary'] == in_memory['data_summary']
+        assert streamed['baseline_metrics'] == in_memory['baseline_metrics']
+        assert streamed['comparison_metrics'] == in_memory['comparison_metrics']
+        assert streamed['data_quality_report'] == in_memory['data_quality_report']
+        for segment, performers in in_memory['segment_analysis'].items():
+            for kind in ('top_performers', 'bottom_performers'):
+                expected = [p[segment] for p in performers[kind]]
+                assert [p[segment] for p in streamed['segment_analysis'][segment][kind]] == expected
+                for got, want in zip(streamed['segment_analysis'][segment][kind], performers[kind]):
+                    assert got['roas'] == pytest.approx(want['roas'])
+                    assert got['baseline_roas'] == pytest.approx(want['baseline_roas'])
+    
+    def test_rollup_store_matches_in_memory(self, tmp_path):
+        """Test answering a plan from the materialized rollup matches the row-level path"""
+        plan = {
+            "time_windows": {
+                "baseline": {"start_date": "2025-02-01", "end_date": "2025-03-01"},
+                "comparison": {"start_date": "2025-03-01", "end_date": "2025-03-31"}
+            },
+            "segments": ['campaign_name']
+        }
+        in_memory = DataAgent({'data_path': 'data/synthetic_fb_ads_undergarments.csv'}).execute(plan)
+        
+        rollup_config = {
+            'data_path': 'data/synthetic_fb_ads_undergarments.csv',
+            'agents': {'data_agent': {'rollup_store': True, 'rollup_dir': str(tmp_path), 'cache_format': 'pickle'}}
+        }
+        from_rollup = DataAgent(rollup_config).execute(plan)
+        
+        assert from_rollup['data_summary'] == in_memory['data_summary']
+        assert from_rollup['baseline_metrics'] == in_memory['baseline_metrics']
+        assert from_rollup['comparison_metrics'] == in_memory['comparison_metrics']
+        assert from_rollup['data_quality_report'] == in_memory['data_quality_report']
+        top = [p['campaign_name'] for p in from_rollup['segment_analysis']['campaign_name']['top_performers']]
+        assert top == [p['campaign_name'] for p in in_memory['segment_analysis']['campaign_name']['top_performers']]
+    
+    def test_batch_matches_individual_plans(self):
+        """Test one shared pass answers each plan like its own execute"""
+        def make_plan(baseline_start, comparison_start, comparison_end, segments):
+            return {
+                "time_windows": {
+                    "baseline": {"start_date": baseline_start, "end_date": comparison_start},
+                    "comparison": {"start_date": comparison_start, "end_date": comparison_end}
+                },
+                "segments": segments
+            }
+        plans = [
+            make_plan("2025-02-01", "2025-03-01", "2025-03-31", ['campaign_name']),
+            make_plan("2025-01-05", "2025-01-20", "2025-02-04", ['country', 'creative_type'])
+        ]
+        config = {'data_path': 'data/synthetic_fb_ads_undergarments.csv'}
+        
+        batch = DataAgent(config).execute_batch(plans)
+        
+        assert len(batch) == 2
+        for plan, result in zip(plans, batch):
+            single = DataAgent(config).execute(plan)
+            assert result['data_summary'] == single['data_summary']
+            assert result['baseline_metrics'] == single['baseline_metrics']
+            assert result['comparison_metrics'] == single['comparison_metrics']
+            assert result['data_quality_report'] == single['data_quality_report']
+            assert list(result['segment_analysis']) == plan['segments']
+            assert len(result['raw_data']['comparison']) == single['data_summary']['comparison_rows']
+    
+    def test_sampled_estimates_carry_intervals(self):
+        """Test use_sample_data estimates totals from a stratified sample with confidence intervals"""
+        plan = {
+            "time_windows": {
+                "baseline": {"start_date": "2025-02-01", "end_date": "2025-02-28"},
+                "comparison": {"start_date": "2025-03-01", "end_date": "2025-03-31"}
+            },
+            "segments": ['creative_type']
+        }
+        exact = DataAgent({'data_path': 'data/synthetic_fb_ads_undergarments.csv'}).execute(plan)
+        sampled_config = {
+            'data_path': 'data/synthetic_fb_ads_undergarments.csv',
+            'use_sample_data': True,
+            'agents': {'data_agent': {'sample_rate': 0.5, 'sample_min_rows': 1000}}
+        }
+        sampled = DataAgent(sampled_config).execute(plan)
+        
+        sampling = sampled['data_summary']['sampling']
+        assert sampling['sampled_rows'] < sampling['population_rows'] == exact['data_summary']['loaded_rows']
+        # Strata include the date, so window row counts are exact
+        assert sampled['data_summary']['baseline_rows'] == exact['data_summary']['baseline_rows']
+        assert sampled['data_summary']['comparison_rows'] == exact['data_summary']['comparison_rows']
+        
+        for metric in ('spend', 'revenue', 'roas', 'ctr', 'cpc', 'conversion_rate'):
+            interval = sampled['metric_changes'][metric]['confidence_interval']
+            low, high = interval['comparison']
+            assert low <= sampled['metric_changes'][metric]['comparison'] <= high
+            assert low < high
+            assert interval['standard_error']['comparison'] > 0
+            assert 'confidence_interval' not in exact['metric_changes'][metric]
+        
+        low, high = sampled['metric_changes']['roas']['confidence_interval']['baseline']
+        assert low <= exact['baseline_metrics']['roas'] <= high
+        
+        # Below sample_min_rows the load is processed exactly
+        small = DataAgent({**sampled_config, 'agents': {'data_agent': {'sample_min_rows': 10 ** 6}}}).execute(plan)
+        assert 'sampling' not in small['data_summary']
+        assert small['comparison_metrics'] == exact['comparison_metrics']
+    
+    def test_bootstrap_intervals(self):
+        """Test bootstrap intervals for overall ratio metrics and segment performers, by day and by adset"""
+        plan = {
+            "time_windows": {
+                "baseline": {"start_date": "2025-02-01", "end_date": "2025-02-28"},
+                "comparison": {"start_date": "2025-03-01", "end_date": "2025-03-31"}
+            },
+            "segments": ['creative_type']
+        }
+        config = {
+            'data_path': 'data/synthetic_fb_ads_undergarments.csv',
+            'agents': {'data_agent': {'bootstrap_resamples': 300}}
+        }
+        result = DataAgent(config).execute(plan)
+        
+        for metric in ('roas', 'cpc', 'ctr'):
+            bootstrap = result['metric_changes'][metric]['bootstrap']
+            assert bootstrap['unit'] == 'day' and bootstrap['resamples'] == 300
+            low, high = bootstrap['comparison']
+            assert low <= result['metric_changes'][metric]['comparison'] <= high
+            low, high = bootstrap['percent_change']
+            assert low <= result['metric_changes'][metric]['percent_change'] <= high
+            assert 0 <= bootstrap['p_value'] <= 1
+        assert 'bootstrap' not in result['metric_changes']['spend']
+        
+        performer = result['segment_analysis']['creative_type']['top_performers'][0]
+        low, high = performer['bootstrap']['roas']['percent_change']
+        assert low <= performer['roas_change_pct'] <= high
+        
+        # Same seed, same intervals; adset units give their own
+        assert DataAgent(config).execute(plan)['metric_changes'] == result['metric_changes']
+        adset_config = {**config, 'agents': {'data_agent': {'bootstrap_resamples': 300, 'bootstrap_unit': 'adset'}}}
+        by_adset = DataAgent(adset_config).execute(plan)
+        assert by_adset['metric_changes']['roas']['bootstrap']['unit'] == 'adset'
+        assert by_adset['metric_changes']['roas']['baseline'] == result['metric_changes']['roas']['baseline']
+        
+        # Off unless configured
+        plain = DataAgent({'data_path': 'data/synthetic_fb_ads_undergarments.csv'}).execute(plan)
+        assert 'bootstrap' not in plain['metric_changes']['roas']
+    
     def test_metric_calculation(self):
         """Test that metrics are calculated correctly"""
         import pandas as pd
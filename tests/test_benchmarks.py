@@ -0,0 +1,171 @@
+"""
+Tests for the synthetic data generator, the benchmark suite and its regression gate
+"""
+
+import json
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.dataset import AdsDataset
+from utils.date_cube import DateCube
+from utils.synthetic_data import (
+    CSV_COLUMNS, generate_synthetic_data, write_synthetic_csv, synthetic_options,
+    synthetic_file_name, row_count_label, parse_row_count
+)
+from benchmarks.run_benchmarks import run_suite, BENCHMARK_STAGES, BENCHMARK_VERSION
+from benchmarks.compare import compare_results, load_tolerances, main as compare_main
+
+
+class TestSyntheticData:
+    """Tests for the synthetic data generator"""
+    
+    def test_same_seed_same_data(self):
+        """Test generation is deterministic per seed and differs across seeds"""
+        first = generate_synthetic_data(120000, seed=7)
+        assert first.equals(generate_synthetic_data(120000, seed=7))
+        assert not first.equals(generate_synthetic_data(120000, seed=8))
+    
+    def test_schema_and_shape(self):
+        """Test the real export's columns and the configured campaign, adset and country counts"""
+        df = generate_synthetic_data(20000, campaigns=4, adsets_per_campaign=3, countries=5, days=10)
+        
+        assert list(df.columns) == CSV_COLUMNS
+        assert len(df) == 20000
+        assert df['campaign_name'].nunique() == 4
+        assert df.groupby('campaign_name')['adset_name'].nunique().max() == 3
+        assert df['country'].nunique() == 5
+        assert df['date'].nunique() == 10
+        assert df['date'].is_monotonic_increasing
+    
+    def test_invalid_shape(self):
+        """Test unsupported shapes are rejected"""
+        with pytest.raises(ValueError):
+            generate_synthetic_data(1000, countries=100)
+        with pytest.raises(ValueError):
+            generate_synthetic_data(0)
+    
+    def test_written_csv_loads(self, tmp_path):
+        """Test a generated CSV is readable by AdsDataset and covers every day"""
+        path = str(tmp_path / 'synthetic.csv')
+        info = write_synthetic_csv(path, 15000, days=30, seed=3)
+        
+        dataset = AdsDataset(path)
+        assert info['rows'] == 15000 == dataset.total_rows
+        assert dataset.latest_date == '2025-01-30'
+    
+    def test_large_window_totals_stay_exact(self):
+        """Test impressions totals beyond the int32 range are not wrapped"""
+        df = generate_synthetic_data(30000, missing_rate=0.0)
+        df['date'] = pd.to_datetime(df['date'])
+        df['impressions'] = df['impressions'].astype('int32')
+        
+        cube = DateCube.from_frame(df)
+        totals = cube.totals({"all": (df['date'].min(), df['date'].max())})
+        assert totals.loc["all", 'impressions'] == df['impressions'].astype('int64').sum()
+    
+    def test_options_and_labels(self):
+        """Test config options, file names and row count labels"""
+        options = synthetic_options({'random_seed': 11, 'synthetic_data': {'campaigns': 8}})
+        assert options == {'seed': 11, 'campaigns': 8}
+        assert synthetic_file_name(10000, options) != synthetic_file_name(10000, {**options, 'seed': 12})
+        
+        assert [parse_row_count(text) for text in ('10k', '1.5M', '50M', '4500')] == [10000, 1500000, 50000000, 4500]
+        assert [row_count_label(rows) for rows in (10000, 50000000, 4500)] == ['10k', '50M', '4500']
+
+
+class TestBenchmarkSuite:
+    """Tests for the benchmark suite"""
+    
+    def test_suite_measures_every_stage(self, tmp_path):
+        """Test one small scale yields timing and memory for every stage"""
+        results = run_suite({'random_seed': 5}, scales=[3000], repeats=1, data_dir=str(tmp_path))
+        
+        scale = results['scales']['3k']
+        assert scale['rows'] == 3000
+        assert set(scale['stages']) == set(BENCHMARK_STAGES)
+        for metrics in scale['stages'].values():
+            assert metrics['wall_time']['min'] <= metrics['wall_time']['median'] <= metrics['wall_time']['max']
+            assert metrics['peak_memory_bytes'] >= 0
+        assert results['settings']['synthetic_data'] == {'seed': 5}
+
+
+def benchmark_run(latency: float, memory: int, stage: str = 'data_agent'):
+    """Minimal results in the run_benchmarks layout"""
+    return {
+        'benchmark_version': BENCHMARK_VERSION,
+        'settings': {},
+        'environment': {},
+        'scales': {'10k': {'rows': 10000, 'stages': {stage: {
+            'wall_time': {'min': latency, 'median': latency, 'max': latency},
+            'cpu_time': latency,
+            'peak_memory_bytes': memory
+        }}}}
+    }
+
+
+class TestBenchmarkComparison:
+    """Tests for the benchmark regression gate"""
+    
+    def test_statuses(self):
+        """Test regressions, improvements and noise-floor changes are classified"""
+        tolerances = {'default': {'latency': 0.2, 'memory': 0.2}}
+        floors = {'latency': 0.005, 'memory': 1024 * 1024}
+        
+        def statuses(latency, memory):
+            rows = compare_results(benchmark_run(1.0, 100 * 1024 * 1024), benchmark_run(latency, memory), tolerances, floors)
+            return {row['metric']: row['status'] for row in rows}
+        
+        assert statuses(1.1, 100 * 1024 * 1024) == {'latency': 'ok', 'memory': 'ok'}
+        assert statuses(2.0, 130 * 1024 * 1024) == {'latency': 'regression', 'memory': 'regression'}
+        assert statuses(0.5, 70 * 1024 * 1024) == {'latency': 'improved', 'memory': 'improved'}
+        
+        # Tiny stages: large relative changes inside the noise floor are not regressions
+        rows = compare_results(benchmark_run(0.001, 1000), benchmark_run(0.003, 5000), tolerances, floors)
+        assert {row['status'] for row in rows} == {'ok'}
+    
+    def test_per_stage_tolerances(self):
+        """Test stage tolerances override the default metric by metric"""
+        tolerances = load_tolerances({'benchmark': {'tolerances': {
+            'default': {'latency': 0.3},
+            'data_agent': {'latency': 0.1}
+        }}})
+        assert tolerances['default'] == {'latency': 0.3, 'memory': 0.2}
+        assert tolerances['data_agent'] == {'latency': 0.1, 'memory': 0.2}
+        
+        rows = compare_results(benchmark_run(1.0, 0), benchmark_run(1.2, 0), tolerances)
+        assert rows[0]['status'] == 'regression'
+        rows = compare_results(benchmark_run(1.0, 0, 'evaluator'), benchmark_run(1.2, 0, 'evaluator'), tolerances)
+        assert rows[0]['status'] == 'ok'
+    
+    def test_exit_codes(self, tmp_path):
+        """Test the command exits non-zero on regression and on incomparable files"""
+        paths = {}
+        for name, results in (('base', benchmark_run(1.0, 0)), ('same', benchmark_run(1.0, 0)),
+                              ('slow', benchmark_run(3.0, 0)), ('old', {**benchmark_run(1.0, 0), 'benchmark_version': 0})):
+            paths[name] = str(tmp_path / f"{name}.json")
+            with open(paths[name], 'w') as f:
+                json.dump(results, f)
+        
+        assert compare_main([paths['base'], paths['same']]) == 0
+        assert compare_main([paths['base'], paths['slow']]) == 1
+        assert compare_main([paths['base'], paths['old']]) == 2
+        assert compare_main([paths['base'], str(tmp_path / 'missing.json')]) == 2
+    
+    def test_missing_stage_fails_gate(self, tmp_path):
+        """Test a baseline stage absent from the current run fails unless explicitly allowed"""
+        paths = {}
+        for name, results in (('base', benchmark_run(1.0, 0)), ('renamed', benchmark_run(1.0, 0, 'evaluator'))):
+            paths[name] = str(tmp_path / f"{name}.json")
+            with open(paths[name], 'w') as f:
+                json.dump(results, f)
+        
+        rows = compare_results(benchmark_run(1.0, 0), benchmark_run(1.0, 0, 'evaluator'))
+        assert {(row['stage'], row['status']) for row in rows} == {('data_agent', 'missing'), ('evaluator', 'new')}
+        assert compare_main([paths['base'], paths['renamed']]) == 1
+        assert compare_main([paths['base'], paths['renamed'], '--allow-missing']) == 0
@@ -0,0 +1,326 @@
+"""
+Tests for the shared dataset handle and its on-disk cache
+"""
+
+import math
+import pytest
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+import pandas as pd
+
+from utils.dataset import AdsDataset, sort_by_date, slice_date_range, date_bounds
+from utils.data_cache import ColumnarCache, file_fingerprint
+from utils.parallel_csv import byte_ranges
+from utils.date_cube import DateCube
+from utils.rollup_store import RollupStore
+from utils.sampling import StratifiedSample
+from utils.bootstrap import BootstrapEngine
+
+
+SAMPLE_CSV = """campaign_name,adset_name,date,spend,impressions,clicks,ctr,purchases,revenue,roas,creative_type,creative_message,audience_type,platform,country
+Camp A,Adset-1,2025-01-01,100.0,10000,200.0,0.02,10,300.0,3.0,Image,Msg one,Broad,Facebook,US
+Camp B,Adset-2,2025-01-02,50.0,5000,100.0,0.02,4,100.0,2.0,Video,Msg two,Lookalike,Instagram,UK
+"""
+
+
+class TestAdsDataset:
+    """Test cases for typed dataset loading"""
+    
+    def test_typed_load(self, tmp_path):
+        """Test declared dtypes are applied and unused columns are skipped"""
+        path = tmp_path / "ads.csv"
+        path.write_text(SAMPLE_CSV)
+        
+        df = AdsDataset(str(path)).df
+        
+        assert str(df['date'].dtype).startswith('datetime64')
+        assert str(df['campaign_name'].dtype) == 'category'
+        assert str(df['impressions'].dtype) == 'int32'
+        assert 'creative_message' not in df.columns
+        assert df['spend'].sum() == 150.0
+    
+    def test_explicit_columns(self, tmp_path):
+        """Test an explicit column list overrides the default selection"""
+        path = tmp_path / "ads.csv"
+        path.write_text(SAMPLE_CSV)
+        
+        df = AdsDataset(str(path), columns=['spend', 'creative_message']).df
+        
+        assert set(df.columns) == {'date', 'spend', 'creative_message'}
+    
+    
+    def test_load_span_pushdown(self, tmp_path):
+        """Test span loading keeps only in-window rows across chunks"""
+        path = tmp_path / "ads.csv"
+        path.write_text(SAMPLE_CSV + "Camp C,Adset-3,2025-01-03,10.0,1000,20.0,0.02,1,30.0,3.0,Image,Msg,Broad,Facebook,IN\n")
+        config = {'agents': {'data_agent': {'chunk_rows': 1}}}
+        
+        dataset = AdsDataset(str(path), config)
+        span = dataset.load_span('2025-01-02', '2025-01-03')
+        
+        assert list(span['campaign_name']) == ['Camp B', 'Camp C']
+        assert str(span['country'].dtype) == 'category'
+        assert dataset.total_rows == 3
+        assert dataset.latest_date == '2025-01-03'
+        assert not dataset.is_loaded
+    
+    
+    def test_date_range_then_span_keeps_only_span(self, tmp_path):
+        """Test the latest-date lookup does not load the file, so the span read stays pushed down"""
+        path = tmp_path / "ads.csv"
+        path.write_text(SAMPLE_CSV + "Camp C,Adset-3,2025-01-03,10.0,1000,20.0,0.02,1,30.0,3.0,Image,Msg,Broad,Facebook,IN\n")
+        
+        dataset = AdsDataset(str(path), {'agents': {'data_agent': {'chunk_rows': 1}}})
+        assert dataset.latest_date == '2025-01-03'
+        assert not dataset.is_loaded
+        span = dataset.load_span('2025-01-03', '2025-01-03')
+        
+        assert list(span['campaign_name']) == ['Camp C']
+        assert dataset.total_rows == 3
+        assert not dataset.is_loaded
+    
+    def test_parallel_parse_matches_serial(self):
+        """Test byte-range parsing in a process pool equals the serial read"""
+        path = 'data/synthetic_fb_ads_undergarments.csv'
+        config = {'agents': {'data_agent': {'parse_workers': 3, 'parallel_min_bytes': 0}}}
+        
+        header, ranges = byte_ranges(path, 3)
+        assert len(ranges) == 3 and ranges[0][0] == len(header)
+        assert all(prev_end == start for (_, prev_end), (start, _) in zip(ranges, ranges[1:]))
+        
+        pd.testing.assert_frame_equal(AdsDataset(path, config).df, AdsDataset(path).df)
+        pd.testing.assert_frame_equal(
+            AdsDataset(path, config).load_span('2025-02-01', '2025-03-01'),
+            AdsDataset(path).load_span('2025-02-01', '2025-03-01')
+        )
+    
+    def test_slice_date_range_matches_mask(self):
+        """Test binary-search slicing equals an inclusive boolean filter"""
+        df = pd.DataFrame({
+            'date': pd.to_datetime(['2025-01-03', '2025-01-01', '2025-01-02', '2025-01-02', '2025-01-05']),
+            'spend': [3.0, 1.0, 2.0, 2.5, 5.0]
+        })
+        df = sort_by_date(df)
+        start, end = pd.Timestamp('2025-01-02'), pd.Timestamp('2025-01-03')
+        
+        sliced = slice_date_range(df, start, end)
+        masked = df[(df['date'] >= start) & (df['date'] <= end)]
+        
+        assert sliced.equals(masked)
+        assert list(sliced['spend']) == [2.0, 2.5, 3.0]
+        
+        # Windows outside the data, or ending before they start, are empty
+        index = pd.DatetimeIndex(df['date'])
+        assert date_bounds(index, '2025-01-02', '2025-01-03') == (1, 4)
+        assert date_bounds(index, '2025-01-06', '2025-01-09') == (5, 5)
+        assert date_bounds(index, '2025-01-03', '2025-01-02') == (3, 3)
+
+
+class TestColumnarCache:
+    """Test cases for the columnar dataset cache"""
+    
+    @pytest.fixture
+    def csv_path(self, tmp_path):
+        """Write a small CSV to a temp directory"""
+        path = tmp_path / "ads.csv"
+        path.write_text(SAMPLE_CSV)
+        return str(path)
+    
+    @pytest.fixture
+    def cache_config(self, tmp_path):
+        """Config with the pickle cache enabled (no pyarrow needed)"""
+        return {
+            'agents': {
+                'data_agent': {
+                    'cache_data': True,
+                    'cache_dir': str(tmp_path / "cache"),
+                    'cache_format': 'pickle'
+                }
+            }
+        }
+    
+    def test_cache_roundtrip_keeps_dtypes(self, csv_path, cache_config):
+        """Test second load comes from cache with categoricals and datetimes"""
+        first = AdsDataset(csv_path, cache_config).df
+        
+        cache = ColumnarCache(csv_path, cache_config['agents']['data_agent']['cache_dir'], 'pickle')
+        cached = cache.load(list(first.columns))
+        
+        assert cached is not None
+        assert cached.equals(first)
+        assert str(cached['campaign_name'].dtype) == 'category'
+        assert str(cached['date'].dtype).startswith('datetime64')
+    
+    def test_cache_invalidated_when_source_changes(self, csv_path, cache_config):
+        """Test a modified source file is not served from a stale cache"""
+        AdsDataset(csv_path, cache_config).df
+        
+        with open(csv_path, 'a') as f:
+            f.write("Camp C,Adset-3,2025-01-03,10.0,1000,20.0,0.02,1,30.0,3.0,Image,Msg,Broad,Facebook,US\n")
+        
+        cache = ColumnarCache(csv_path, cache_config['agents']['data_agent']['cache_dir'], 'pickle')
+        assert cache.load() is None
+        
+        reloaded = AdsDataset(csv_path, cache_config).df
+        assert len(reloaded) == 3
+    
+    def test_fingerprint_hash_ignores_mtime(self, csv_path):
+        """Test content hash is stable across a touch"""
+        before = file_fingerprint(csv_path)
+        os.utime(csv_path, ns=(before['mtime_ns'] + 10**9, before['mtime_ns'] + 10**9))
+        after = file_fingerprint(csv_path)
+        
+        assert before['content_hash'] == after['content_hash']
+        assert before['mtime_ns'] != after['mtime_ns']
+
+
+
+class TestDateCube:
+    """Test cases for the prefix-sum date cube"""
+    
+    def test_window_totals_match_row_sums(self):
+        """Test prefix-difference totals equal direct sums for many windows"""
+        df = AdsDataset('data/synthetic_fb_ads_undergarments.csv').df
+        cube = DateCube.from_frame(df, ['country'])
+        
+        windows = {
+            'a': ('2025-01-01', '2025-01-31'),
+            'b': ('2025-02-10', '2025-02-10'),
+            'c': ('2025-03-15', '2025-04-30'),
+            'empty': ('2026-01-01', '2026-01-31')
+        }
+        totals = cube.totals(windows)
+        
+        for name, (start, end) in windows.items():
+            rows = df[(df['date'] >= start) & (df['date'] <= end)]
+            assert totals.loc[name, 'rows'] == len(rows)
+            assert totals.loc[name, 'impressions'] == rows['impressions'].sum()
+            assert totals.loc[name, 'spend'] == pytest.approx(rows['spend'].sum())
+        
+        by_country = cube.segment_totals('country', '2025-02-01', '2025-02-28')
+        feb = df[(df['date'] >= '2025-02-01') & (df['date'] <= '2025-02-28')]
+        expected = feb.groupby('country', observed=True)['revenue'].sum()
+        for country, revenue in expected.items():
+            assert by_country.loc[country, 'revenue'] == pytest.approx(revenue)
+
+
+class TestRollupStore:
+    """Test cases for the materialized daily rollup"""
+    
+    def test_incremental_append_matches_rebuild(self, tmp_path):
+        """Test appended days are ingested past the watermark and equal a full rebuild"""
+        with open('data/synthetic_fb_ads_undergarments.csv') as f:
+            header, *rows = f.read().splitlines(keepends=True)
+        history = [row for row in rows if ',2025-03-31,' not in row]
+        new_day = [row for row in rows if ',2025-03-31,' in row]
+        
+        path = tmp_path / "ads.csv"
+        path.write_text(header + ''.join(history))
+        store = RollupStore(str(path), str(tmp_path / "rollup"), 'pickle')
+        store.refresh()
+        assert store.meta['watermark'] == '2025-03-30'
+        
+        with open(path, 'a') as f:
+            f.write(''.join(new_day))
+        incremental = RollupStore(str(path), str(tmp_path / "rollup"), 'pickle').refresh()
+        rebuilt = RollupStore(str(path), str(tmp_path / "rebuilt"), 'pickle').refresh()
+        
+        assert incremental['rows'].sum() == len(rows)
+        key = ['date', 'campaign_name', 'adset_name', 'creative_type', 'audience_type', 'platform', 'country']
+        incremental = incremental.sort_values(key, ignore_index=True)
+        rebuilt = rebuilt.sort_values(key, ignore_index=True)
+        pd.testing.assert_frame_equal(incremental[['impressions', 'rows', 'missing__spend']], rebuilt[['impressions', 'rows', 'missing__spend']])
+        assert incremental['spend'].sum() == pytest.approx(rebuilt['spend'].sum())
+
+
+class TestStratifiedSample:
+    """Test cases for stratified sampling"""
+    
+    def test_per_stratum_sizes_and_weights(self):
+        """Test each stratum keeps ceil(rate * N_h) rows (within bounds) and weights restore N_h"""
+        df = AdsDataset('data/synthetic_fb_ads_undergarments.csv').df
+        sample = StratifiedSample.draw(df, ['date', 'campaign_name'], rate=0.3, min_per_stratum=2, seed=1)
+        
+        population = df.groupby(['date', 'campaign_name'], observed=True).size()
+        kept = sample.frame.groupby(['date', 'campaign_name'], observed=True).size()
+        expected = population.clip(upper=population.mul(0.3).apply(math.ceil).clip(lower=2))
+        assert kept.sort_index().equals(expected.sort_index())
+        
+        weight_sums = pd.Series(sample.weights, index=sample.frame.index).groupby(
+            [sample.frame['date'], sample.frame['campaign_name']], observed=True
+        ).sum()
+        assert weight_sums.sort_index().values == pytest.approx(population.sort_index().values)
+        
+        again = StratifiedSample.draw(df, ['date', 'campaign_name'], rate=0.3, min_per_stratum=2, seed=1)
+        assert again.frame.index.equals(sample.frame.index)
+    
+    def test_full_rate_is_exact(self):
+        """Test sampling every row gives the exact totals with zero standard error"""
+        df = AdsDataset('data/synthetic_fb_ads_undergarments.csv').df
+        sample = StratifiedSample.draw(df, ['date', 'campaign_name'], rate=1.0)
+        estimates = sample.estimates(np.ones(len(sample.frame), dtype=bool))
+        
+        assert estimates['spend'][0] == pytest.approx(df['spend'].sum())
+        assert estimates['roas'][0] == pytest.approx(df['revenue'].sum() / df['spend'].sum())
+        assert all(se == pytest.approx(0) for _, se in estimates.values())
+
+
+
+class TestBootstrapEngine:
+    """Test cases for the bootstrap interval engine"""
+    
+    @pytest.fixture
+    def units(self):
+        """Day units of two groups per window: (values, groups) with spend, revenue, clicks columns"""
+        rng = np.random.default_rng(0)
+        
+        def window(roas, days):
+            spend = rng.uniform(80, 120, 2 * days)
+            revenue = spend * rng.normal(roas, 0.2, 2 * days)
+            values = np.column_stack([spend, revenue, rng.integers(50, 100, 2 * days)])
+            return values, np.repeat([1, 0], days)
+        
+        return window(3.0, 20), window(2.0, 20)
+    
+    def test_seeded_and_chunk_invariant(self, units):
+        """Test the same seed gives the same intervals whatever the memory cap"""
+        baseline, comparison = units
+        columns = ['spend', 'revenue', 'clicks']
+        roomy = BootstrapEngine(resamples=500, seed=3).change_intervals(baseline, comparison, 2, columns)
+        # A cap this small forces one resample per chunk
+        tight_engine = BootstrapEngine(resamples=500, seed=3, max_memory_mb=1e-6)
+        assert tight_engine.chunk_size(40, 3) == 1
+        tight = tight_engine.change_intervals(baseline, comparison, 2, columns)
+        
+        for metric in ('roas', 'cpc'):
+            for key in ('baseline', 'comparison', 'percent_change', 'p_value'):
+                assert np.array_equal(roomy[metric][key], tight[metric][key], equal_nan=True)
+        assert set(roomy) == {'roas', 'cpc'}
+        
+        other = BootstrapEngine(resamples=500, seed=4).change_intervals(baseline, comparison, 2, columns)
+        assert not np.array_equal(roomy['roas']['baseline'], other['roas']['baseline'])
+    
+    def test_intervals_per_group(self, units):
+        """Test each group's intervals cover its own ratio and a real drop is detected"""
+        baseline, comparison = units
+        intervals = BootstrapEngine(resamples=1000).change_intervals(baseline, comparison, 3, ['spend', 'revenue', 'clicks'])
+        roas = intervals['roas']
+        
+        for group in (0, 1):
+            values = baseline[0][baseline[1] == group]
+            low, high = roas['baseline'][group]
+            assert low < values[:, 1].sum() / values[:, 0].sum() < high
+        # ROAS 3.0 -> 2.0: about -33%, well away from zero
+        assert (roas['percent_change'][:2, 1] < -20).all()
+        assert (roas['p_value'][:2] < 0.01).all()
+        # A group without units has no interval
+        assert np.isnan(roas['baseline'][2]).all() and np.isnan(roas['p_value'][2])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -9,7 +9,12 @@ import os
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
+import numpy as np
+
 from agents.evaluator_agent import EvaluatorAgent
+from utils.significance import (
+    normal_sf_two_sided, student_t_sf_two_sided, two_proportion_z_test, welch_t_test, benjamini_hochberg
+)
 
 
 class TestEvaluatorAgent:
@@ -135,6 +140,101 @@ class TestEvaluatorAgent:
         significance_small = evaluator._check_statistical_significance(insight_small, {})
         assert significance_small < 0.60  # Small change less significant
     
+    def test_significance_tests_use_data(self, evaluator):
+        """Test CTR/conversion changes get z-tests and ROAS changes a day-level Welch test, in one batch"""
+        data = {
+            "baseline_metrics": {"impressions": 100000, "clicks": 2000, "purchases": 100},
+            "comparison_metrics": {"impressions": 100000, "clicks": 1500, "purchases": 76},
+            "daily_totals": {
+                "baseline": {"spend": [100.0, 100.0, 100.0, 100.0], "revenue": [300.0, 320.0, 280.0, 310.0]},
+                "comparison": {"spend": [100.0, 100.0, 100.0, 0.0], "revenue": [200.0, 210.0, 190.0, 0.0]}
+            }
+        }
+        insights = [
+            {"category": "Engagement", "evidence": {"change_pct": -25}},
+            {"category": "Conversion", "evidence": {"change_pct": 1.3}},
+            {"category": "ROAS", "evidence": {"change_pct": -33}},
+            {"category": "Segmentation", "evidence": {"change_pct": -40}}
+        ]
+        
+        tests = evaluator._significance_tests(insights, data)
+        
+        ctr, conversion, roas, segment = tests
+        assert ctr['test'] == 'two_proportion_z' and ctr['p_value'] < 1e-10
+        _, expected = two_proportion_z_test(100, 2000, 76, 1500)
+        assert conversion['p_value'] == pytest.approx(float(expected))
+        assert conversion['p_value'] > 0.05
+        # Welch on daily ROAS; the zero-spend day has no ROAS and is dropped
+        _, _, expected = welch_t_test(3.025, np.var([3.0, 3.2, 2.8, 3.1], ddof=1), 4, 2.0, 0.01, 3)
+        assert roas['test'] == 'welch_t' and roas['p_value'] == pytest.approx(float(expected))
+        assert segment is None
+        
+        result = evaluator.execute({"insights": insights, "hypotheses": []}, data)
+        by_category = {i['category']: i for i in result['validated_insights'] + result['rejected_insights']}
+        assert by_category['Engagement']['statistical_significance'] is True
+        assert by_category['Conversion']['statistical_significance'] is False
+        assert by_category['Conversion']['score_components']['statistical_significance'] < 0.95
+    
+    def test_segment_insights_compare_performers(self, evaluator):
+        """Test segment insights get a Welch test of the top vs bottom value's daily ROAS"""
+        def insight(top, bottom):
+            return {"category": "Segmentation", "evidence": {
+                "top_performer": {"daily_roas": top}, "bottom_performer": {"daily_roas": bottom}
+            }}
+        insights = [
+            insight({"mean": 4.0, "variance": 0.04, "days": 10}, {"mean": 2.0, "variance": 0.09, "days": 12}),
+            insight({"mean": 3.1, "variance": 1.0, "days": 5}, {"mean": 3.0, "variance": 1.0, "days": 5}),
+            insight({"mean": 3.1, "variance": None, "days": 1}, {"mean": 3.0, "variance": 1.0, "days": 5})
+        ]
+        
+        wide, narrow, single_day = evaluator._significance_tests(insights, {"metric_changes": {}})
+        
+        t, _, p = welch_t_test(2.0, 0.09, 12, 4.0, 0.04, 10)
+        assert wide['test'] == 'welch_t' and wide['statistic'] == pytest.approx(float(t), abs=1e-4)
+        assert wide['p_value'] == pytest.approx(float(p)) and wide['p_value'] < 1e-6
+        assert narrow['p_value'] > 0.5
+        assert single_day is None
+    
+    def test_sampled_rates_use_stratified_errors(self, evaluator):
+        """Test sampled (weighted) totals are not z-tested as binomial counts"""
+        data = {
+            "data_summary": {"sampling": {"method": "stratified", "rate": 0.1}},
+            # As counts these would make a 1.5% -> 1.47% CTR move highly significant
+            "baseline_metrics": {"impressions": 400000000, "clicks": 6000000},
+            "comparison_metrics": {"impressions": 400000000, "clicks": 5880000},
+            "metric_changes": {"ctr": {
+                "baseline": 1.5,
+                "comparison": 1.47,
+                "confidence_interval": {"standard_error": {"baseline": 0.02, "comparison": 0.02}}
+            }}
+        }
+        ctr, conversion = evaluator._significance_tests(
+            [{"category": "Engagement", "evidence": {}}, {"category": "Conversion", "evidence": {}}], data
+        )
+        
+        assert ctr['test'] == 'stratified_z'
+        assert ctr['statistic'] == pytest.approx(-0.03 / np.sqrt(0.0008), abs=1e-3)
+        assert ctr['p_value'] > 0.2
+        # No interval for the conversion rate: no test rather than a count-based one
+        assert conversion is None
+    
+    def test_bootstrap_p_value_preferred(self, evaluator):
+        """Test ratio metrics use the Data Agent's bootstrap p-value when present"""
+        data = {
+            "metric_changes": {"roas": {"bootstrap": {"percent_change": [-40.0, -25.0], "p_value": 0.002}}},
+            "daily_totals": {
+                "baseline": {"spend": [100.0, 100.0], "revenue": [300.0, 310.0]},
+                "comparison": {"spend": [100.0, 100.0], "revenue": [290.0, 320.0]}
+            }
+        }
+        roas, cost = evaluator._significance_tests(
+            [{"category": "ROAS", "evidence": {}}, {"category": "Cost", "evidence": {}}], data
+        )
+        
+        assert roas == {"test": "bootstrap", "metric": "roas", "percent_change_interval": [-40.0, -25.0], "p_value": 0.002}
+        # No bootstrap for CPC, and its daily values lack clicks
+        assert cost is None
+    
     def test_evidence_strength_assessment(self, evaluator):
         """Test evidence strength assessment"""
         # Strong evidence
@@ -260,3 +360,30 @@ class TestEvaluatorEdgeCases:
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
+
+
+class TestSignificanceTests:
+    """Test the vectorized test statistics against reference values"""
+    
+    def test_reference_p_values(self):
+        """Test normal and Student-t tails against tabulated values"""
+        assert normal_sf_two_sided([1.959964, 2.575829, 0.0]) == pytest.approx([0.05, 0.01, 1.0], abs=1e-6)
+        assert student_t_sf_two_sided([2.228139, 1.0, 0.0], [10, 1, 5]) == pytest.approx([0.05, 0.5, 1.0], abs=1e-6)
+        # Fractional Welch degrees of freedom
+        assert student_t_sf_two_sided(2.0, 7.5)[()] == pytest.approx(0.0828, abs=1e-4)
+    
+    def test_degenerate_inputs(self):
+        """Test tests without enough data give NaN instead of failing"""
+        _, p = two_proportion_z_test([0, 5], [0, 10], [1, 5], [10, 10])
+        assert np.isnan(p[0]) and p[1] == pytest.approx(1.0)
+        
+        _, df, p = welch_t_test([1.0, 1.0], [0.5, 0.0], [1, 5], [2.0, 1.0], [0.5, 0.0], [5, 5])
+        assert np.isnan(p).all() and np.isnan(df).all()
+    
+    def test_benjamini_hochberg(self):
+        """Test BH q-values against a hand-computed step-up, ignoring untested entries"""
+        q = benjamini_hochberg([0.01, 0.04, np.nan, 0.03, 0.5])
+        # Four tests: 0.01*4/1, 0.03*4/2, 0.04*4/3, 0.5*4/4, then the step-up minimum
+        assert q[[0, 3, 1, 4]] == pytest.approx([0.04, 0.0533333, 0.0533333, 0.5])
+        assert np.isnan(q[2])
+        assert np.isnan(benjamini_hochberg([np.nan])).all()
@@ -0,0 +1,63 @@
+"""
+Tests for utility helpers
+"""
+
+import pytest
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.helpers import estimate_size
+
+
+class TestEstimateSize:
+    """Test cases for the bounded-cost size estimator"""
+    
+    def test_small_structure_is_exact(self):
+        """Test structures under the sample limit are fully measured"""
+        data = {"a": [1, 2, 3], "b": "text"}
+        
+        assert estimate_size(data) == estimate_size(data, sample_limit=10**6)
+    
+    def test_large_list_is_extrapolated(self):
+        """Test long uniform lists extrapolate from the sample"""
+        rows = [{"spend": 1.0, "clicks": 2} for _ in range(10000)]
+        
+        sampled = estimate_size(rows, sample_limit=10)
+        full = estimate_size(rows, sample_limit=10**6)
+        
+        assert sampled == pytest.approx(full, rel=0.05)
+    
+    def test_node_budget_bounds_wide_deep_structures(self, monkeypatch):
+        """Test a global node budget caps the work on structures wide at every level"""
+        # 50 items per level, 6 levels deep: 50^6 nodes without a global budget
+        tree = [0] * 50
+        for _ in range(5):
+            tree = [tree] * 50
+        
+        calls = []
+        getsizeof = sys.getsizeof
+        monkeypatch.setattr(sys, 'getsizeof', lambda obj: calls.append(1) or getsizeof(obj))
+        estimate = estimate_size(tree, sample_limit=50, max_depth=6, max_nodes=1000)
+        monkeypatch.undo()
+        
+        assert len(calls) <= 1000
+        # Extrapolated, so still at least the shallow size of every list
+        assert estimate >= getsizeof(tree) * (1 + 50 + 50 ** 2)
+    
+    def test_dataframe_uses_buffer_size(self):
+        """Test DataFrames report their buffer size without deep scans"""
+        import pandas as pd
+        
+        df = pd.DataFrame({"spend": [1.0] * 1000, "name": pd.Series(["campaign"] * 1000, dtype=object)})
+        
+        assert estimate_size(df) >= 8000
+        # No deep scan of the object column (sys.getsizeof would run one)
+        assert estimate_size(df) == df.memory_usage(deep=False).sum() < df.memory_usage(deep=True).sum()
+        assert estimate_size({"frame": df["name"]}) < sys.getsizeof(df["name"])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
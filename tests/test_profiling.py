@@ -0,0 +1,65 @@
+"""
+Tests for per-stage profiling
+"""
+
+import json
+import os
+import pstats
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from orchestrator.orchestrator import Orchestrator
+from utils.profiling import StageProfiler
+
+
+class TestStageProfiler:
+    """Tests for StageProfiler"""
+    
+    def test_disabled_records_nothing(self):
+        """Test a disabled profiler yields an empty metrics dict"""
+        with StageProfiler(enabled=False).profile("stage") as metrics:
+            sum(range(1000))
+        assert metrics == {}
+    
+    def test_measures_time_and_peak_memory(self):
+        """Test wall, CPU and allocation peak are recorded"""
+        with StageProfiler(enabled=True).profile("stage") as metrics:
+            block = bytearray(4 * 1024 * 1024)
+            del block
+        
+        assert metrics["wall_time"] >= 0
+        assert metrics["cpu_time"] >= 0
+        assert metrics["peak_memory_bytes"] >= 4 * 1024 * 1024
+        assert "profile_path" not in metrics
+    
+    def test_cprofile_dump_per_stage(self, tmp_path):
+        """Test a readable .prof file is written for the stage"""
+        profiler = StageProfiler(enabled=True, trace_memory=False, cprofile=True, profile_dir=str(tmp_path))
+        with profiler.profile("insight_agent.correlations") as metrics:
+            sorted(range(1000), reverse=True)
+        
+        assert os.path.dirname(metrics["profile_path"]) == str(tmp_path)
+        assert metrics["profile_path"].endswith("insight_agent.correlations.prof")
+        assert pstats.Stats(metrics["profile_path"]).total_calls > 0
+    
+    def test_execution_log_has_stage_profiles(self, tmp_path):
+        """Test profiled runs write a profile block per stage to execution_log.json"""
+        config = {
+            'data_path': 'data/synthetic_fb_ads_undergarments.csv',
+            'profiling': {'enabled': True, 'cprofile': True, 'profile_dir': str(tmp_path / 'profiles')},
+            'output': {'reports_dir': str(tmp_path / 'reports'), 'logs_dir': str(tmp_path / 'logs')}
+        }
+        orchestrator = Orchestrator(config)
+        assert orchestrator.max_workers == 1
+        
+        orchestrator.execute("Analyze ROAS performance")
+        with open(tmp_path / 'logs' / 'execution_log.json') as f:
+            log = json.load(f)['log']
+        
+        stages = {entry['agent']: entry['details'] for entry in log}
+        for stage in ('planner', 'data_agent', 'insight_agent', 'evaluator', 'creative_agent',
+                      'output.insights', 'output.creatives', 'output.report'):
+            profile = stages[stage]['profile']
+            assert set(profile) == {'wall_time', 'cpu_time', 'peak_memory_bytes', 'profile_path'}
+            assert os.path.exists(profile['profile_path'])
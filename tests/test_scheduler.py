@@ -0,0 +1,77 @@
+"""
+Tests for the stage graph scheduler
+"""
+
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from orchestrator.orchestrator import Orchestrator
+from orchestrator.scheduler import StageGraph
+
+
+class TestStageGraph:
+    """Tests for StageGraph"""
+    
+    def test_outputs_flow_along_dependencies(self):
+        """Test each node receives its dependencies' outputs"""
+        graph = StageGraph()
+        graph.add("a", lambda inputs: 2)
+        graph.add("b", lambda inputs: inputs["a"] * 3, depends_on=["a"])
+        graph.add("c", lambda inputs: inputs["a"] + inputs["b"], depends_on=["a", "b"])
+        
+        for workers in (1, 4):
+            assert graph.run(max_workers=workers) == {"a": 2, "b": 6, "c": 8}
+    
+    def test_independent_nodes_run_concurrently(self):
+        """Test siblings overlap: each waits for the other to have started"""
+        started = {name: threading.Event() for name in ("left", "right")}
+        
+        def sibling(name, other):
+            def run(inputs):
+                started[name].set()
+                assert started[other].wait(timeout=5)
+                return name
+            return run
+        
+        graph = StageGraph()
+        graph.add("root", lambda inputs: None)
+        graph.add("left", sibling("left", "right"), depends_on=["root"])
+        graph.add("right", sibling("right", "left"), depends_on=["root"])
+        
+        assert graph.run(max_workers=2)["left"] == "left"
+    
+    def test_resolved_nodes_prune_their_upstream(self):
+        """Test known outputs skip the node and anything only it needs"""
+        calls = []
+        graph = StageGraph()
+        graph.add("load", lambda inputs: calls.append("load") or 1)
+        graph.add("analyze", lambda inputs: calls.append("analyze") or inputs["load"], depends_on=["load"])
+        graph.add("report", lambda inputs: calls.append("report") or inputs["analyze"] + 1, depends_on=["analyze"])
+        
+        results = graph.run(targets=["report"], resolved={"analyze": 41})
+        
+        assert results["report"] == 42
+        assert calls == ["report"]
+    
+    def test_errors_propagate(self):
+        """Test a failing node raises out of run and undeclared dependencies are rejected"""
+        graph = StageGraph()
+        graph.add("bad", lambda inputs: 1 / 0)
+        graph.add("after", lambda inputs: inputs["bad"], depends_on=["bad"])
+        
+        with pytest.raises(ZeroDivisionError):
+            graph.run(max_workers=2)
+        with pytest.raises(ValueError):
+            graph.add("orphan", lambda inputs: None, depends_on=["missing"])
+    
+    def test_pipeline_graph_runs_insights_as_one_node(self):
+        """Test the insight sub-analyses are not scheduled as separate nodes"""
+        orchestrator = Orchestrator({'data_path': 'data/synthetic_fb_ads_undergarments.csv'})
+        graph = orchestrator._stage_graph({}, None, None)
+        
+        assert list(graph.nodes) == ['data_agent', 'insight_agent', 'evaluator', 'creative_agent']
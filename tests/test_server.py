@@ -0,0 +1,85 @@
+"""
+Tests for the long-lived analysis server
+"""
+
+import json
+import shutil
+import sys
+import os
+import threading
+import urllib.request
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from orchestrator.server import AnalysisServer
+
+
+@pytest.fixture
+def server(tmp_path):
+    """Server on an ephemeral port over a private copy of the sample data"""
+    csv_path = tmp_path / 'ads.csv'
+    shutil.copy('data/synthetic_fb_ads_undergarments.csv', csv_path)
+    config = {
+        'data_path': str(csv_path),
+        'output': {'reports_dir': str(tmp_path / 'reports'), 'logs_dir': str(tmp_path / 'logs')}
+    }
+    analysis_server = AnalysisServer(config, host='127.0.0.1', port=0)
+    analysis_server.start()
+    thread = threading.Thread(target=analysis_server.httpd.serve_forever, daemon=True)
+    thread.start()
+    yield analysis_server
+    analysis_server.shutdown()
+    thread.join(timeout=5)
+
+
+def request(server, path, payload=None):
+    url = f"http://127.0.0.1:{server.port}{path}"
+    data = json.dumps(payload).encode('utf-8') if payload is not None else None
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data), timeout=30) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+class TestAnalysisServer:
+    """Tests for AnalysisServer"""
+    
+    def test_repeat_queries_reuse_warm_dataset(self, server, tmp_path):
+        """Test queries are answered from the dataset loaded at startup"""
+        status, health = request(server, '/health')
+        assert status == 200
+        assert health['dataset']['loaded'] and health['dataset']['total_rows'] == 4500
+        
+        for _ in range(2):
+            status, results = request(server, '/analyze', {"query": "Analyze ROAS drop in last 30 days"})
+            assert status == 200
+            assert results['data_summary']['total_rows'] == 4500
+        
+        status, batch = request(server, '/analyze', {"queries": ["Why is CTR declining?", "Campaign ROAS last 2 weeks"]})
+        assert status == 200 and len(batch['results']) == 2
+        
+        assert server.dataset_loads == 1
+        assert server.queries_served == 4
+        assert (tmp_path / 'reports' / 'insights.json').exists()
+    
+    def test_reload_when_source_changes(self, server):
+        """Test the dataset is rebuilt after the source file is modified"""
+        with open(server.data_path, 'r') as f:
+            lines = f.read().splitlines()
+        with open(server.data_path, 'w') as f:
+            f.write('\n'.join(lines[:-100]) + '\n')
+        
+        status, results = request(server, '/analyze', {"query": "Analyze ROAS drop in last 30 days"})
+        assert status == 200
+        assert results['data_summary']['total_rows'] == 4400
+        assert server.dataset_loads == 2
+    
+    def test_invalid_requests(self, server):
+        """Test malformed requests are rejected without running the pipeline"""
+        assert request(server, '/analyze', {})[0] == 400
+        assert request(server, '/analyze', {"queries": []})[0] == 400
+        assert request(server, '/missing')[0] == 404
+        assert server.queries_served == 0
@@ -0,0 +1,90 @@
+"""
+Tests for the stage result cache
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from orchestrator.orchestrator import Orchestrator
+from utils.stage_cache import StageCache
+
+
+@pytest.fixture
+def cache_config(tmp_path):
+    return {
+        'data_path': 'data/synthetic_fb_ads_undergarments.csv',
+        'stage_cache': {'enabled': True, 'dir': str(tmp_path / 'stage_cache')},
+        'output': {'reports_dir': str(tmp_path / 'reports'), 'logs_dir': str(tmp_path / 'logs')}
+    }
+
+
+def stage_statuses(results):
+    """Status per pipeline stage (output writer nodes left out)"""
+    return {
+        entry['agent']: entry['status']
+        for entry in results['execution_log'] if not entry['agent'].startswith('output.')
+    }
+
+
+class TestStageCache:
+    """Tests for StageCache"""
+    
+    def test_key_is_order_independent(self, tmp_path):
+        """Test equal inputs give equal keys regardless of dict order"""
+        cache = StageCache(str(tmp_path))
+        assert cache.key("data_agent", {"a": 1, "b": [1, 2]}) == cache.key("data_agent", {"b": [1, 2], "a": 1})
+        assert cache.key("data_agent", {"a": 1}) != cache.key("insight_agent", {"a": 1})
+    
+    def test_lru_eviction(self, tmp_path):
+        """Test the least recently used entries are evicted past the size bound"""
+        cache = StageCache(str(tmp_path), max_bytes=2500)
+        payload = "x" * 1000
+        
+        cache.put("a", payload)
+        time.sleep(0.01)
+        cache.put("b", payload)
+        time.sleep(0.01)
+        assert cache.get("a") == payload  # "a" becomes most recently used
+        time.sleep(0.01)
+        cache.put("c", payload)
+        
+        assert cache.get("b") is None
+        assert cache.get("a") == payload
+        assert cache.get("c") == payload
+
+
+class TestOrchestratorStageCache:
+    """Tests for stage skipping in the Orchestrator"""
+    
+    def test_repeat_query_uses_cached_stages(self, cache_config):
+        """Test a repeated query skips every cached stage with identical results"""
+        first = Orchestrator(cache_config).execute("Analyze ROAS drop in last 30 days")
+        second = Orchestrator(cache_config).execute("Analyze ROAS drop in last 30 days")
+        
+        assert set(stage_statuses(first).values()) == {"success"}
+        assert stage_statuses(second) == {
+            "planner": "success",
+            "data_agent": "cached",
+            "insight_agent": "cached",
+            "evaluator": "cached",
+            "creative_agent": "cached"
+        }
+        assert second['insights'] == first['insights']
+        assert second['creatives'] == first['creatives']
+        assert second['data_summary'] == first['data_summary']
+    
+    def test_config_change_reruns_dependent_stages_only(self, cache_config):
+        """Test changing one stage's config reruns that stage and its dependents"""
+        Orchestrator(cache_config).execute("Analyze ROAS drop in last 30 days")
+        
+        cache_config['agents'] = {'creative_agent': {'max_creatives': 3}}
+        statuses = stage_statuses(Orchestrator(cache_config).execute("Analyze ROAS drop in last 30 days"))
+        
+        assert statuses['data_agent'] == "cached"
+        assert statuses['evaluator'] == "cached"
+        assert statuses['creative_agent'] == "success"